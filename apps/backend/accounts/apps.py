@@ -1,8 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save, pre_delete
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
 
-    pass
+    def ready(self) -> None:
+        from accounts import signals
+        from accounts.models import User
+        from config import sharding
+
+        post_save.connect(signals.refresh_cached_user, sender=User)
+        post_delete.connect(signals.revoke_deleted_user_tokens, sender=User)
+        post_save.connect(sharding.place_new_user, sender=User)
+        pre_delete.connect(sharding.delete_stand_in, sender=User)
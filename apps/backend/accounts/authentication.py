@@ -0,0 +1,141 @@
+"""Stateless JWT authentication.
+
+``JWTAuthentication`` loads the user row on every request just to build
+``request.user``, while the notes API only ever needs the id the signed
+token already carries. ``StatelessJWTAuthentication`` returns a ``LazyUser``
+that answers ``pk``/``id``/``is_authenticated`` from the token and loads the
+row, through a small per-process LRU, only when anything else is touched.
+
+Since the row is no longer read per request, deactivated and deleted users
+are cut off through ``revoke_user_tokens`` instead: a cached marker that
+rejects every token issued before it and expires with the longest-lived
+access token. With more than one worker process the cache must be shared
+(``REDIS_URL``) for revocations to reach every worker.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any
+
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from accounts.models import User
+
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 60  # seconds; bounds staleness of edits made by other processes
+
+
+class UserCache:
+    """A thread-safe, per-process LRU of users loaded by ``LazyUser``.
+
+    Callers get their own copy, so a request mutating ``request.user`` never
+    leaks into another request's view of it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[User, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> User:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                return copy.copy(entry[0])
+        user = User.objects.get(pk=user_id)
+        with self._lock:
+            self._entries[user_id] = (user, now + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return copy.copy(user)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+
+def revocation_cache_key(user_id: int) -> str:
+    return f"accounts:revoked:{user_id}"
+
+
+def revoke_user_tokens(user_id: int) -> None:
+    """Reject every access token issued to ``user_id`` up to now."""
+    lifetime = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    cache.set(revocation_cache_key(user_id), int(time.time()), int(lifetime) + 1)
+    user_cache.invalidate(user_id)
+
+
+def tokens_revoked(user_id: int, issued_at: int | None) -> bool:
+    revoked_at = cache.get(revocation_cache_key(user_id))
+    return revoked_at is not None and (issued_at is None or issued_at <= revoked_at)
+
+
+def load_user(user_id: int) -> User:
+    try:
+        user = user_cache.get(user_id)
+    except User.DoesNotExist:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+    if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    return user
+
+
+class LazyUser(SimpleLazyObject):
+    """``request.user`` for a token-authenticated request.
+
+    The id and authentication flags come straight from the token; anything
+    else (including ``isinstance`` checks and model assignment) loads the
+    user. Filter and assign by ``user_id=request.user.pk`` to stay lazy.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id: int) -> None:
+        super().__init__(partial(load_user, user_id))
+        self.__dict__["_user_id"] = user_id
+
+    @property
+    def pk(self) -> int:
+        return self.__dict__["_user_id"]
+
+    id = pk
+
+    def __bool__(self) -> bool:
+        return True
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token: Token) -> Any:
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        if tokens_revoked(user_id, validated_token.get("iat")):
+            raise AuthenticationFailed(
+                _("Token has been revoked"), code="token_revoked"
+            )
+        return LazyUser(user_id)
@@ -29,6 +29,9 @@ class UserManager(BaseUserManager["User"]):
 class User(AbstractUser):
     username = None  # type: ignore[assignment]
     email = models.EmailField(unique=True)
+    # Database holding the user's notes when sharding is on; blank means
+    # default. See config.sharding.
+    shard = models.CharField(max_length=50, blank=True, default="")
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS: ClassVar[list[str]] = []
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from accounts.models import User
+
+
+class EmailAlreadyRegistered(ValueError):
+    pass
+
+
+def register_user(email: str, password: str) -> User:
+    """Create a user with a single INSERT.
+
+    Duplicate emails are caught by the unique constraint rather than a
+    pre-check, which saves a query and means two concurrent signups for the
+    same address can't both get through. Default categories are not stored
+    here; they are provisioned on first use.
+    """
+    try:
+        with transaction.atomic():
+            # Signing up hands out tokens, so it counts as the first login.
+            user = User.objects.create_user(
+                email=email, password=password, last_login=timezone.now()
+            )
+    except IntegrityError as exc:
+        raise EmailAlreadyRegistered(email) from exc
+    return user
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import Any
+
+from accounts.authentication import revoke_user_tokens, user_cache
+from accounts.models import User
+
+
+def refresh_cached_user(instance: User, using: str, **kwargs: Any) -> None:
+    # Rows on other databases are sharding stand-ins, not the account.
+    if using != "default":
+        return
+    if instance.is_active:
+        user_cache.invalidate(instance.pk)
+    else:
+        revoke_user_tokens(instance.pk)
+
+
+def revoke_deleted_user_tokens(instance: User, using: str, **kwargs: Any) -> None:
+    if using != "default":
+        return
+    revoke_user_tokens(instance.pk)
@@ -0,0 +1,138 @@
+"""Idle change-feed connections: memory per connection and fan-out latency.
+
+Opens ``--connections`` server-sent event streams for one user and waits
+until each has its ``ready`` event. Then makes ``--writes`` note changes
+through the API and times how long each one takes to reach every stream.
+Pass the server's ``--pid`` to also report its memory per connection:
+
+    CHANGE_FEED=True gunicorn config.asgi:application -w 1 \\
+        -k uvicorn.workers.UvicornWorker --bind :8001
+
+    python benchmarks/change_feed.py http://localhost:8001 --token <jwt> \\
+        --connections 10000 --pid <worker pid>
+
+Each stream holds a socket on both ends, so raise ``ulimit -n`` first.
+Only the standard library is used so it runs from any environment.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+def rss_mb(pid: int | None) -> float | None:
+    if pid is None:
+        return None
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return None
+
+
+async def open_stream(
+    base: str, token: str
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    parts = urlsplit(base)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    writer.write(
+        (
+            "GET /api/changes/ HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            f"Authorization: Bearer {token}\r\n"
+            "Accept: text/event-stream\r\n\r\n"
+        ).encode()
+    )
+    await writer.drain()
+    while b"event: ready" not in await reader.readline():
+        pass
+    return reader, writer
+
+
+async def next_change(reader: asyncio.StreamReader) -> float:
+    while b"event: change" not in await reader.readline():
+        pass
+    return time.perf_counter()
+
+
+def write_note(base: str, token: str) -> None:
+    # Creating and deleting leaves the user's data as it was; each write
+    # pushes a note and a category event.
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    create = urllib.request.Request(
+        f"{base}/api/notes/", b'{"title": "Feed benchmark"}', headers, method="POST"
+    )
+    with urllib.request.urlopen(create) as response:
+        note_id = json.load(response)["id"]
+    delete = urllib.request.Request(
+        f"{base}/api/notes/{note_id}/", headers=headers, method="DELETE"
+    )
+    urllib.request.urlopen(delete).close()
+
+
+async def run(args: argparse.Namespace) -> dict[str, object]:
+    before = rss_mb(args.pid)
+    limiter = asyncio.Semaphore(500)
+
+    async def connect() -> tuple[asyncio.StreamReader, asyncio.StreamWriter] | None:
+        async with limiter:
+            try:
+                return await open_stream(args.url, args.token)
+            except OSError:
+                return None
+
+    started = time.perf_counter()
+    opened = await asyncio.gather(*(connect() for _ in range(args.connections)))
+    streams = [stream for stream in opened if stream is not None]
+    connect_seconds = time.perf_counter() - started
+    await asyncio.sleep(1)
+    after = rss_mb(args.pid)
+
+    latencies = []
+    for _ in range(args.writes):
+        waiting = [asyncio.ensure_future(next_change(r)) for r, _ in streams]
+        sent = time.perf_counter()
+        await asyncio.to_thread(write_note, args.url, args.token)
+        received = await asyncio.gather(*waiting)
+        latencies.extend(at - sent for at in received)
+        # Drain the write's remaining events before the next one.
+        await asyncio.sleep(1)
+    for _, writer in streams:
+        writer.close()
+
+    latencies.sort()
+    per_connection = (
+        None
+        if before is None or after is None or not streams
+        else round((after - before) * 1024 / len(streams), 1)
+    )
+    return {
+        "connections": len(streams),
+        "failed": args.connections - len(streams),
+        "connect_seconds": round(connect_seconds, 1),
+        "server_rss_mb_idle": None if after is None else round(after, 1),
+        "server_kb_per_connection": per_connection,
+        "fanout_p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "fanout_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        "fanout_max_ms": round(latencies[-1] * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url", help="server base URL, e.g. http://localhost:8001")
+    parser.add_argument("--token", required=True, help="JWT access token")
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--writes", type=int, default=5)
+    parser.add_argument("--pid", type=int, help="server process id, for memory")
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
+
+
+if __name__ == "__main__":
+    main()
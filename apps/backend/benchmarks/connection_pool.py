@@ -0,0 +1,125 @@
+"""Request latency under connection churn, with and without the pool.
+
+Runs ``--waves`` bursts of ``--threads`` fresh threads against PostgreSQL,
+the way threaded or async workers spin up threads on a spike. Each thread
+serves ``--requests`` requests of one small query, ending each one as
+Django does (``close_if_unusable_or_obsolete``). Three setups are compared:
+a new connection per request (``CONN_MAX_AGE=0``), persistent per-thread
+connections (``CONN_MAX_AGE=600``), and ``config.pgpool``. Reports latency
+percentiles and the most connections the server saw at once:
+
+    DATABASE_URL=postgres://... python benchmarks/connection_pool.py \\
+        --threads 50 --waves 20 --pool-size 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    return round(ordered[max(int(len(ordered) * fraction) - 1, 0)] * 1000, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--waves", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=5, help="per thread")
+    parser.add_argument("--pool-size", type=int, default=10)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import dj_database_url  # type: ignore
+    from django.conf import settings
+
+    target = dj_database_url.parse(os.environ["DATABASE_URL"])
+    settings.DATABASES.update(
+        {
+            "per_request": {**target, "CONN_MAX_AGE": 0},
+            "persistent": {**target, "CONN_MAX_AGE": 600},
+            "pooled": {
+                **target,
+                "ENGINE": "config.pgpool",
+                "CONN_MAX_AGE": 0,
+                "POOL": {"MIN_SIZE": 2, "MAX_SIZE": args.pool_size, "TIMEOUT": 30},
+            },
+        }
+    )
+    import django
+
+    django.setup()
+    from django.db import connections
+
+    def server_connections() -> int:
+        with connections["default"].cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM pg_stat_activity WHERE datname = %s",
+                [target["NAME"]],
+            )
+            return cursor.fetchone()[0]
+
+    report = []
+    for alias in ("per_request", "persistent", "pooled"):
+        latencies: list[float] = []
+        lock = threading.Lock()
+
+        def serve() -> None:
+            connection = connections[alias]
+            mine = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+                connection.close_if_unusable_or_obsolete()
+                mine.append(time.perf_counter() - started)
+            with lock:
+                latencies.extend(mine)
+
+        # Connections of the previous setup's dead threads close once
+        # collected; count only this setup's.
+        gc.collect()
+        time.sleep(0.5)
+        baseline = server_connections()
+        peak = 0
+        started = time.perf_counter()
+        for _ in range(args.waves):
+            threads = [threading.Thread(target=serve) for _ in range(args.threads)]
+            for thread in threads:
+                thread.start()
+            peak = max(peak, server_connections())
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        report.append(
+            {
+                "setup": alias,
+                "requests": len(latencies),
+                "requests_per_second": round(len(latencies) / elapsed),
+                "p50_ms": percentile(latencies, 0.5),
+                "p95_ms": percentile(latencies, 0.95),
+                "p99_ms": percentile(latencies, 0.99),
+                "max_ms": round(latencies[-1] * 1000, 2),
+                "stdev_ms": round(statistics.pstdev(latencies) * 1000, 2),
+                "peak_server_connections": peak - baseline,
+            }
+        )
+    from config.pgpool.pool import pool_stats
+
+    print(json.dumps({"results": report, "pools": pool_stats()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Logins per second per core for each configured password hasher.
+
+Times ``check_password`` on a single thread, which is what a token login
+costs, for Django's default PBKDF2 ("before") and for the hashers in
+``PASSWORD_HASHERS`` ("after"):
+
+    python benchmarks/password_hashing.py --rounds 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.contrib.auth.hashers import check_password, make_password
+    from django.test import override_settings
+
+    candidates = {"django.contrib.auth.hashers.PBKDF2PasswordHasher": "before"}
+    candidates.update({path: "after" for path in settings.PASSWORD_HASHERS[:2]})
+
+    report = []
+    for path, stage in candidates.items():
+        with override_settings(PASSWORD_HASHERS=[path]):
+            encoded = make_password("correct horse battery staple")
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                check_password("correct horse battery staple", encoded)
+            elapsed = (time.perf_counter() - started) / args.rounds
+        report.append(
+            {
+                "hasher": path,
+                "stage": stage,
+                "ms_per_login": round(elapsed * 1000, 1),
+                "logins_per_second_per_core": round(1 / elapsed, 1),
+            }
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
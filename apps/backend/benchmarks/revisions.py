@@ -0,0 +1,108 @@
+"""Storage growth and rebuild time of note revision history.
+
+Simulates a session of autosaves on one large note (a small random edit
+every ``--interval`` seconds) in a throwaway test database, then reports
+how many revisions were kept, the bytes they take compared with storing a
+full copy per autosave, the time each save spent recording history, and
+the time to rebuild every kept revision:
+
+    python benchmarks/revisions.py --size-kb 200 --saves 2000 --interval 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-kb", type=int, default=200)
+    parser.add_argument("--saves", type=int, default=2000)
+    parser.add_argument("--interval", type=float, default=5, help="seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from django.utils import timezone
+
+    from accounts.factories import UserFactory
+    from notes.models import Note, NoteRevision
+    from notes.revisions import record_revisions, revision_content
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+    rng = random.Random(args.seed)
+    words = "the quick brown fox jumps over a lazy dog\n".split(" ")
+    content = "".join(
+        rng.choice(words) + " " for _ in range(args.size_kb * 1024 // 5)
+    )
+    now = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+    with mock.patch.object(timezone, "now", lambda: now):
+        note = Note.objects.create(user=UserFactory(), content=content)
+        naive_bytes = 0
+        record_seconds = []
+        for _ in range(args.saves):
+            now += timedelta(seconds=args.interval)
+            previous = (note.title, note.content, note.updated_at)
+            start = rng.randrange(len(note.content))
+            end = start + rng.randint(0, 10)
+            note.content = (
+                note.content[:start]
+                + "".join(rng.choices("abcdef ", k=rng.randint(0, 12)))
+                + note.content[end:]
+            )
+            note.save(update_fields=["content", "updated_at"])
+            naive_bytes += len(previous[1].encode())
+            started = time.perf_counter()
+            record_revisions([(note, *previous)])
+            record_seconds.append(time.perf_counter() - started)
+
+    revisions = list(NoteRevision.objects.filter(note=note).order_by("number"))
+    stored_bytes = sum(
+        len((r.snapshot or "").encode()) + len(json.dumps(r.delta or []).encode())
+        for r in revisions
+    )
+    rebuild_seconds = []
+    for revision in revisions:
+        started = time.perf_counter()
+        revision_content(note, revision.number)
+        rebuild_seconds.append(time.perf_counter() - started)
+
+    print(
+        json.dumps(
+            {
+                "note_kb": args.size_kb,
+                "autosaves": args.saves,
+                "revisions_kept": len(revisions),
+                "snapshots": sum(r.snapshot is not None for r in revisions),
+                "stored_kb": round(stored_bytes / 1024, 1),
+                "full_copy_per_autosave_kb": round(naive_bytes / 1024, 1),
+                "record_ms_p50": round(statistics.median(record_seconds) * 1000, 2),
+                "record_ms_max": round(max(record_seconds) * 1000, 2),
+                "rebuild_ms_p50": round(statistics.median(rebuild_seconds) * 1000, 2),
+                "rebuild_ms_max": round(max(rebuild_seconds) * 1000, 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
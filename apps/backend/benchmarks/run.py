@@ -0,0 +1,321 @@
+"""Reproducible API benchmark: seed, serve, drive, report.
+
+Seeds a dedicated database with ``seed_benchmark_data``, starts the app
+under gunicorn with ``REQUEST_METRICS`` on, then drives each scenario
+below with ``--concurrency`` threads. The JSON report records, per
+scenario, p50/p95/p99 latency, requests per second and queries per
+request (read from the ``Server-Timing`` header). Commit it, or pass it as
+``--baseline`` to a later run to get a diff:
+
+    python benchmarks/run.py --output before.json
+    git checkout my-branch
+    python benchmarks/run.py --skip-seed --baseline before.json --output after.json
+
+``--url`` skips seeding and the server and benchmarks a running
+deployment instead; it must have been seeded with the same command.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+import django
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# The seeded users' credentials come from the seeding command itself.
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from notes.management.commands.seed_benchmark_data import (  # noqa: E402
+    BENCHMARK_EMAIL_DOMAIN,
+    BENCHMARK_PASSWORD,
+)
+
+QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+class Client:
+    def __init__(self, base_url: str) -> None:
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+
+    def request(
+        self, method: str, path: str, token: str | None = None, body: Any = None
+    ) -> tuple[int, Any, float, int | None]:
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        payload = None if body is None else json.dumps(body)
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        started = time.perf_counter()
+        try:
+            connection.request(method, path, payload, headers)
+            response = connection.getresponse()
+            content = response.read()
+        finally:
+            connection.close()
+        elapsed = time.perf_counter() - started
+        match = QUERIES.search(response.getheader("Server-Timing") or "")
+        data = json.loads(content) if content else None
+        return response.status, data, elapsed, int(match.group(1)) if match else None
+
+
+class Session:
+    """A logged-in benchmark user and the ids of their notes."""
+
+    def __init__(self, email: str, token: str, note_ids: list[int]) -> None:
+        self.email = email
+        self.token = token
+        self.note_ids = note_ids
+
+
+Scenario = Callable[[Client, Session, random.Random], tuple[int, Any, float, int | None]]
+
+SCENARIOS: dict[str, Scenario] = {
+    "notes.list": lambda c, s, r: c.request("GET", "/api/notes/", s.token),
+    "notes.list_page": lambda c, s, r: c.request(
+        "GET", "/api/notes/?page_size=50", s.token
+    ),
+    "notes.summary": lambda c, s, r: c.request("GET", "/api/notes/summary/", s.token),
+    "notes.retrieve": lambda c, s, r: c.request(
+        "GET", f"/api/notes/{r.choice(s.note_ids)}/", s.token
+    ),
+    "notes.search": lambda c, s, r: c.request(
+        "GET", f"/api/notes/search/?q={r.choice(['meeting', 'budget', 'exam'])}", s.token
+    ),
+    "notes.create": lambda c, s, r: c.request(
+        "POST", "/api/notes/", s.token, {"title": "Bench", "content": "x" * 200}
+    ),
+    "notes.update": lambda c, s, r: c.request(
+        "PATCH", f"/api/notes/{r.choice(s.note_ids)}/", s.token, {"title": "Edited"}
+    ),
+    "categories.list": lambda c, s, r: c.request("GET", "/api/categories/", s.token),
+    "auth.me": lambda c, s, r: c.request("GET", "/api/auth/me/", s.token),
+    "auth.login": lambda c, s, r: c.request(
+        "POST",
+        "/api/auth/token/",
+        None,
+        {"email": s.email, "password": BENCHMARK_PASSWORD},
+    ),
+}
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(
+    client: Client,
+    sessions: list[Session],
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    seed: int,
+) -> dict[str, Any]:
+    lock = threading.Lock()
+    latencies: list[float] = []
+    queries: list[int] = []
+    errors = 0
+
+    def worker(index: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed + index)
+        for _ in range(index, requests, concurrency):
+            # Sessions are ordered heaviest user first; sample them uniformly
+            # so the Zipf skew of the data carries into the load.
+            status, _, elapsed, count = scenario(client, rng.choice(sessions), rng)
+            with lock:
+                if status >= 400:
+                    errors += 1
+                latencies.append(elapsed)
+                if count is not None:
+                    queries.append(count)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "queries_per_request": (
+            round(sum(queries) / len(queries), 2) if queries else None
+        ),
+    }
+
+
+def login(client: Client, count: int) -> list[Session]:
+    sessions = []
+    for index in range(count):
+        email = f"user{index}@{BENCHMARK_EMAIL_DOMAIN}"
+        status, tokens, _, _ = client.request(
+            "POST",
+            "/api/auth/token/",
+            body={"email": email, "password": BENCHMARK_PASSWORD},
+        )
+        if status != 200:
+            raise SystemExit(f"Login failed for {email} ({status}); seed first.")
+        _, notes, _, _ = client.request("GET", "/api/notes/summary/", tokens["access"])
+        note_ids = [note["id"] for note in notes]
+        if note_ids:
+            sessions.append(Session(email, tokens["access"], note_ids))
+    return sessions
+
+
+def manage(env: dict[str, str], *args: str) -> None:
+    subprocess.run(
+        [sys.executable, "manage.py", *args], cwd=BACKEND_DIR, env=env, check=True
+    )
+
+
+def start_server(env: dict[str, str], port: int, workers: int) -> subprocess.Popen[bytes]:
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "config.wsgi:application",
+            "--workers", str(workers), "--bind", f"127.0.0.1:{port}",
+            "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    client = Client(f"http://127.0.0.1:{port}")
+    for _ in range(100):
+        try:
+            client.request("GET", "/api/auth/me/")
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise SystemExit("Server did not start.")
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_diff(baseline: dict[str, Any], report: dict[str, Any]) -> None:
+    print(f"{'scenario':<18} {'p50 ms':>16} {'p95 ms':>16} {'req/s':>16} {'queries':>12}")
+    for name, now in report["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        cells = []
+        for key, width in (
+            ("p50_ms", 16), ("p95_ms", 16), ("requests_per_second", 16),
+            ("queries_per_request", 12),
+        ):
+            old, new = before.get(key), now.get(key)
+            if old and new is not None:
+                cells.append(f"{new:>8} ({(new - old) / old:+.0%})".rjust(width))
+            else:
+                cells.append(f"{new}".rjust(width))
+        print(f"{name:<18} {' '.join(cells)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--notes", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sessions", type=int, default=50, help="users to log in as")
+    parser.add_argument("--requests", type=int, default=500, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--database-url",
+        default=f"sqlite:///{Path(tempfile.gettempdir()) / 'turbo-notes-bench.sqlite3'}",
+    )
+    parser.add_argument("--url", help="benchmark an already running server")
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.database_url,
+        "REQUEST_METRICS": "True",
+        "DEBUG": "False",
+        "ALLOWED_HOSTS": "127.0.0.1,localhost",
+    }
+    server = None
+    if args.url is None:
+        if not args.skip_seed:
+            manage(env, "migrate", "--noinput", "-v", "0")
+            manage(
+                env, "seed_benchmark_data", "--users", str(args.users),
+                "--notes", str(args.notes), "--seed", str(args.seed),
+            )
+        server = start_server(env, args.port, args.workers)
+    client = Client(args.url or f"http://127.0.0.1:{args.port}")
+
+    try:
+        sessions = login(client, args.sessions)
+        scenarios = {}
+        for name in args.scenario or SCENARIOS:
+            scenarios[name] = run_scenario(
+                client, sessions, SCENARIOS[name], args.requests, args.concurrency, args.seed
+            )
+            print(f"{name:<18} {json.dumps(scenarios[name])}", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": args.url or args.database_url.split(":", 1)[0],
+            **{
+                key: getattr(args, key)
+                for key in ("users", "notes", "seed", "sessions", "requests",
+                            "concurrency", "workers")
+            },
+        },
+        "scenarios": scenarios,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.baseline:
+        print_diff(json.loads(args.baseline.read_text()), report)
+    elif not args.output:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Slow-client load test for comparing the WSGI and ASGI deployments.
+
+Opens ``--clients`` concurrent connections against one URL; each client
+sends its request and then reads the response a few bytes at a time, the
+way a phone on a poor network would. Start both servers, then run it once
+against each and compare the reports:
+
+    gunicorn config.wsgi:application -w 4 --bind :8000
+    ASYNC_READS=True gunicorn config.asgi:application -w 4 \
+        -k uvicorn.workers.UvicornWorker --bind :8001
+
+    python benchmarks/slow_clients.py http://localhost:8000/api/notes/ --token <jwt>
+    python benchmarks/slow_clients.py http://localhost:8001/api/notes/ --token <jwt>
+
+Only the standard library is used so it runs from any environment.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def fetch(url: str, token: str, chunk: int, delay: float) -> tuple[int, float]:
+    parts = urlsplit(url)
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    writer.write(
+        (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            f"Authorization: Bearer {token}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode()
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    while await reader.read(chunk):
+        await asyncio.sleep(delay)
+    writer.close()
+    await writer.wait_closed()
+    return int(status_line.split()[1]), time.perf_counter() - started
+
+
+async def run(args: argparse.Namespace) -> dict[str, object]:
+    limiter = asyncio.Semaphore(args.clients)
+
+    async def one() -> tuple[int, float] | None:
+        async with limiter:
+            try:
+                return await fetch(args.url, args.token, args.chunk, args.delay)
+            except OSError:
+                return None
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    ok = sorted(r[1] for r in results if r is not None and r[0] == 200)
+    return {
+        "url": args.url,
+        "clients": args.clients,
+        "requests": args.requests,
+        "succeeded": len(ok),
+        "failed": args.requests - len(ok),
+        "requests_per_second": round(len(ok) / elapsed, 1),
+        "p50_ms": round(statistics.median(ok) * 1000, 1) if ok else None,
+        "p95_ms": round(ok[int(len(ok) * 0.95) - 1] * 1000, 1) if ok else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url")
+    parser.add_argument("--token", required=True, help="JWT access token")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--chunk", type=int, default=512, help="bytes per read")
+    parser.add_argument("--delay", type=float, default=0.05, help="seconds between reads")
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
+
+
+if __name__ == "__main__":
+    main()
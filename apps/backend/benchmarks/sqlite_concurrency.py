@@ -0,0 +1,144 @@
+"""Mixed note reads and autosaves from several processes on one SQLite file.
+
+Forks ``--workers`` processes, as gunicorn would, that for ``--seconds``
+either list a user's notes or autosave one of them (read the note and
+write it back in one transaction), ``--write-ratio`` of the time. Runs
+once on Django's stock SQLite backend and once on ``config.sqlite``, each
+against a fresh migrated file, and reports throughput, latency percentiles
+and the operations that failed with "database is locked":
+
+    python benchmarks/sqlite_concurrency.py --workers 8 --seconds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def percentile(ordered: list[float], fraction: float) -> float | None:
+    if not ordered:
+        return None
+    return round(ordered[max(int(len(ordered) * fraction) - 1, 0)] * 1000, 2)
+
+
+def work(args: argparse.Namespace, note_ids: list[int], results) -> None:  # type: ignore[no-untyped-def]
+    from django.db import OperationalError, connections, transaction
+
+    from notes.models import Note
+    from notes.serializers import NOTE_VALUES_FIELDS
+
+    connections.close_all()  # never share the parent's connection
+    user_id = Note.objects.values_list("user_id", flat=True)[0]
+    timings: dict[str, list[float]] = {"read": [], "autosave": []}
+    errors = 0
+    deadline = time.monotonic() + args.seconds
+    while time.monotonic() < deadline:
+        write = random.random() < args.write_ratio
+        started = time.perf_counter()
+        try:
+            if write:
+                with transaction.atomic():
+                    note = Note.objects.get(pk=random.choice(note_ids))
+                    note.content = f"{note.content[:2000]} {random.random()}"
+                    note.save(update_fields=["content", "updated_at"])
+            else:
+                list(Note.objects.filter(user_id=user_id).values(*NOTE_VALUES_FIELDS))
+        except OperationalError:
+            errors += 1
+            continue
+        timings["autosave" if write else "read"].append(time.perf_counter() - started)
+    results.put((timings, errors))
+
+
+def run(args: argparse.Namespace) -> dict[str, object]:
+    """One backend, set up through DATABASE_URL and SQLITE_TUNED."""
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+    from django.core.management import call_command
+
+    from accounts.models import User
+    from notes.models import Note
+
+    call_command("migrate", verbosity=0)
+    user = User.objects.create_user(
+        email="bench@example.com", password="unused-password"
+    )
+    notes = Note.objects.bulk_create(
+        Note(user_id=user.pk, title=f"Note {i}", content="x" * 2000)
+        for i in range(args.notes)
+    )
+    note_ids = [note.pk for note in notes]
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [
+        context.Process(target=work, args=(args, note_ids, results))
+        for _ in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    timings: dict[str, list[float]] = {"read": [], "autosave": []}
+    errors = 0
+    for _ in workers:
+        worker_timings, worker_errors = results.get()
+        for kind, values in worker_timings.items():
+            timings[kind].extend(values)
+        errors += worker_errors
+    for worker in workers:
+        worker.join()
+
+    row: dict[str, object] = {"backend": args.backend, "locked_errors": errors}
+    for kind, values in timings.items():
+        values.sort()
+        row[f"{kind}s_per_second"] = round(len(values) / args.seconds)
+        row[f"{kind}_p50_ms"] = percentile(values, 0.5)
+        row[f"{kind}_p99_ms"] = percentile(values, 0.99)
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--backend", choices=("stock", "tuned"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        print(json.dumps(run(args)))
+        return
+    # Settings are read once per process, so each backend runs in its own.
+    directory = Path(tempfile.mkdtemp(prefix="sqlite-bench-"))
+    report = []
+    for backend in ("stock", "tuned"):
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{directory / backend}.sqlite3",
+            "SQLITE_TUNED": str(backend == "tuned"),
+        }
+        output = subprocess.run(
+            [sys.executable, __file__, *sys.argv[1:], "--backend", backend],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        report.append(json.loads(output.splitlines()[-1]))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""orjson-backed drop-ins for DRF's JSON renderer and parser.
+
+Both defer to the stdlib-based DRF classes whenever orjson isn't installed
+or the request needs something orjson doesn't do (indented output, ASCII
+escaping, non-UTF-8 bodies). Otherwise the output is the same except for
+floats:
+
+- exponents are written in their shortest form, ``1e16`` and ``1e-6``
+  where DRF writes ``1e+16`` and ``1e-06``; both parse to the same number;
+- NaN and infinities, which orjson would write as ``null``, go to DRF's
+  renderer, which refuses them with ``ValueError``.
+"""
+
+from __future__ import annotations
+
+import codecs
+import math
+from typing import Any, IO, Mapping
+
+from django.conf import settings
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+ORJSON_OPTIONS = (
+    0
+    if orjson is None
+    else orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+
+
+def has_non_finite_float(value: Any) -> bool:
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(has_non_finite_float(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(has_non_finite_float(item) for item in value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: Mapping[str, Any] | None = None,
+    ) -> bytes:
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Datetimes and dataclasses are passed through to the DRF encoder so
+        # they format exactly as JSONRenderer would.
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Non-finite floats came out as null; only look for them if so.
+        if b"null" in ret and has_non_finite_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safety escaping as JSONRenderer.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(
+        self,
+        stream: IO[Any],
+        media_type: str | None = None,
+        parser_context: Mapping[str, Any] | None = None,
+    ) -> Any:
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,267 @@
+"""Opt-in per-request query and timing instrumentation.
+
+``RequestMetricsMiddleware`` is only installed when ``REQUEST_METRICS`` is
+on, so it costs nothing otherwise. For each request it records:
+
+- the number of queries and the total DB time, through a connection
+  ``execute_wrapper``;
+- ``serialize``: time spent in the view but not in the database, which for
+  DRF views is mostly serializer work;
+- ``render``: time taken to render the response;
+- the response size.
+
+Each response gets a ``Server-Timing`` header, and each request writes one
+JSON log line. A request that repeats the same SQL shape
+``N_PLUS_ONE_THRESHOLD`` times or more is flagged as a likely N+1. Per-route
+latency histograms are kept per process and served to staff through
+``RouteMetricsView``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from typing import Any, Callable
+
+from django.db import connections
+from django.http import HttpRequest, HttpResponseBase
+from drf_spectacular.utils import extend_schema
+from rest_framework import permissions, serializers
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+N_PLUS_ONE_THRESHOLD = 5
+# Upper bounds, in milliseconds, of the latency histogram buckets.
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_IN_LIST = re.compile(r"\((?:%s, )+%s\)")
+
+
+def sql_shape(sql: str) -> str:
+    """``sql`` with variable-length ``IN (%s, ...)`` lists collapsed."""
+    return _IN_LIST.sub("(%s...)", sql)
+
+
+class RequestMetrics:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+        self.view_started: float | None = None
+        self.view_db_seconds = 0.0
+        self.view_seconds: float | None = None
+        self.render_seconds: float | None = None
+
+    def record_query(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+            self.shapes[sql_shape(sql)] += 1
+
+    def start_view(self) -> None:
+        self.view_started = time.perf_counter()
+        self.view_db_seconds = self.db_seconds
+
+    def end_view(self) -> None:
+        if self.view_started is not None and self.view_seconds is None:
+            self.view_seconds = time.perf_counter() - self.view_started
+            self.view_db_seconds = self.db_seconds - self.view_db_seconds
+
+    def repeated_shapes(self) -> list[tuple[str, int]]:
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= N_PLUS_ONE_THRESHOLD
+        ]
+
+
+class RouteHistograms:
+    """Thread-safe, per-process latency and query aggregates per route."""
+
+    def __init__(self) -> None:
+        self._routes: dict[tuple[str, str], dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, route: str, method: str, duration_ms: float, metrics: RequestMetrics
+    ) -> None:
+        with self._lock:
+            entry = self._routes.setdefault(
+                (route, method),
+                {
+                    "route": route,
+                    "method": method,
+                    "requests": 0,
+                    "queries_total": 0,
+                    "queries_max": 0,
+                    "db_ms_total": 0.0,
+                    "n_plus_one": 0,
+                    "buckets": [0] * (len(DURATION_BUCKETS_MS) + 1),
+                },
+            )
+            entry["requests"] += 1
+            entry["queries_total"] += metrics.queries
+            entry["queries_max"] = max(entry["queries_max"], metrics.queries)
+            entry["db_ms_total"] += metrics.db_seconds * 1000
+            entry["n_plus_one"] += bool(metrics.repeated_shapes())
+            index = next(
+                (i for i, bound in enumerate(DURATION_BUCKETS_MS) if duration_ms <= bound),
+                len(DURATION_BUCKETS_MS),
+            )
+            entry["buckets"][index] += 1
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._lock:
+            entries = [dict(entry) for entry in self._routes.values()]
+        bounds: list[float | None] = [*DURATION_BUCKETS_MS, None]
+        return [
+            {
+                "route": entry["route"],
+                "method": entry["method"],
+                "requests": entry["requests"],
+                "queries_avg": entry["queries_total"] / entry["requests"],
+                "queries_max": entry["queries_max"],
+                "db_ms_avg": entry["db_ms_total"] / entry["requests"],
+                "n_plus_one": entry["n_plus_one"],
+                "duration_ms_buckets": [
+                    {"le": bound, "count": count}
+                    for bound, count in zip(bounds, entry["buckets"])
+                ],
+            }
+            for entry in sorted(entries, key=lambda e: (e["route"], e["method"]))
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+route_histograms = RouteHistograms()
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponseBase]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        metrics = RequestMetrics()
+        request._metrics = metrics  # type: ignore[attr-defined]
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics.record_query))
+            response = self.get_response(request)
+        metrics.end_view()
+        self.finish(request, response, metrics)
+        return response
+
+    def process_view(self, request: HttpRequest, *args: Any) -> None:
+        request._metrics.start_view()  # type: ignore[attr-defined]
+
+    def process_template_response(
+        self, request: HttpRequest, response: Any
+    ) -> Any:
+        # DRF responses render after the view returns; split that out.
+        metrics: RequestMetrics = request._metrics  # type: ignore[attr-defined]
+        metrics.end_view()
+        render_started = time.perf_counter()
+
+        def rendered(response: Any) -> None:
+            metrics.render_seconds = time.perf_counter() - render_started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def finish(
+        self, request: HttpRequest, response: HttpResponseBase, metrics: RequestMetrics
+    ) -> None:
+        total_ms = (time.perf_counter() - metrics.started) * 1000
+        db_ms = metrics.db_seconds * 1000
+        serialize_ms = max(
+            ((metrics.view_seconds or 0) - metrics.view_db_seconds) * 1000, 0
+        )
+        render_ms = (metrics.render_seconds or 0) * 1000
+        size = None if response.streaming else len(response.content)  # type: ignore[attr-defined]
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={db_ms:.1f};desc="{metrics.queries} queries"',
+                f"serialize;dur={serialize_ms:.1f}",
+                f"render;dur={render_ms:.1f}",
+                f"total;dur={total_ms:.1f}",
+            ]
+        )
+
+        match = request.resolver_match
+        # URL names are stabler labels than router regexes ("note-detail").
+        route = (match.view_name or match.route) if match is not None else "<unmatched>"
+        route_histograms.record(route, request.method or "", total_ms, metrics)
+
+        repeated = metrics.repeated_shapes()
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "route": route,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            "db_ms": round(db_ms, 2),
+            "serialize_ms": round(serialize_ms, 2),
+            "render_ms": round(render_ms, 2),
+            "total_ms": round(total_ms, 2),
+            "bytes": size,
+        }
+        if repeated:
+            record["n_plus_one"] = [
+                {"sql": shape, "count": count} for shape, count in repeated
+            ]
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+
+
+class DurationBucketSerializer(serializers.Serializer[Any]):
+    le = serializers.FloatField(
+        allow_null=True, help_text="Bucket upper bound in ms; null is +Inf."
+    )
+    count = serializers.IntegerField()
+
+
+class RouteMetricsSerializer(serializers.Serializer[Any]):
+    route = serializers.CharField()
+    method = serializers.CharField()
+    requests = serializers.IntegerField()
+    queries_avg = serializers.FloatField()
+    queries_max = serializers.IntegerField()
+    db_ms_avg = serializers.FloatField()
+    n_plus_one = serializers.IntegerField(
+        help_text="Requests flagged for repeated identical SQL."
+    )
+    duration_ms_buckets = DurationBucketSerializer(many=True)
+
+
+@extend_schema(responses=RouteMetricsSerializer(many=True))
+class RouteMetricsView(APIView):
+    """Per-route request metrics for this process (staff only)."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request: Request) -> Response:
+        return Response(RouteMetricsSerializer(route_histograms.snapshot(), many=True).data)
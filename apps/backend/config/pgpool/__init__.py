@@ -0,0 +1,5 @@
+"""PostgreSQL backend with a per-process connection pool.
+
+Set ``ENGINE`` to ``config.pgpool`` (``DATABASE_POOL=True`` does this for
+every PostgreSQL alias). See ``config.pgpool.pool``.
+"""
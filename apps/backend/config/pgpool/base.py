@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Any
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+
+from config.pgpool.pool import (
+    DEFAULT_CHECK_AFTER,
+    DEFAULT_MAX_IDLE,
+    DEFAULT_MAX_LIFETIME,
+    DEFAULT_MAX_SIZE,
+    DEFAULT_MIN_SIZE,
+    DEFAULT_TIMEOUT,
+    ConnectionPool,
+    get_pool,
+)
+
+
+def connect(database: Any, conn_params: dict[str, Any], options: dict[str, Any]) -> Any:
+    # As Django's get_new_connection, minus setting the wrapper's state.
+    connection = database.connect(**conn_params)
+    if "isolation_level" in options:
+        connection.isolation_level = IsolationLevel(options["isolation_level"])
+    if not is_psycopg3:
+        base.psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+    return connection
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Checks connections out of the alias's pool instead of opening them.
+
+    Closing, which Django does at the end of each request with
+    ``CONN_MAX_AGE = 0``, returns the connection to the pool.
+    """
+
+    @property
+    def pool(self) -> ConnectionPool:
+        # Keyed by target too: the test runner repoints aliases at test
+        # databases after first connecting.
+        key = tuple(self.settings_dict[k] for k in ("NAME", "USER", "HOST", "PORT"))
+        return get_pool((self.alias, *key), self.create_pool)
+
+    def create_pool(self) -> ConnectionPool:
+        options = self.settings_dict.get("POOL", {})
+        return ConnectionPool(
+            self.alias,
+            partial(
+                connect,
+                self.Database,
+                self.get_connection_params(),
+                self.settings_dict["OPTIONS"],
+            ),
+            min_size=options.get("MIN_SIZE", DEFAULT_MIN_SIZE),
+            max_size=options.get("MAX_SIZE", DEFAULT_MAX_SIZE),
+            timeout=options.get("TIMEOUT", DEFAULT_TIMEOUT),
+            max_idle=options.get("MAX_IDLE", DEFAULT_MAX_IDLE),
+            max_lifetime=options.get("MAX_LIFETIME", DEFAULT_MAX_LIFETIME),
+            check_after=options.get("CHECK_AFTER", DEFAULT_CHECK_AFTER),
+        )
+
+    def get_new_connection(self, conn_params: dict[str, Any]) -> Any:
+        self.isolation_level = IsolationLevel(
+            self.settings_dict["OPTIONS"].get(
+                "isolation_level", IsolationLevel.READ_COMMITTED
+            )
+        )
+        return self.pool.acquire()
+
+    def _close(self) -> None:
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                # Django keeps using the connection to roll back; it can't
+                # go to another thread.
+                self.pool.discard(self.connection)
+            else:
+                self.pool.release(self.connection)
@@ -0,0 +1,280 @@
+"""A bounded, thread-safe pool of database connections.
+
+Django opens a connection per thread and, with ``CONN_MAX_AGE``, keeps it
+for that thread alone. Under threaded or async workers that means a new
+connection (and TLS handshake) for every fresh thread on a spike, and
+connections adding up past the server's ``max_connections``. A pool caps
+the process at ``max_size`` connections and hands them from thread to
+thread:
+
+- checkout takes the most recently returned idle connection, opens a new
+  one while below ``max_size``, or waits up to ``timeout`` seconds and
+  raises ``PoolTimeout``;
+- a connection idle for ``check_after`` seconds is checked before it's
+  handed out, and replaced if it's dead;
+- returned connections are rolled back; those older than
+  ``max_lifetime`` are closed, as are idle ones past ``max_idle`` while
+  the pool is above ``min_size``.
+
+``stats()`` reports the pool's size and counters, for ``PoolMetricsView``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable
+
+import psycopg2
+from psycopg2 import extensions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_SIZE = 2
+DEFAULT_MAX_SIZE = 10
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MAX_IDLE = 300.0
+DEFAULT_MAX_LIFETIME = 3600.0
+DEFAULT_CHECK_AFTER = 30.0
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No connection came free in time. Django reports it as OperationalError."""
+
+
+@dataclass
+class PooledConnection:
+    connection: Any
+    opened_at: float = field(default_factory=time.monotonic)
+    returned_at: float = field(default_factory=time.monotonic)
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], Any],
+        *,
+        min_size: int = DEFAULT_MIN_SIZE,
+        max_size: int = DEFAULT_MAX_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_idle: float = DEFAULT_MAX_IDLE,
+        max_lifetime: float = DEFAULT_MAX_LIFETIME,
+        check_after: float = DEFAULT_CHECK_AFTER,
+    ) -> None:
+        self.name = name
+        self.connect = connect
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self._idle: deque[PooledConnection] = deque()
+        self._in_use: dict[int, PooledConnection] = {}
+        self._size = 0  # idle + in use + being opened
+        self._waiting = 0
+        self._filled = False
+        self._lock = threading.Condition()
+        self.counters = dict.fromkeys(
+            ("checkouts", "opened", "closed", "timeouts", "failed_checks"), 0
+        )
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def acquire(self) -> Any:
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            pooled = self._take(deadline)
+            if pooled is None:
+                # A slot was reserved; open the connection outside the lock.
+                pooled = self._open()
+            elif (
+                time.monotonic() - pooled.returned_at >= self.check_after
+                and not self._usable(pooled.connection)
+            ):
+                with self._lock:
+                    self.counters["failed_checks"] += 1
+                self._discard(pooled)
+                continue
+            break
+        waited = time.monotonic() - started
+        with self._lock:
+            self._in_use[id(pooled.connection)] = pooled
+            self.counters["checkouts"] += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            fill = not self._filled and self._size < self.min_size
+            self._filled = True
+        if fill:
+            threading.Thread(target=self._fill, daemon=True).start()
+        return pooled.connection
+
+    def release(self, connection: Any) -> None:
+        with self._lock:
+            pooled = self._in_use.pop(id(connection), None)
+        if pooled is None:
+            self._close(connection)
+            return
+        now = time.monotonic()
+        try:
+            self.reset(connection)
+        except Exception:
+            logger.warning("Discarding a connection that failed to reset")
+            self._discard(pooled)
+            return
+        if now - pooled.opened_at >= self.max_lifetime:
+            self._discard(pooled)
+            return
+        pooled.returned_at = now
+        with self._lock:
+            self._idle.append(pooled)
+            expired = []
+            while (
+                self._idle
+                and self._size - len(expired) > self.min_size
+                and now - self._idle[0].returned_at >= self.max_idle
+            ):
+                expired.append(self._idle.popleft())
+            self._lock.notify()
+        for stale in expired:
+            self._discard(stale)
+
+    def discard(self, connection: Any) -> None:
+        """Close a checked-out connection instead of returning it."""
+        with self._lock:
+            pooled = self._in_use.pop(id(connection), None)
+        if pooled is None:
+            self._close(connection)
+        else:
+            self._discard(pooled)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "waiting": self._waiting,
+                **self.counters,
+                "wait_ms_avg": round(
+                    self.wait_seconds_total * 1000 / max(self.counters["checkouts"], 1),
+                    3,
+                ),
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+
+    # psycopg2 specifics.
+
+    def check(self, connection: Any) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+    def reset(self, connection: Any) -> None:
+        status = connection.info.transaction_status
+        if connection.closed or status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            raise psycopg2.InterfaceError("connection is broken")
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            connection.rollback()
+
+    def _take(self, deadline: float) -> PooledConnection | None:
+        """An idle connection, or None once a slot for a new one is reserved."""
+        with self._lock:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No connection free in pool {self.name!r} after "
+                        f"{self.timeout}s ({self.max_size} in use)"
+                    )
+                self._waiting += 1
+                self._lock.wait(remaining)
+                self._waiting -= 1
+
+    def _open(self) -> PooledConnection:
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+        with self._lock:
+            self.counters["opened"] += 1
+        return PooledConnection(connection)
+
+    def _fill(self) -> None:
+        while True:
+            with self._lock:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                pooled = self._open()
+            except Exception:
+                logger.warning("Could not open connections for pool %s", self.name)
+                return
+            with self._lock:
+                self._idle.appendleft(pooled)
+                self._lock.notify()
+
+    def _usable(self, connection: Any) -> bool:
+        try:
+            self.check(connection)
+        except Exception:
+            return False
+        return True
+
+    def _discard(self, pooled: PooledConnection) -> None:
+        self._close(pooled.connection)
+        with self._lock:
+            self._size -= 1
+            self.counters["closed"] += 1
+            self._lock.notify()
+
+    @staticmethod
+    def _close(connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_pools: dict[Hashable, ConnectionPool] = {}
+_pools_pid = os.getpid()
+_pools_lock = threading.Lock()
+
+
+def get_pool(key: Hashable, create: Callable[[], ConnectionPool]) -> ConnectionPool:
+    """The process's pool for ``key``, made by ``create`` on first use."""
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Forked (e.g. gunicorn --preload): the parent's connections
+            # aren't ours to use or close.
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = create()
+        return pool
+
+
+def pool_stats() -> list[dict[str, Any]]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Any
+
+from drf_spectacular.utils import extend_schema
+from rest_framework import permissions, serializers
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from config.pgpool.pool import pool_stats
+
+
+class PoolMetricsSerializer(serializers.Serializer[Any]):
+    name = serializers.CharField(help_text="Database alias.")
+    min_size = serializers.IntegerField()
+    max_size = serializers.IntegerField()
+    size = serializers.IntegerField(help_text="Open connections, idle or in use.")
+    idle = serializers.IntegerField()
+    in_use = serializers.IntegerField()
+    waiting = serializers.IntegerField(help_text="Threads waiting for a connection.")
+    checkouts = serializers.IntegerField()
+    opened = serializers.IntegerField()
+    closed = serializers.IntegerField()
+    timeouts = serializers.IntegerField()
+    failed_checks = serializers.IntegerField()
+    wait_ms_avg = serializers.FloatField()
+    wait_ms_max = serializers.FloatField()
+
+
+@extend_schema(responses=PoolMetricsSerializer(many=True))
+class PoolMetricsView(APIView):
+    """Connection pool metrics for this process (staff only)."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request: Request) -> Response:
+        return Response(PoolMetricsSerializer(pool_stats(), many=True).data)
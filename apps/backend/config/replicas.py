@@ -0,0 +1,144 @@
+"""Read-replica routing with read-your-writes.
+
+Installed when ``DATABASE_REPLICAS`` names at least one alias. Reads made
+while serving a safe request (GET, HEAD, OPTIONS) go to a replica, picked
+once per request so a count and the rows it counts agree. Everything else
+stays on ``default``:
+
+- unsafe requests, and the rest of any request once it has written;
+- requests from a user who wrote within ``DATABASE_REPLICA_PIN_SECONDS``,
+  so nobody reads back an older copy of their own notes. The pin is a
+  cache key, shared between processes when the cache is (``REDIS_URL``);
+- code running outside a request, such as management commands.
+
+Replicas lagging more than ``DATABASE_REPLICA_MAX_LAG`` seconds, or whose
+lag can't be read, are skipped until the next check; with none left reads
+fall back to ``default``. Lag is measured on PostgreSQL only; other
+backends, e.g. a SQLite alias pointing at the primary's file for local
+testing, count as current.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.db.models import Model
+from django.http import HttpRequest, HttpResponseBase
+
+from config.routing import RequestContextMiddleware, current_request, request_user_id
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Seconds between lag checks of a replica, per process.
+LAG_CHECK_INTERVAL = 5.0
+
+# Zero while the replica has replayed everything it received.
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+"""
+
+# alias -> (lag in seconds or None when unknown, monotonic time checked)
+_lag_checks: dict[str, tuple[float | None, float]] = {}
+
+
+def pin_cache_key(user_id: int) -> str:
+    return f"replicas:pinned:{user_id}"
+
+
+def pin_to_primary(user_id: int) -> None:
+    cache.set(pin_cache_key(user_id), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def replica_lag(alias: str) -> float:
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRES_LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def replica_is_current(alias: str) -> bool:
+    now = time.monotonic()
+    checked = _lag_checks.get(alias)
+    if checked is None or now - checked[1] >= LAG_CHECK_INTERVAL:
+        try:
+            lag: float | None = replica_lag(alias)
+        except DatabaseError:
+            logger.warning("Could not read the lag of replica %s", alias)
+            lag = None
+        checked = _lag_checks[alias] = (lag, now)
+    return checked[0] is not None and checked[0] <= settings.DATABASE_REPLICA_MAX_LAG
+
+
+class ReplicaRouter:
+    def db_for_read(self, model: type[Model], **hints: Any) -> str | None:
+        request = current_request.get()
+        if (
+            request is None
+            or request.method not in SAFE_METHODS
+            or request._replica_wrote  # type: ignore[attr-defined]
+        ):
+            return None
+        user_id = request_user_id(request)
+        if user_id is not None and request._replica_pinned is None:  # type: ignore[attr-defined]
+            request._replica_pinned = cache.get(pin_cache_key(user_id), False)  # type: ignore[attr-defined]
+        if request._replica_pinned:  # type: ignore[attr-defined]
+            return None
+        if request._replica is None:  # type: ignore[attr-defined]
+            current = [a for a in settings.DATABASE_REPLICAS if replica_is_current(a)]
+            request._replica = random.choice(current) if current else "default"  # type: ignore[attr-defined]
+        return request._replica  # type: ignore[attr-defined]
+
+    def db_for_write(self, model: type[Model], **hints: Any) -> str | None:
+        request = current_request.get()
+        if request is not None:
+            request._replica_wrote = True  # type: ignore[attr-defined]
+        return None
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints: Any) -> bool | None:
+        # Replicas hold the same rows as the primary.
+        aliases = {"default", *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, **hints: Any) -> bool | None:
+        return False if db in settings.DATABASE_REPLICAS else None
+
+
+class ReplicaRoutingMiddleware(RequestContextMiddleware):
+    """Makes the request visible to ``ReplicaRouter`` and pins writers.
+
+    Streaming responses are read after this returns, so their rows come
+    from ``default`` unless the view picked a database up front, as
+    ``notes.streaming`` does.
+    """
+
+    def process_request(self, request: HttpRequest) -> None:
+        super().process_request(request)
+        request._replica_wrote = False  # type: ignore[attr-defined]
+        request._replica_pinned = None  # type: ignore[attr-defined]
+        request._replica = None  # type: ignore[attr-defined]
+
+    def process_response(
+        self, request: HttpRequest, response: HttpResponseBase
+    ) -> HttpResponseBase:
+        user_id = request_user_id(request)
+        if user_id is not None and (
+            request._replica_wrote or request.method not in SAFE_METHODS  # type: ignore[attr-defined]
+        ):
+            pin_to_primary(user_id)
+        return response
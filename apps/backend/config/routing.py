@@ -0,0 +1,73 @@
+"""Request context for the database routers.
+
+``config.replicas`` and ``config.sharding`` both route by who is asking,
+but Django routers only see a model and hints. ``RequestContextMiddleware``
+makes the current request visible to them.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpRequest, HttpResponseBase
+
+current_request: ContextVar[HttpRequest | None] = ContextVar(
+    "current_request", default=None
+)
+
+
+def request_user_id(request: HttpRequest) -> int | None:
+    # DRF sets request.user once it has authenticated, replacing the lazy
+    # session user; that one is never touched here since resolving it
+    # would itself query.
+    user = request.__dict__.get("user")
+    if user is None or user is request._initial_user:  # type: ignore[attr-defined]
+        return None
+    return user.pk
+
+
+class RequestContextMiddleware:
+    """Streaming responses are read after this returns, outside the context.
+
+    Like Django's own middleware it runs either way, so async views under
+    ASGI aren't pushed through a thread on its account. Subclasses extend
+    ``process_request`` and ``process_response``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.process_request(request)
+        token = current_request.set(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        self.process_request(request)
+        token = current_request.set(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        return self.process_response(request, response)
+
+    def process_request(self, request: HttpRequest) -> None:
+        request._initial_user = request.__dict__.get("user")  # type: ignore[attr-defined]
+
+    def process_response(
+        self, request: HttpRequest, response: HttpResponseBase
+    ) -> HttpResponseBase:
+        return response
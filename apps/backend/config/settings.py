@@ -1,5 +1,6 @@
 from pathlib import Path
 from datetime import timedelta
+import importlib.util
 import os
 
 import dj_database_url  # type: ignore
@@ -45,6 +46,21 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Opt-in request instrumentation: query counts, DB/serialize/render timings
+# as Server-Timing headers and JSON log lines, N+1 flags, and per-route
+# histograms at /api/metrics/routes/. Not installed at all when off.
+REQUEST_METRICS = os.getenv("REQUEST_METRICS", "False") == "True"
+if REQUEST_METRICS:
+    MIDDLEWARE.insert(0, "config.instrumentation.RequestMetricsMiddleware")
+    LOGGING = {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "handlers": {"console": {"class": "logging.StreamHandler"}},
+        "loggers": {
+            "config.instrumentation": {"handlers": ["console"], "level": "INFO"},
+        },
+    }
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -80,6 +96,89 @@ else:
         }
     }
 
+# Opt-in read replicas (config.replicas): comma-separated database URLs,
+# added as replica_1, replica_2, ... Safe reads go to a replica unless the
+# user wrote within DATABASE_REPLICA_PIN_SECONDS; keep that above the
+# allowed lag. A replica further behind than DATABASE_REPLICA_MAX_LAG
+# seconds is skipped. Tests mirror the replicas onto default.
+DATABASE_REPLICAS = []
+for _index, _url in enumerate(os.getenv("DATABASE_REPLICA_URLS", "").split(","), 1):
+    if _url.strip():
+        DATABASES[f"replica_{_index}"] = {
+            **dj_database_url.parse(
+                _url.strip(), conn_max_age=600, conn_health_checks=True
+            ),
+            "TEST": {"MIRROR": "default"},
+        }
+        DATABASE_REPLICAS.append(f"replica_{_index}")
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv("DATABASE_REPLICA_PIN_SECONDS", "10"))
+DATABASE_REPLICA_MAX_LAG = float(os.getenv("DATABASE_REPLICA_MAX_LAG", "5"))
+DATABASE_ROUTERS = []
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS.append("config.replicas.ReplicaRouter")
+    MIDDLEWARE.append("config.replicas.ReplicaRoutingMiddleware")
+
+# Opt-in sharding of notes by user (config.sharding): comma-separated
+# database URLs, added as shard_1, shard_2, ... default keeps the users
+# and places new ones on a shard by consistent hashing. Set up new shards
+# with `manage.py migrate_shards`; `manage.py rebalance_shards` moves users
+# after the list changes. Notes then ignore the replicas above.
+DATABASE_SHARDS = []
+for _index, _url in enumerate(os.getenv("DATABASE_SHARD_URLS", "").split(","), 1):
+    if _url.strip():
+        DATABASES[f"shard_{_index}"] = dj_database_url.parse(
+            _url.strip(), conn_max_age=600, conn_health_checks=True
+        )
+        DATABASE_SHARDS.append(f"shard_{_index}")
+if DATABASE_SHARDS:
+    DATABASE_ROUTERS.insert(0, "config.sharding.ShardRouter")
+    if "config.replicas.ReplicaRoutingMiddleware" not in MIDDLEWARE:
+        MIDDLEWARE.append("config.routing.RequestContextMiddleware")
+
+# Opt-in tuned SQLite (config.sqlite) for deployments without Postgres: WAL,
+# relaxed fsync, a busy timeout, mmap and BEGIN IMMEDIATE transactions, so
+# several workers can share the file.
+SQLITE_TUNED = os.getenv("SQLITE_TUNED", "False") == "True"
+if SQLITE_TUNED:
+    for _database in DATABASES.values():
+        if _database["ENGINE"] == "django.db.backends.sqlite3":
+            _database["ENGINE"] = "config.sqlite"
+
+# Opt-in connection pooling for PostgreSQL aliases (config.pgpool): each
+# process keeps between DATABASE_POOL_MIN_SIZE and DATABASE_POOL_MAX_SIZE
+# connections per alias and hands them from request to request. Keep
+# processes x max size under the server's max_connections.
+DATABASE_POOL = os.getenv("DATABASE_POOL", "False") == "True"
+if DATABASE_POOL:
+    for _database in DATABASES.values():
+        if _database["ENGINE"] == "django.db.backends.postgresql":
+            _database.update(
+                ENGINE="config.pgpool",
+                CONN_MAX_AGE=0,
+                CONN_HEALTH_CHECKS=False,
+                POOL={
+                    "MIN_SIZE": int(os.getenv("DATABASE_POOL_MIN_SIZE", "2")),
+                    "MAX_SIZE": int(os.getenv("DATABASE_POOL_MAX_SIZE", "10")),
+                    "TIMEOUT": float(os.getenv("DATABASE_POOL_TIMEOUT", "10")),
+                },
+            )
+
+# Cache: shared Redis in production so invalidation reaches every worker;
+# per-process memory otherwise.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 AUTH_USER_MODEL = "accounts.User"
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -97,6 +196,21 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Argon2 when argon2-cffi is installed, scrypt otherwise. Hashes made by an
+# older hasher or with older parameters are upgraded on the next login.
+PASSWORD_HASHERS = [
+    "accounts.hashers.Argon2PasswordHasher",
+    "accounts.hashers.ScryptPasswordHasher",
+    "accounts.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+if importlib.util.find_spec("argon2") is None:
+    PASSWORD_HASHERS.remove("accounts.hashers.Argon2PasswordHasher")
+
+# Size of the per-process pool that password hashing runs on; 0 hashes on
+# the request thread. Only useful with threaded workers (gunicorn --threads).
+PASSWORD_HASHING_THREADS = int(os.getenv("PASSWORD_HASHING_THREADS", "0"))
+
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
 USE_I18N = True
@@ -121,12 +235,66 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Opt-in fast JSON path: orjson rendering/parsing plus a .values()-based
+# read path for note lists. Note lists are byte-for-byte identical either
+# way; config.fastjson lists where other output can differ.
+FAST_JSON = os.getenv("FAST_JSON", "False") == "True"
+if FAST_JSON:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [
+        "config.fastjson.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ]
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"] = [
+        "config.fastjson.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ]
+
+# Opt-in streaming for unpaginated note lists (notes.streaming): rows are
+# read, serialized and, with COMPRESS_RESPONSES, compressed in chunks instead
+# of buffered whole.
+STREAM_LISTS = os.getenv("STREAM_LISTS", "False") == "True"
+
+# Opt-in Brotli/gzip compression of API responses (config.compression).
+# Auth responses are left alone: they carry tokens next to user input.
+COMPRESS_RESPONSES = os.getenv("COMPRESS_RESPONSES", "False") == "True"
+if COMPRESS_RESPONSES:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("whitenoise.middleware.WhiteNoiseMiddleware") + 1,
+        "config.compression.CompressionMiddleware",
+    )
+
+# Opt-in stateless JWT auth: request.user is built from the token's user_id
+# claim and the user row is only loaded when something beyond the id is used.
+STATELESS_JWT = os.getenv("STATELESS_JWT", "False") == "True"
+if STATELESS_JWT:
+    REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"] = [
+        "accounts.authentication.StatelessJWTAuthentication",
+    ]
+
+# Opt-in async read path (notes.async_views). Only useful when served
+# under ASGI, e.g. gunicorn with uvicorn workers; see DEPLOYMENT.md.
+ASYNC_READS = os.getenv("ASYNC_READS", "False") == "True"
+
+# Opt-in change feed at /api/changes/ (notes.changes): note writes record
+# per-user change events, pushed as server-sent events under ASGI. The
+# broker decides how events reach connections held by other processes;
+# see notes.feed.
+CHANGE_FEED = os.getenv("CHANGE_FEED", "False") == "True"
+CHANGE_FEED_BROKER = os.getenv("CHANGE_FEED_BROKER", "notes.feed.DatabaseBroker")
+
+# Opt-in login tracking: every token login records last_login, at the cost
+# of an UPDATE. prune_default_categories needs it to tell dormant users
+# apart and refuses to run without it.
+TRACK_LOGINS = os.getenv("TRACK_LOGINS", "False") == "True"
+
 # SimpleJWT
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=24),
     "REFRESH_TOKEN_LIFETIME": timedelta(hours=24),
     "ROTATE_REFRESH_TOKENS": False,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "UPDATE_LAST_LOGIN": TRACK_LOGINS,
 }
 
 # drf-spectacular
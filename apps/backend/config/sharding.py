@@ -0,0 +1,333 @@
+"""Horizontal sharding of notes data by user.
+
+Installed when ``DATABASE_SHARDS`` names at least one alias. ``default``
+stays the directory: users, sessions and admin tables live there only.
+Everything a user owns in the notes app (categories, notes, tombstones,
+revisions and change events) lives on one database, recorded in
+``User.shard``:
+
+- new users are placed on signup by a consistent-hash ring over the
+  shards, so adding a shard re-homes only about 1/N of them;
+- users created before sharding have a blank ``shard`` and keep their
+  rows on ``default`` until they're moved.
+
+``move_user`` moves one user online: their writes get a 503 for the few
+seconds the rows take to copy, while reads carry on. ``rebalance_shards``
+moves every user the ring now places elsewhere. Web workers learn of the
+freeze and the new location through the cache, so moves need one shared
+by every process (``REDIS_URL``).
+
+Every database has the full schema (``migrate_shards``). A shard keeps a
+stand-in row for each of its users so foreign keys hold, and each
+database hands out ids from its own range (``reserve_id_range``), so
+rows keep their ids, and clients their references, across moves.
+
+``ShardRouter`` sends notes queries to, in order: the database forced by
+``use_database``/``for_user``; the database of the instance at hand; the
+database of the request's authenticated user. Without any of these it
+raises ``ShardUnknown`` rather than guess, which is also why the admin's
+notes pages don't work while sharding is on.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Iterator
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, transaction
+from django.db.models import Model
+from rest_framework.exceptions import APIException
+
+from accounts.models import User
+from config.routing import current_request, request_user_id
+
+SHARDED_APPS = frozenset({"notes"})
+DIRECTORY = "default"
+# Ids each database hands out start at its position times this, which
+# leaves room for 2**40 rows per table per database within JSON-safe ints.
+ID_RANGE = 2**40
+RING_POINTS_PER_SHARD = 64
+SHARD_CACHE_TIMEOUT = 300
+# How long a move waits for writes already under way before copying.
+MOVE_GRACE_SECONDS = 2.0
+MOVE_FREEZE_TIMEOUT = 600
+
+# Caches that each process keeps to itself.
+PROCESS_LOCAL_CACHES = frozenset(
+    {
+        "django.core.cache.backends.locmem.LocMemCache",
+        "django.core.cache.backends.dummy.DummyCache",
+    }
+)
+
+# Copied in this order so foreign keys always point at copied rows.
+# Change events aren't moved: their ids restart in the new range, and
+# clients resume with a reset.
+MOVED_MODELS = ("notes.Category", "notes.Note", "notes.NoteTombstone", "notes.NoteRevision")
+
+
+class ShardUnknown(RuntimeError):
+    pass
+
+
+class UserMoving(APIException):
+    status_code = 503
+    default_detail = "Your notes are being moved. Try again in a few seconds."
+    default_code = "user_moving"
+
+
+class HashRing:
+    def __init__(self, aliases: list[str], points: int = RING_POINTS_PER_SHARD):
+        self.points = sorted(
+            (_hash(f"{alias}#{i}"), alias) for alias in aliases for i in range(points)
+        )
+        self.keys = [point for point, _ in self.points]
+
+    def get(self, user_id: int) -> str:
+        index = bisect.bisect(self.keys, _hash(str(user_id))) % len(self.keys)
+        return self.points[index][1]
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest())
+
+
+@lru_cache
+def _ring(aliases: tuple[str, ...]) -> HashRing:
+    return HashRing(list(aliases))
+
+
+def sharding_enabled() -> bool:
+    return bool(settings.DATABASE_SHARDS)
+
+
+def ring() -> HashRing:
+    return _ring(tuple(settings.DATABASE_SHARDS))
+
+
+def user_databases() -> list[str]:
+    """Every database that may hold users' notes, in id-range order."""
+    return [DIRECTORY, *settings.DATABASE_SHARDS]
+
+
+def shard_cache_key(user_id: int) -> str:
+    return f"sharding:user:{user_id}"
+
+
+def moving_cache_key(user_id: int) -> str:
+    return f"sharding:moving:{user_id}"
+
+
+def database_for_user(user_id: int) -> str:
+    if not sharding_enabled():
+        return DIRECTORY
+    alias = cache.get(shard_cache_key(user_id))
+    if alias is None:
+        shard = (
+            User.objects.using(DIRECTORY)
+            .filter(pk=user_id)
+            .values_list("shard", flat=True)
+            .first()
+        )
+        alias = shard or DIRECTORY
+        cache.set(shard_cache_key(user_id), alias, SHARD_CACHE_TIMEOUT)
+    return alias
+
+
+_forced: ContextVar[str | None] = ContextVar("sharding_database", default=None)
+
+
+@contextmanager
+def use_database(alias: str) -> Iterator[None]:
+    """Route every notes query in the block to ``alias``."""
+    token = _forced.set(alias)
+    try:
+        yield
+    finally:
+        _forced.reset(token)
+
+
+def for_user(user_id: int) -> Any:
+    """Route every notes query in the block to ``user_id``'s database."""
+    return use_database(database_for_user(user_id))
+
+
+class ShardRouter:
+    def db_for_read(self, model: type[Model], **hints: Any) -> str | None:
+        return self.route(model, hints, write=False)
+
+    def db_for_write(self, model: type[Model], **hints: Any) -> str | None:
+        return self.route(model, hints, write=True)
+
+    def route(self, model: type[Model], hints: dict[str, Any], write: bool) -> str | None:
+        if model._meta.app_label not in SHARDED_APPS:
+            return None
+        forced = _forced.get()
+        if forced is not None:
+            return forced
+        request = current_request.get()
+        request_user = None if request is None else request_user_id(request)
+        if write and request_user is not None and cache.get(moving_cache_key(request_user)):
+            raise UserMoving()
+        instance = hints.get("instance")
+        if isinstance(instance, User):
+            return database_for_user(instance.pk)
+        if instance is not None:
+            if instance._state.db is not None:
+                return instance._state.db
+            if getattr(instance, "user_id", None) is not None:
+                return database_for_user(instance.user_id)
+        if request_user is not None:
+            return database_for_user(request_user)
+        raise ShardUnknown(
+            f"No database known for {model.__name__} here; wrap the code in "
+            "config.sharding.for_user() or use_database()."
+        )
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints: Any) -> bool | None:
+        # Notes rows point at users on the directory; their shard has a
+        # stand-in row with the same id.
+        labels = {obj1._meta.app_label, obj2._meta.app_label}
+        if isinstance(obj1, User) or isinstance(obj2, User):
+            return bool(labels & SHARDED_APPS) or None
+        return None
+
+
+def ensure_stand_in(user: User, alias: str) -> None:
+    """A copy of ``user`` on ``alias`` for foreign keys; it can't log in."""
+    if alias == DIRECTORY or User.objects.using(alias).filter(pk=user.pk).exists():
+        return
+    stand_in = User(
+        **{field.attname: getattr(user, field.attname) for field in User._meta.concrete_fields}
+    )
+    stand_in.password = make_password(None)
+    stand_in.shard = alias
+    stand_in.save_base(using=alias, raw=True, force_insert=True)
+
+
+def place_new_user(instance: User, created: bool, using: str, raw: bool = False, **kwargs: Any) -> None:
+    if not sharding_enabled() or not created or raw or using != DIRECTORY:
+        return
+    alias = ring().get(instance.pk)
+    User.objects.using(DIRECTORY).filter(pk=instance.pk).update(shard=alias)
+    instance.shard = alias
+    ensure_stand_in(instance, alias)
+    cache.set(shard_cache_key(instance.pk), alias, SHARD_CACHE_TIMEOUT)
+
+
+def delete_stand_in(instance: User, using: str, **kwargs: Any) -> None:
+    if not sharding_enabled() or using != DIRECTORY:
+        return
+    alias = database_for_user(instance.pk)
+    if alias != DIRECTORY:
+        # Cascades to the user's rows there.
+        User.objects.using(alias).filter(pk=instance.pk).delete()
+    cache.delete(shard_cache_key(instance.pk))
+
+
+def _owned_rows(model: type[Model], user_id: int, alias: str) -> Any:
+    rows = model._base_manager.using(alias)
+    if model._meta.model_name == "noterevision":
+        return rows.filter(note__user_id=user_id).order_by("pk")
+    return rows.filter(user_id=user_id).order_by("pk")
+
+
+def move_user(user_id: int, target: str, grace: float = MOVE_GRACE_SECONDS) -> int:
+    """Move ``user_id``'s rows to ``target``; returns the rows copied.
+
+    Copying commits on the target before the directory points there, and
+    the source rows go last, so a failure part-way leaves at worst a
+    duplicate copy that isn't in use; running the move again redoes it.
+    """
+    if target not in user_databases():
+        raise ImproperlyConfigured(f"{target!r} is not in DATABASE_SHARDS.")
+    if settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            "Moving users needs a cache shared by every process (REDIS_URL); "
+            "web workers would keep writing to the old database otherwise."
+        )
+    source = database_for_user(user_id)
+    if source == target:
+        return 0
+    user = User.objects.using(DIRECTORY).get(pk=user_id)
+    cache.set(moving_cache_key(user_id), True, MOVE_FREEZE_TIMEOUT)
+    try:
+        time.sleep(grace)
+        copied = 0
+        with transaction.atomic(using=target):
+            ensure_stand_in(user, target)
+            for label in reversed(MOVED_MODELS):
+                _owned_rows(apps.get_model(label), user_id, target).delete()
+            for label in MOVED_MODELS:
+                for row in _owned_rows(apps.get_model(label), user_id, source):
+                    # Raw, as loaddata does: timestamps are kept as they are.
+                    row.save_base(using=target, raw=True, force_insert=True)
+                    copied += 1
+        User.objects.using(DIRECTORY).filter(pk=user_id).update(
+            shard="" if target == DIRECTORY else target
+        )
+        cache.set(shard_cache_key(user_id), target, SHARD_CACHE_TIMEOUT)
+        with transaction.atomic(using=source):
+            if source == DIRECTORY:
+                for label in (*reversed(MOVED_MODELS), "notes.ChangeEvent"):
+                    _owned_rows(apps.get_model(label), user_id, source).delete()
+            else:
+                User.objects.using(source).filter(pk=user_id).delete()
+    finally:
+        cache.delete(moving_cache_key(user_id))
+    return copied
+
+
+def reserve_id_range(alias: str) -> None:
+    """Start ``alias``'s notes tables at its id range unless already past it.
+
+    PostgreSQL sequences then stay in range. SQLite hands out ids above the
+    largest row instead, so rows moved in from a later database drag its
+    ids into that database's range; a later move that would collide fails
+    and rolls back. Use SQLite shards for trying things out only.
+    """
+    start = user_databases().index(alias) * ID_RANGE
+    if start == 0:
+        return
+    connection = connections[alias]
+    models = [
+        model
+        for label in SHARDED_APPS
+        for model in apps.get_app_config(label).get_models()
+    ]
+    with connection.cursor() as cursor:
+        for model in models:
+            table = model._meta.db_table
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+                sequence = cursor.fetchone()[0]
+                cursor.execute(f"SELECT last_value FROM {sequence}")
+                if cursor.fetchone()[0] < start:
+                    cursor.execute("SELECT setval(%s, %s)", [sequence, start])
+            elif connection.vendor == "sqlite":
+                cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = %s", [table])
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute(
+                        "INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)",
+                        [table, start],
+                    )
+                elif row[0] < start:
+                    cursor.execute(
+                        "UPDATE sqlite_sequence SET seq = %s WHERE name = %s",
+                        [start, table],
+                    )
+            else:
+                raise ImproperlyConfigured(
+                    f"Id ranges aren't supported on {connection.vendor}."
+                )
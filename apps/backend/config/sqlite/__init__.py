@@ -0,0 +1,5 @@
+"""SQLite backend tuned for several worker processes sharing one file.
+
+Set ``ENGINE`` to ``config.sqlite`` (``SQLITE_TUNED=True`` does this for
+every SQLite alias). See ``config.sqlite.base``.
+"""
@@ -1,7 +1,11 @@
 from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from config.instrumentation import RouteMetricsView
+from config.pgpool.views import PoolMetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
@@ -11,5 +15,11 @@ urlpatterns = [
         name="swagger-ui",
     ),
     path("api/auth/", include("accounts.urls")),
+    path("api/metrics/routes/", RouteMetricsView.as_view(), name="route-metrics"),
+    path("api/metrics/pools/", PoolMetricsView.as_view(), name="pool-metrics"),
     path("api/", include("notes.urls")),
 ]
+
+if settings.ASYNC_READS:
+    # Ahead of notes.urls so these shadow the router's list and detail routes.
+    urlpatterns.insert(-1, path("api/", include("notes.async_urls")))
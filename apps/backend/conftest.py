@@ -1,8 +1,25 @@
+from contextlib import contextmanager
+
 import pytest
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import caches
+
+    from accounts.authentication import user_cache
+
+    for alias in caches:
+        caches[alias].clear()
+    user_cache.clear()
+    yield
+    for alias in caches:
+        caches[alias].clear()
+    user_cache.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -20,3 +37,30 @@ def authenticated_client(api_client, user):
     refresh = RefreshToken.for_user(user)
     api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
     return api_client
+
+
+@pytest.fixture
+def assert_max_queries(db):
+    """``with assert_max_queries(n) as queries:`` fails past ``n`` queries.
+
+    ``queries`` is filled with the SQL the block ran once it exits.
+    Savepoints come from the test's own transaction and are not counted.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    @contextmanager
+    def check(budget):
+        queries = []
+        with CaptureQueriesContext(connection) as ctx:
+            yield queries
+        queries.extend(
+            q["sql"]
+            for q in ctx.captured_queries
+            if not q["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+        )
+        assert len(queries) <= budget, (
+            f"{len(queries)} queries, budget is {budget}:\n" + "\n".join(queries)
+        )
+
+    return check
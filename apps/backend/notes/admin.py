@@ -1,11 +1,19 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+
 from django.contrib import admin
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import HttpRequest
 
-from notes.models import Category, Note
+from notes.models import Category, Note, adjust_category_note_counts
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):  # type: ignore[type-arg]
-    list_display = ('name', 'color', 'user')
+    list_display = ('name', 'color', 'user', 'is_default', 'note_count')
+    readonly_fields = ('note_count',)
     list_filter = ('user',)
     search_fields = ('name', 'user__email')
 
@@ -15,3 +23,14 @@ class NoteAdmin(admin.ModelAdmin):  # type: ignore[type-arg]
     list_display = ('title', 'category', 'user', 'updated_at')
     list_filter = ('category', 'user')
     search_fields = ('title', 'user__email')
+
+    def delete_queryset(self, request: HttpRequest, queryset: QuerySet[Note]) -> None:
+        # "Delete selected" deletes the queryset, which skips Note.delete()
+        # and the note counts it keeps.
+        with transaction.atomic(using=queryset.db):
+            deltas: defaultdict[int, Counter[int | None]] = defaultdict(Counter)
+            for user_id, category_id in queryset.values_list('user_id', 'category_id'):
+                deltas[user_id][category_id] -= 1
+            super().delete_queryset(request, queryset)
+            for user_id, user_deltas in deltas.items():
+                adjust_category_note_counts(user_id, user_deltas)
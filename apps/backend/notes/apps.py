@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self) -> None:
+        from notes import signals
+        from notes.models import Category
+
+        post_migrate.connect(signals.ensure_search_index, sender=self)
+        post_save.connect(signals.invalidate_category_cache, sender=Category)
+        post_delete.connect(signals.invalidate_category_cache, sender=Category)
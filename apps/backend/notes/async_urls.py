@@ -0,0 +1,15 @@
+from django.urls import path
+
+from notes.async_views import (
+    CategoryDetailAsyncView,
+    CategoryListAsyncView,
+    NoteDetailAsyncView,
+    NoteListAsyncView,
+)
+
+urlpatterns = [
+    path('categories/', CategoryListAsyncView.as_view()),
+    path('categories/<int:pk>/', CategoryDetailAsyncView.as_view()),
+    path('notes/', NoteListAsyncView.as_view()),
+    path('notes/<int:pk>/', NoteDetailAsyncView.as_view()),
+]
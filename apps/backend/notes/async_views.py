@@ -0,0 +1,347 @@
+"""Async-native read path for notes and categories.
+
+DRF views are sync, so under ASGI each request holds a worker thread for
+its whole duration. These views serve the hot, plain GETs (list and
+retrieve) with Django's async ORM and hand every other request, including
+paginated and conditional writes, to the regular DRF viewsets so behaviour
+stays identical.
+
+``ChangeStreamApp`` goes further for the change feed's server-sent event
+stream: it answers in front of Django's ASGI handler, which in Django 4.2
+keeps a thread busy for as long as a streaming response is open and never
+notices the client leaving.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+from typing import Any, Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Max
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from accounts.models import User
+from notes.cache import (
+    CATEGORY_LIST_CACHE_TIMEOUT,
+    category_list_cache_key,
+    category_list_entry,
+)
+from notes.changes import changes_after
+from notes.conditional import make_etag, note_list_etag
+from notes.feed import CHANGE_EVENT_FIELDS, get_hub, run_sync
+from notes.models import Category, Note
+from notes.serializers import (
+    NOTE_VALUES_FIELDS,
+    CategorySerializer,
+    NoteSerializer,
+    serialize_note_rows,
+)
+from notes.services import create_default_categories
+from notes.views import ETAG_CATEGORY_FIELDS, CategoryViewSet, NoteViewSet
+
+
+async def authenticate(request: HttpRequest) -> User | None:
+    # Whichever JWT class is configured, stateful or stateless.
+    auth: JWTAuthentication = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]()
+    header = auth.get_header(request)  # type: ignore[arg-type]
+    raw_token = None if header is None else auth.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = auth.get_validated_token(raw_token)
+        return await sync_to_async(auth.get_user)(token)  # type: ignore[return-value]
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+
+
+class AsyncReadView(View):
+    """Serves plain authenticated GETs natively; delegates the rest.
+
+    ``fallback`` is the DRF view for the same URL. It handles writes, any
+    query parameter the async path doesn't know, and every auth failure, so
+    errors keep DRF's exact shape.
+    """
+
+    fallback: Callable[..., HttpResponseBase]
+    async_query_params: frozenset[str] = frozenset()
+    view_is_async = True
+
+    @classonlymethod
+    def as_view(cls, **initkwargs: Any) -> Callable[..., Any]:
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        if request.method == "GET" and set(request.GET) <= self.async_query_params:
+            user = await authenticate(request)
+            if user is not None:
+                # As DRF does; the replica router reads it.
+                request.user = user
+                response = await self.read(request, user, *args, **kwargs)
+                if response is not None:
+                    patch_vary_headers(response, ["Accept", "Authorization"])
+                    return response
+        return await sync_to_async(self.fallback)(request, *args, **kwargs)
+
+    async def read(
+        self, request: HttpRequest, user: User, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase | None:
+        raise NotImplementedError
+
+    def not_modified(self, request: HttpRequest, etag: str) -> HttpResponseBase | None:
+        return get_conditional_response(request, etag=etag)
+
+    def render(self, data: Any, etag: str) -> HttpResponseBase:
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        response = HttpResponse(renderer.render(data), content_type=renderer.media_type)
+        response["ETag"] = etag
+        return response
+
+
+class NoteListAsyncView(AsyncReadView):
+    fallback = staticmethod(
+        NoteViewSet.as_view({"get": "list", "post": "create"}, basename="note")
+    )
+    async_query_params = frozenset({"category"})
+
+    async def read(
+        self, request: HttpRequest, user: User, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase | None:
+        notes = Note.objects.filter(user_id=user.pk)
+        category_id = request.GET.get("category")
+        if category_id is not None:
+            if not category_id.isdigit():
+                return None
+            notes = notes.filter(category_id=category_id)
+        stats = await notes.aaggregate(latest=Max("updated_at"), count=Count("id"))
+        etag = note_list_etag(
+            user.pk, "list", request.get_full_path(), stats["latest"], stats["count"]
+        )
+        not_modified = self.not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        rows = [row async for row in notes.values(*NOTE_VALUES_FIELDS).aiterator()]
+        return self.render(serialize_note_rows(rows), etag)
+
+
+class NoteDetailAsyncView(AsyncReadView):
+    fallback = staticmethod(
+        NoteViewSet.as_view(
+            {"get": "retrieve", "patch": "partial_update", "delete": "destroy"},
+            basename="note",
+            detail=True,
+        )
+    )
+
+    async def read(
+        self, request: HttpRequest, user: User, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase | None:
+        try:
+            note = await Note.objects.select_related("category").aget(
+                user_id=user.pk, pk=kwargs["pk"]
+            )
+        except Note.DoesNotExist:
+            return None
+        etag = make_etag(note.pk, note.updated_at)
+        return self.not_modified(request, etag) or self.render(
+            NoteSerializer(note).data, etag
+        )
+
+
+class CategoryListAsyncView(AsyncReadView):
+    fallback = staticmethod(
+        CategoryViewSet.as_view({"get": "list"}, basename="category")
+    )
+
+    async def read(
+        self, request: HttpRequest, user: User, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase | None:
+        key = category_list_cache_key(user.pk)
+        cached = await cache.aget(key)
+        if cached is None:
+            categories = Category.objects.filter(user_id=user.pk)
+            rows = [c async for c in categories.aiterator()]
+            if not rows:
+                await sync_to_async(create_default_categories)(user.pk)
+                rows = [c async for c in categories.aiterator()]
+            data = list(CategorySerializer(rows, many=True).data)
+            cached = category_list_entry(user.pk, data)
+            await cache.aset(key, cached, CATEGORY_LIST_CACHE_TIMEOUT)
+        return self.not_modified(request, cached["etag"]) or self.render(
+            cached["data"], cached["etag"]
+        )
+
+
+class CategoryDetailAsyncView(AsyncReadView):
+    fallback = staticmethod(
+        CategoryViewSet.as_view({"get": "retrieve"}, basename="category", detail=True)
+    )
+
+    async def read(
+        self, request: HttpRequest, user: User, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase | None:
+        try:
+            category = await Category.objects.aget(user_id=user.pk, pk=kwargs["pk"])
+        except Category.DoesNotExist:
+            return None
+        etag = make_etag(*(getattr(category, f) for f in ETAG_CATEGORY_FIELDS))
+        return self.not_modified(request, etag) or self.render(
+            CategorySerializer(category).data, etag
+        )
+
+
+# Comment lines keep idle streams from being cut by proxies.
+CHANGE_STREAM_HEARTBEAT = 25
+# Sent as ``retry:`` so clients reconnect promptly, in milliseconds.
+CHANGE_STREAM_RETRY = 2000
+
+ASGIApp = Callable[
+    [dict[str, Any], Callable[[], Awaitable[Any]], Callable[[Any], Awaitable[None]]],
+    Awaitable[None],
+]
+
+
+class ChangeStreamApp:
+    """Serves the change feed as server-sent events; passes the rest on.
+
+    Wraps the ASGI application. Authenticated GETs of the feed that accept
+    ``text/event-stream`` are streamed here: the user's missed events from
+    ``Last-Event-ID`` (or ``after``), a ``ready`` event carrying the cursor,
+    then live events from the hub with heartbeats in between. Everything
+    else, auth and parameter errors included, goes to ``app`` so the feed
+    view answers it in DRF's shape.
+    """
+
+    path = "/api/changes/"
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+        self,
+        scope: dict[str, Any],
+        receive: Callable[[], Awaitable[Any]],
+        send: Callable[[Any], Awaitable[None]],
+    ) -> None:
+        if self.accepts(scope):
+            request = ASGIRequest(scope, io.BytesIO())
+            after = request.headers.get("Last-Event-ID", request.GET.get("after"))
+            if set(request.GET) <= {"after"} and (after is None or after.isdigit()):
+                user = await authenticate(request)
+                if user is not None:
+                    cursor = None if after is None else int(after)
+                    await self.stream(request, user, cursor, receive, send)
+                    return
+        await self.app(scope, receive, send)
+
+    def accepts(self, scope: dict[str, Any]) -> bool:
+        if not (
+            settings.CHANGE_FEED
+            and scope["type"] == "http"
+            and scope["method"] == "GET"
+            and scope["path"] == self.path
+        ):
+            return False
+        headers = dict(scope["headers"])
+        return b"text/event-stream" in headers.get(b"accept", b"")
+
+    async def stream(
+        self,
+        request: HttpRequest,
+        user: User,
+        after: int | None,
+        receive: Callable[[], Awaitable[Any]],
+        send: Callable[[Any], Awaitable[None]],
+    ) -> None:
+        # Subscribe before reading the backlog so nothing committed in
+        # between is missed; events already sent from the backlog are
+        # skipped when they arrive live. Others are sent whatever their id:
+        # one may commit after events with higher ids.
+        hub = get_hub()
+        subscription = hub.subscribe(user.pk)
+
+        async def watch_disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            subscription.close()
+
+        watcher = asyncio.create_task(watch_disconnect())
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        try:
+            feed = await run_sync(changes_after, user.pk, after)
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": self.headers(request),
+                }
+            )
+            chunks = [f"retry: {CHANGE_STREAM_RETRY}\n\n".encode()]
+            chunks += [self.event("change", e, renderer) for e in feed["events"]]
+            ready = {"cursor": feed["cursor"], "reset": feed["reset"]}
+            chunks.append(self.event("ready", ready, renderer, feed["cursor"]))
+            await self.send_body(send, b"".join(chunks))
+            sent = {event["id"] for event in feed["events"]}
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), CHANGE_STREAM_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    body = b": keep-alive\n\n"
+                else:
+                    if subscription.closed or subscription.overflowed:
+                        break
+                    if event is None or event["id"] in sent:
+                        continue
+                    body = self.event("change", event, renderer)
+                await self.send_body(send, body)
+            await self.send_body(send, b"", more_body=False)
+        finally:
+            hub.unsubscribe(subscription)
+            watcher.cancel()
+
+    @staticmethod
+    async def send_body(
+        send: Callable[[Any], Awaitable[None]], body: bytes, more_body: bool = True
+    ) -> None:
+        await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def headers(self, request: HttpRequest) -> list[tuple[bytes, bytes]]:
+        headers = [
+            (b"content-type", b"text/event-stream"),
+            (b"cache-control", b"no-cache"),
+            # Stops nginx from buffering the stream.
+            (b"x-accel-buffering", b"no"),
+            (b"vary", b"Accept, Authorization, Origin"),
+        ]
+        # Django's middleware never sees this response, CORS included.
+        origin = request.headers.get("Origin")
+        if origin in settings.CORS_ALLOWED_ORIGINS:
+            headers.append((b"access-control-allow-origin", origin.encode()))
+        return headers
+
+    @staticmethod
+    def event(
+        name: str, data: dict[str, Any], renderer: Any, event_id: int | None = None
+    ) -> bytes:
+        if event_id is None:
+            event_id = data["id"]
+            data = {f: data[f] for f in CHANGE_EVENT_FIELDS}
+        return b"id: %d\nevent: %s\ndata: %s\n\n" % (
+            event_id, name.encode(), renderer.render(data)
+        )
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Any
+
+from django.core.cache import cache
+from django.db import transaction
+
+from config.sharding import database_for_user
+from notes.conditional import make_etag
+
+CATEGORY_LIST_CACHE_TIMEOUT = 300
+DEFAULT_CATEGORY_CACHE_TIMEOUT = 300
+
+
+def category_list_cache_key(user_id: int) -> str:
+    return f"notes:categories:{user_id}"
+
+
+def category_list_entry(user_id: int, data: list[Any]) -> dict[str, Any]:
+    """The cached form of a user's category list: its body plus ETag."""
+    return {"etag": make_etag(user_id, data), "data": data}
+
+
+def default_category_cache_key(user_id: int) -> str:
+    return f"notes:default-category:{user_id}"
+
+
+def invalidate_default_category(user_id: int) -> None:
+    # Shared, so a default deleted by any process (the admin, the prune
+    # command) stops being handed out to new notes everywhere.
+    key = default_category_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(partial(cache.delete, key), using=database_for_user(user_id))
+
+
+def invalidate_category_list(user_id: int) -> None:
+    key = category_list_cache_key(user_id)
+    # Drop it now so the current request reads fresh data, and again after
+    # commit so a concurrent reader can't re-cache pre-commit counts.
+    cache.delete(key)
+    transaction.on_commit(partial(cache.delete, key), using=database_for_user(user_id))
@@ -0,0 +1,118 @@
+"""Per-user change log behind the change feed.
+
+With ``settings.CHANGE_FEED`` on, every note write through the API records
+a ``ChangeEvent`` for each note it touched and each category whose note
+count moved, in the write's transaction. Once committed the events go to
+the broker, which pushes them to the user's open feed connections in every
+process (see ``notes.feed``). A client that reconnects with the last id it
+saw gets what it missed from the table, for up to
+``CHANGE_EVENT_RETENTION``.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from functools import partial
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from config.sharding import ID_RANGE, database_for_user, use_database, user_databases
+from notes.feed import CHANGE_EVENT_FIELDS, POLL_OVERLAP, get_broker
+from notes.models import ChangeEvent
+
+CHANGE_EVENT_RETENTION = timedelta(days=1)
+# Past this many missed events a client is told to resync instead.
+CHANGE_BACKLOG_LIMIT = 500
+
+# (object type, action, object id); changes with no object id are skipped.
+Change = tuple[str, str, "int | None"]
+
+
+def record_changes(user_id: int, changes: Iterable[Change]) -> None:
+    """Record ``changes`` for ``user_id`` and publish them after commit."""
+    if not settings.CHANGE_FEED:
+        return
+    events = [
+        ChangeEvent(
+            user_id=user_id, object_type=object_type, action=action, object_id=pk
+        )
+        for object_type, action, pk in dict.fromkeys(changes)
+        if pk is not None
+    ]
+    if not events:
+        return
+    ChangeEvent.objects.bulk_create(events)
+    published = [
+        {"user_id": user_id, **{f: getattr(event, f) for f in CHANGE_EVENT_FIELDS}}
+        for event in events
+    ]
+    transaction.on_commit(
+        partial(get_broker().publish, published), using=events[0]._state.db
+    )
+
+
+def changes_after(user_id: int, after: int | None) -> dict[str, Any]:
+    """The user's events after event ``after``, and the cursor to resume from.
+
+    Event ids are handed out before their transaction commits, so an event
+    can become visible after a cursor past it was handed out. Events
+    stamped up to ``POLL_OVERLAP`` before event ``after`` are read again
+    for that reason: a few may be sent twice, none is missed.
+
+    ``reset`` means events after ``after`` may have been pruned, or more
+    than ``CHANGE_BACKLOG_LIMIT`` are missing: the client should do a full
+    sync and carry on from ``cursor``. Without ``after`` only the current
+    cursor is returned.
+    """
+    # Each database numbers its events from its own id range, and an empty
+    # table's cursor is the start of it. After a user moves databases their
+    # old cursor isn't an event there, so it resets.
+    database = database_for_user(user_id)
+    start = user_databases().index(database) * ID_RANGE
+    with use_database(database):
+        aggregates = {"oldest": Min("id"), "latest": Max("id")}
+        if after is not None:
+            aggregates["stamp"] = Max("created_at", filter=Q(id=after))
+        bounds = ChangeEvent.objects.aggregate(**aggregates)
+        latest = bounds["latest"] or start
+        if after is None:
+            return {"events": [], "reset": False, "cursor": latest}
+        # Pruning keeps the newest event, so a cursor it hasn't passed is
+        # still in the table, or is the start of the range with nothing
+        # before the first event.
+        if after == start:
+            pruned = (bounds["oldest"] or start + 1) > start + 1
+        else:
+            pruned = bounds["stamp"] is None
+        if pruned or after > latest:
+            return {"events": [], "reset": True, "cursor": latest}
+        unseen = Q(id__gt=after)
+        if bounds["stamp"] is not None:
+            unseen |= Q(id__lt=after, created_at__gt=bounds["stamp"] - POLL_OVERLAP)
+        events = list(
+            ChangeEvent.objects.filter(unseen, user_id=user_id)
+            .order_by("id")
+            .values(*CHANGE_EVENT_FIELDS)[: CHANGE_BACKLOG_LIMIT + 1]
+        )
+    if len(events) > CHANGE_BACKLOG_LIMIT:
+        return {"events": [], "reset": True, "cursor": latest}
+    cursor = max(latest, events[-1]["id"]) if events else latest
+    return {"events": events, "reset": False, "cursor": cursor}
+
+
+def prune_change_events(older_than: timedelta = CHANGE_EVENT_RETENTION) -> int:
+    # The newest event is always kept: it's how ``changes_after`` knows the
+    # current cursor once everything else has aged out.
+    total = 0
+    for alias in user_databases():
+        with use_database(alias):
+            latest = ChangeEvent.objects.aggregate(latest=Max("id"))["latest"] or 0
+            deleted, _ = ChangeEvent.objects.filter(
+                created_at__lt=timezone.now() - older_than, id__lt=latest
+            ).delete()
+        total += deleted
+    return total
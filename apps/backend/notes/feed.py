@@ -0,0 +1,202 @@
+"""In-process fan-out of change events to open change-feed connections.
+
+Each process keeps one ``ChangeHub`` per event loop. A feed connection
+subscribes to its user's events and waits on a small queue, so an idle
+connection costs a suspended coroutine and a queue, not a thread or a
+query. Committed events reach the hubs through the broker named by
+``settings.CHANGE_FEED_BROKER``:
+
+* ``LocalBroker`` hands events straight to the hubs of the process that
+  committed them. Enough when a single ASGI process serves both the writes
+  and the feed connections.
+* ``DatabaseBroker`` has each hub poll the ``ChangeEvent`` table while it
+  has subscribers, so writes from any process, WSGI workers included,
+  reach every process's connections. It costs one query per database per
+  poll interval per process, however many connections the process holds,
+  and reads only the events of users with a connection there.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Callable, TypeVar
+from weakref import WeakKeyDictionary
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from config.sharding import use_database, user_databases
+from notes.models import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CHANGE_EVENT_FIELDS = ("id", "object_type", "action", "object_id")
+# Events queued for a connection that isn't reading them. Past this the
+# connection is closed and the client catches up from the table on
+# reconnect.
+SUBSCRIPTION_QUEUE_SIZE = 256
+POLL_INTERVAL = 0.5
+# Events are stamped before their transaction commits, so one can become
+# visible after a poll that already moved past its timestamp. Each poll
+# re-reads this window to catch those late commits.
+POLL_OVERLAP = timedelta(seconds=5)
+
+
+class Subscription:
+    def __init__(self, user_id: int) -> None:
+        self.user_id = user_id
+        self.queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue(
+            SUBSCRIPTION_QUEUE_SIZE
+        )
+        self.overflowed = False
+        self.closed = False
+
+    def put(self, event: dict[str, Any] | None) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def close(self) -> None:
+        """Wakes the reader, which should stop once it sees ``closed``."""
+        self.closed = True
+        self.put(None)
+
+
+class ChangeHub:
+    """Routes events to the subscriptions of their user."""
+
+    def __init__(self, broker: Broker) -> None:
+        self.broker = broker
+        self.subscriptions: defaultdict[int, set[Subscription]] = defaultdict(set)
+        self.listener: asyncio.Task[None] | None = None
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id)
+        self.subscriptions[user_id].add(subscription)
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.create_task(self.broker.listen(self))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self.subscriptions.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscriptions[subscription.user_id]
+
+    def dispatch(self, events: list[dict[str, Any]]) -> None:
+        for event in events:
+            for subscription in self.subscriptions.get(event["user_id"], ()):
+                subscription.put(event)
+
+
+class Broker:
+    """Delivers committed events to the hubs of every process."""
+
+    def publish(self, events: list[dict[str, Any]]) -> None:
+        """Called in the writing process once ``events`` are committed."""
+
+    async def listen(self, hub: ChangeHub) -> None:
+        """Runs in each process while ``hub`` has subscribers."""
+
+
+class LocalBroker(Broker):
+    def publish(self, events: list[dict[str, Any]]) -> None:
+        # Writes run on worker threads; hubs belong to their event loop.
+        for loop, hub in list(_hubs.items()):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(hub.dispatch, events)
+
+
+class DatabaseBroker(Broker):
+    poll_interval = POLL_INTERVAL
+
+    async def listen(self, hub: ChangeHub) -> None:
+        seen: dict[int, datetime] = {}
+        since = timezone.now()
+        while hub.subscriptions:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                since, events = await run_sync(
+                    self.poll, since, seen, set(hub.subscriptions)
+                )
+            except DatabaseError:
+                logger.exception("Polling change events failed")
+                continue
+            hub.dispatch(events)
+
+    def poll(
+        self, since: datetime, seen: dict[int, datetime], user_ids: set[int]
+    ) -> tuple[datetime, list[dict[str, Any]]]:
+        """Events of ``user_ids`` stamped after ``since`` less the overlap.
+
+        Events already in ``seen`` are skipped. Returns the ``since`` for
+        the next poll; ``seen`` is updated and trimmed to the overlap window.
+        """
+        now = timezone.now()
+        floor = since - POLL_OVERLAP
+        events = []
+        # One query per database; event ids don't overlap across them.
+        for alias in user_databases():
+            with use_database(alias):
+                rows = ChangeEvent.objects.filter(
+                    created_at__gt=floor, user_id__in=user_ids
+                ).order_by("id")
+                for event in rows.values(*CHANGE_EVENT_FIELDS, "user_id", "created_at"):
+                    if event["id"] not in seen:
+                        seen[event["id"]] = event.pop("created_at")
+                        events.append(event)
+        for event_id, created_at in list(seen.items()):
+            if created_at <= now - POLL_OVERLAP:
+                del seen[event_id]
+        return now, events
+
+
+async def run_sync(func: Callable[..., T], *args: Any) -> T:
+    """``sync_to_async(func)(*args)`` for code running outside a request.
+
+    There, thread-sensitive calls share one long-lived thread and its
+    database connection, which no request cycle resets; it's closed after a
+    database error so the next call reconnects.
+    """
+
+    def call() -> T:
+        try:
+            return func(*args)
+        except DatabaseError:
+            connections.close_all()
+            raise
+
+    return await sync_to_async(call)()
+
+
+_hubs: WeakKeyDictionary[asyncio.AbstractEventLoop, ChangeHub] = WeakKeyDictionary()
+
+
+@lru_cache
+def _load_broker(path: str) -> Broker:
+    broker: Broker = import_string(path)()
+    return broker
+
+
+def get_broker() -> Broker:
+    return _load_broker(settings.CHANGE_FEED_BROKER)
+
+
+def get_hub() -> ChangeHub:
+    """The hub of the running event loop."""
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = ChangeHub(get_broker())
+    return hub
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from config.sharding import reserve_id_range, use_database, user_databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Run migrations on default and every shard, then start each "
+        "database's notes ids in its own range."
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        for alias in user_databases():
+            self.stdout.write(f"Migrating {alias}...")
+            # Data migrations on notes models run against this database.
+            with use_database(alias):
+                call_command(
+                    "migrate",
+                    database=alias,
+                    interactive=False,
+                    verbosity=options["verbosity"],
+                )
+            reserve_id_range(alias)
+        self.stdout.write(f"Migrated {len(user_databases())} databases.")
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from accounts.models import User
+from config.sharding import database_for_user, move_user, user_databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Move one user's notes to another database. Their writes get a 503 "
+        "while the rows are copied; reads carry on."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("email")
+        parser.add_argument("database", choices=user_databases())
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        try:
+            user = User.objects.get(email=options["email"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['email']!r}.")
+        source = database_for_user(user.pk)
+        try:
+            copied = move_user(user.pk, options["database"])
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(
+            f"Moved {copied} rows of {user.email} from {source} to {options['database']}."
+        )
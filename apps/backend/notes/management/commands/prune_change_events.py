@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from notes.changes import CHANGE_EVENT_RETENTION, prune_change_events
+
+
+class Command(BaseCommand):
+    help = "Delete change feed events older than the resume window."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=int(CHANGE_EVENT_RETENTION.total_seconds()) // 3600,
+            help="Keep events newer than this many hours.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        deleted = prune_change_events(timedelta(hours=options["hours"]))
+        self.stdout.write(f"Pruned {deleted} change events.")
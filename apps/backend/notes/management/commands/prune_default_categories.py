@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from notes.services import prune_default_categories
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete untouched default categories of dormant users; they are "
+        "recreated on the user's next visit."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Only prune users inactive for at least this many days.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        try:
+            deleted = prune_default_categories(timedelta(days=options["days"]))
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(f"Pruned {deleted} default categories.")
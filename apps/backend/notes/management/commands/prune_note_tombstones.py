@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from notes.services import TOMBSTONE_RETENTION, prune_note_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete note tombstones older than the sync retention window."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=TOMBSTONE_RETENTION.days,
+            help="Keep tombstones newer than this many days.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        deleted = prune_note_tombstones(timedelta(days=options["days"]))
+        self.stdout.write(f"Pruned {deleted} note tombstones.")
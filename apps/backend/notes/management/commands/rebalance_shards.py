@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from accounts.models import User
+from config.sharding import (
+    DIRECTORY,
+    MOVE_GRACE_SECONDS,
+    move_user,
+    ring,
+    sharding_enabled,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move every user whose notes aren't on the shard the hash ring now "
+        "picks, e.g. after adding a shard or for users from before sharding. "
+        "One user at a time, online."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many users would move, per database.",
+        )
+        parser.add_argument(
+            "--grace",
+            type=float,
+            default=MOVE_GRACE_SECONDS,
+            help="Seconds each move waits for the user's writes under way.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not sharding_enabled():
+            raise CommandError("Sharding is off; set DATABASE_SHARD_URLS.")
+        moves: dict[tuple[str, str], int] = {}
+        users = User.objects.order_by("pk").values_list("pk", "shard")
+        for user_id, shard in users.iterator():
+            source, target = shard or DIRECTORY, ring().get(user_id)
+            if source == target:
+                continue
+            moves[source, target] = moves.get((source, target), 0) + 1
+            if not options["dry_run"]:
+                try:
+                    move_user(user_id, target, grace=options["grace"])
+                except ImproperlyConfigured as exc:
+                    raise CommandError(str(exc)) from exc
+        for (source, target), count in sorted(moves.items()):
+            self.stdout.write(f"{source} -> {target}: {count} users")
+        verb = "Would move" if options["dry_run"] else "Moved"
+        self.stdout.write(f"{verb} {sum(moves.values())} users.")
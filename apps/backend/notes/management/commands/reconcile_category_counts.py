@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from notes.services import reconcile_category_note_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized Category.note_count values from notes."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        fixed = reconcile_category_note_counts()
+        self.stdout.write(f"Reconciled {fixed} category note counts.")
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import random
+from typing import Any
+
+import factory.random
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.test import override_settings
+
+from accounts.factories import UserFactory
+from accounts.models import User
+from config.sharding import DIRECTORY, use_database
+from notes.factories import NoteFactory
+from notes.models import Category, Note
+from notes.services import create_default_categories, reconcile_category_note_counts
+
+BENCHMARK_EMAIL_DOMAIN = "bench.example.com"
+BENCHMARK_PASSWORD = "benchmark-password"
+WORDS = (
+    "meeting project idea draft review budget travel recipe groceries book "
+    "workout plan call notes todo deadline design feedback release bug fix "
+    "garden weekend family school lecture exam homework reading summary "
+    "question answer research paper chapter outline reminder birthday gift"
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed benchmark users and notes. Note counts per user follow a Zipf "
+        "curve and note sizes a log-normal one, so a few heavy users and a "
+        "long tail of small ones are both exercised. Reproducible per --seed."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--notes", type=int, default=10000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        rng = random.Random(options["seed"])
+        factory.random.reseed_random(options["seed"])
+        # Bulk-created users skip shard placement, so their notes stay on
+        # default; rebalance_shards spreads them when sharding is on.
+        with use_database(DIRECTORY):
+            users = self.create_users(options["users"])
+            notes = self.create_notes(users, options["notes"], rng)
+        reconcile_category_note_counts()
+        self.stdout.write(f"Seeded {len(users)} users and {notes} notes.")
+
+    def create_users(self, count: int) -> list[User]:
+        # One real hash shared by every user; hashing per user would dominate.
+        password = make_password(BENCHMARK_PASSWORD)
+        with override_settings(
+            PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+        ):
+            users = [
+                UserFactory.build(email=f"user{n}@{BENCHMARK_EMAIL_DOMAIN}")
+                for n in range(count)
+            ]
+        for user in users:
+            user.password = password
+        with transaction.atomic():
+            User.objects.filter(email__endswith=f"@{BENCHMARK_EMAIL_DOMAIN}").delete()
+            users = User.objects.bulk_create(users)
+            for user in users:
+                create_default_categories(user.pk)
+        return users
+
+    def create_notes(self, users: list[User], total: int, rng: random.Random) -> int:
+        weights = [1 / (rank + 1) ** 1.1 for rank in range(len(users))]
+        owners = rng.choices(users, weights=weights, k=total)
+        categories: dict[int, list[int | None]] = {user.pk: [None] for user in users}
+        for category_id, user_id in Category.objects.filter(
+            user__in=users
+        ).values_list("id", "user_id"):
+            categories[user_id].append(category_id)
+
+        notes = []
+        for owner in owners:
+            # Median ~60 words, with a long tail of multi-thousand-word notes.
+            words = max(1, int(rng.lognormvariate(4.1, 1.2)))
+            note = NoteFactory.build(
+                user=owner,
+                category=None,
+                title=" ".join(rng.choices(WORDS, k=rng.randint(1, 6))).capitalize(),
+                content=" ".join(rng.choices(WORDS, k=words)),
+            )
+            note.category_id = rng.choice(categories[owner.pk])
+            notes.append(note)
+        with transaction.atomic():
+            Note.objects.bulk_create(notes, batch_size=1000)
+        return len(notes)
+
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+SEARCH_INDEX_NAME = 'note_search_idx'
+
+
+def create_search_index(apps, schema_editor):
+    # SQLite gets an FTS5 table from the post_migrate hook in notes.apps
+    # instead, since its triggers don't survive table rebuilds.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from django.contrib.postgres.indexes import GinIndex
+
+    from notes.search import note_search_vector
+
+    Note = apps.get_model('notes', 'Note')
+    schema_editor.add_index(Note, GinIndex(note_search_vector(), name=SEARCH_INDEX_NAME))
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_user_updated_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.28 on 2026-10-18 14:14
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_note_counts(apps, schema_editor):
+    Category = apps.get_model('notes', 'Category')
+    Note = apps.get_model('notes', 'Note')
+    counts = models.Subquery(
+        Note.objects.filter(category=models.OuterRef('pk'))
+        .order_by()
+        .values('category')
+        .annotate(count=models.Count('pk'))
+        .values('count')
+    )
+    Category.objects.update(note_count=Coalesce(counts, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_notetombstone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='note_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_note_counts, migrations.RunPython.noop),
+    ]
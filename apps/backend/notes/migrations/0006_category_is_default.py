@@ -0,0 +1,28 @@
+# Generated by Django 4.2.28 on 2026-10-18 14:34
+
+from django.db import migrations, models
+
+
+def mark_default_categories(apps, schema_editor):
+    Category = apps.get_model('notes', 'Category')
+    Category.objects.filter(name='Random Thoughts').update(is_default=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0005_category_note_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='is_default',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_default_categories, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('user',), name='category_one_default_per_user'),
+        ),
+    ]
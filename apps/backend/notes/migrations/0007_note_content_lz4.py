@@ -0,0 +1,38 @@
+from django.db import DatabaseError, migrations, transaction
+
+
+def use_lz4_for_content(apps, schema_editor):
+    # Postgres already compresses (TOASTs) content values past ~2 KB; lz4
+    # does it several times faster than the default pglz. Content has to stay
+    # plain text in the column for full-text search, snippets and previews.
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql' or connection.pg_version < 140000:
+        return
+    try:
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute(
+                'ALTER TABLE notes_note ALTER COLUMN content SET COMPRESSION lz4'
+            )
+    except DatabaseError:
+        # Server built without lz4 support; keep pglz.
+        pass
+
+
+def use_default_compression(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql' or connection.pg_version < 140000:
+        return
+    schema_editor.execute(
+        'ALTER TABLE notes_note ALTER COLUMN content SET COMPRESSION DEFAULT'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0006_category_is_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_lz4_for_content, use_default_compression),
+    ]
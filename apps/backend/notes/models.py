@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+from collections import defaultdict
+from typing import Any, Iterable, Mapping
+
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Greatest
 
 from accounts.models import User
 from datetime import datetime
 
+from notes.cache import invalidate_category_list
+
 
 class Category(models.Model):
     name: models.CharField[str, str] = models.CharField(max_length=100)
     color: models.CharField[str, str] = models.CharField(max_length=7)
+    note_count: models.PositiveIntegerField[int, int] = models.PositiveIntegerField(
+        default=0
+    )
+    # Notes created without a category are filed under the user's default.
+    is_default: models.BooleanField[bool, bool] = models.BooleanField(default=False)
     user: models.ForeignKey[User, User] = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -19,6 +30,13 @@ class Category(models.Model):
     class Meta:
         unique_together = ("user", "name")
         ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(is_default=True),
+                name="category_one_default_per_user",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -49,7 +67,160 @@ class Note(models.Model):
     )
 
     class Meta:
-        ordering = ["-updated_at"]
+        ordering = ["-updated_at", "-id"]
+        indexes = [
+            models.Index(
+                fields=["user", "-updated_at", "-id"], name="note_user_updated_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.title
+
+    @classmethod
+    def from_db(
+        cls, db: str | None, field_names: Iterable[str], values: Iterable[Any]
+    ) -> Note:
+        instance = super().from_db(db, field_names, values)
+        if "category_id" in instance.__dict__:
+            instance._loaded_category_id = instance.category_id
+        return instance
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        super().save(*args, **kwargs)
+        if adding or update_fields is None or "category" in update_fields:
+            previous = None if adding else self.loaded_category_id
+            if previous != self.category_id:
+                adjust_category_note_counts(
+                    self.user_id, {previous: -1, self.category_id: 1}
+                )
+            self._loaded_category_id = self.category_id
+
+    def delete(self, *args: Any, **kwargs: Any) -> tuple[int, dict[str, int]]:
+        category_id = self.loaded_category_id
+        result = super().delete(*args, **kwargs)
+        adjust_category_note_counts(self.user_id, {category_id: -1})
+        return result
+
+    @property
+    def loaded_category_id(self) -> int | None:
+        """The category this note had when loaded, before unsaved changes."""
+        return getattr(self, "_loaded_category_id", self.category_id)
+
+
+def adjust_category_note_counts(
+    user_id: int, deltas: Mapping[int | None, int]
+) -> None:
+    """Apply ``{category_id: delta}`` to ``Category.note_count`` atomically.
+
+    Categories sharing a delta are updated with a single F-expression UPDATE.
+    ``Note.save`` and ``Note.delete`` call this; queryset and bulk writes
+    skip them and must call it themselves, as ``apply_note_batch`` and
+    ``NoteAdmin.delete_queryset`` do, or counts drift until
+    ``reconcile_category_counts`` runs.
+    """
+    by_delta: defaultdict[int, list[int]] = defaultdict(list)
+    for category_id, delta in deltas.items():
+        if category_id is not None and delta:
+            by_delta[delta].append(category_id)
+    if not by_delta:
+        return
+    for delta, category_ids in by_delta.items():
+        Category.objects.filter(pk__in=category_ids).update(
+            note_count=Greatest(models.F("note_count") + delta, 0)
+        )
+    invalidate_category_list(user_id)
+
+
+class NoteTombstone(models.Model):
+    """Records a deleted note so incremental sync clients can drop it."""
+
+    note_id: models.BigIntegerField[int, int] = models.BigIntegerField()
+    user: models.ForeignKey[User, User] = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="note_tombstones",
+    )
+    deleted_at: models.DateTimeField[datetime, datetime] = models.DateTimeField(
+        auto_now_add=True
+    )
+
+    class Meta:
+        ordering = ["deleted_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "deleted_at"], name="tombstone_user_deleted_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Note {self.note_id} deleted at {self.deleted_at}"
+
+
+class NoteRevision(models.Model):
+    """A past version of a note; see ``notes.revisions``.
+
+    Every ``REVISION_SNAPSHOT_INTERVAL``-th revision stores its content in
+    ``snapshot``. The others store in ``delta`` the ``[start, end, text]``
+    edits that turn the next newer version's content (the next revision, or
+    the note itself for the newest) into this one's.
+    """
+
+    note: models.ForeignKey[Note, Note] = models.ForeignKey(
+        Note, on_delete=models.CASCADE, related_name="revisions"
+    )
+    number: models.PositiveIntegerField[int, int] = models.PositiveIntegerField()
+    title: models.CharField[str, str] = models.CharField(max_length=255)
+    # When this version was saved, and when it was replaced and kept.
+    saved_at: models.DateTimeField[datetime, datetime] = models.DateTimeField()
+    created_at: models.DateTimeField[datetime, datetime] = models.DateTimeField(
+        auto_now_add=True
+    )
+    content_length: models.PositiveIntegerField[int, int] = (
+        models.PositiveIntegerField()
+    )
+    snapshot: models.TextField[str | None, str | None] = models.TextField(null=True)
+    delta: models.JSONField[Any, Any] = models.JSONField(null=True)
+
+    class Meta:
+        ordering = ["-number"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["note", "number"], name="note_revision_number_unique"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Note {self.note_id} revision {self.number}"
+
+
+class ChangeEvent(models.Model):
+    """A note or category change, for the user's change feed.
+
+    See ``notes.changes``. Events only say what changed; clients fetch the
+    new state themselves.
+    """
+
+    user: models.ForeignKey[User, User] = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="change_events",
+    )
+    object_type: models.CharField[str, str] = models.CharField(max_length=20)
+    action: models.CharField[str, str] = models.CharField(max_length=10)
+    object_id: models.BigIntegerField[int, int] = models.BigIntegerField()
+    created_at: models.DateTimeField[datetime, datetime] = models.DateTimeField(
+        auto_now_add=True
+    )
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["user", "id"], name="change_user_id_idx"),
+            models.Index(fields=["created_at"], name="change_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.object_type} {self.object_id} {self.action}"
@@ -0,0 +1,87 @@
+"""Splice-style text edits for incremental note content updates.
+
+A patch is a list of ``{"start", "end", "text"}`` edits, each replacing
+``base[start:end]`` with ``text``. Offsets are Unicode code points into the
+base text (what Python's ``len`` counts, or ``Array.from(text)`` in
+JavaScript) and edits must not overlap. Base versions are identified by
+``content_hash``, so a client can only patch the exact text it last saw.
+"""
+
+from __future__ import annotations
+
+import difflib
+import hashlib
+from itertools import accumulate
+from typing import Any, Callable, Iterable, Mapping
+
+
+class InvalidPatch(ValueError):
+    pass
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def apply_edits(base: str, edits: Iterable[Mapping[str, Any]]) -> str:
+    """Return ``base`` with ``edits`` applied; edits may come in any order."""
+    ordered = sorted(edits, key=lambda edit: (edit["start"], edit["end"]))
+    parts: list[str] = []
+    position = 0
+    for edit in ordered:
+        start, end, text = edit["start"], edit["end"], edit["text"]
+        if start < position:
+            raise InvalidPatch("Edits overlap.")
+        if end < start or end > len(base):
+            raise InvalidPatch(f"Edit range {start}-{end} is outside the content.")
+        parts.append(base[position:start])
+        parts.append(text)
+        position = end
+    parts.append(base[position:])
+    return "".join(parts)
+
+
+def diff_edits(old: str, new: str) -> list[dict[str, Any]]:
+    """Edits that turn ``old`` into ``new``, for ``apply_edits``.
+
+    The common prefix and suffix are trimmed first, so a typical local edit
+    costs one linear scan; what's left is diffed line by line.
+    """
+    limit = min(len(old), len(new))
+    prefix = _common_length(lambda n: old[:n] == new[:n], limit)
+    suffix = _common_length(
+        lambda n: old[len(old) - n :] == new[len(new) - n :], limit - prefix
+    )
+    old_middle = old[prefix : len(old) - suffix]
+    new_middle = new[prefix : len(new) - suffix]
+    if not old_middle and not new_middle:
+        return []
+
+    old_lines = old_middle.splitlines(keepends=True)
+    new_lines = new_middle.splitlines(keepends=True)
+    offsets = list(accumulate((len(line) for line in old_lines), initial=prefix))
+    edits = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            edits.append(
+                {
+                    "start": offsets[i1],
+                    "end": offsets[i2],
+                    "text": "".join(new_lines[j1:j2]),
+                }
+            )
+    return edits
+
+
+def _common_length(matches: Callable[[int], bool], limit: int) -> int:
+    # Binary search over slice comparisons, which run in C; a per-character
+    # loop takes tens of milliseconds on a long note.
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if matches(middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
@@ -0,0 +1,121 @@
+"""Note revision history stored as reverse deltas with periodic snapshots.
+
+Saving a note turns the version it replaces into a ``NoteRevision``. Most
+revisions only store the edits from the next newer version back to
+themselves; every ``REVISION_SNAPSHOT_INTERVAL``-th stores its full content.
+Rebuilding any revision therefore starts from the nearest newer snapshot,
+or from the live note, and applies at most ``REVISION_SNAPSHOT_INTERVAL``
+deltas.
+
+Autosaves come every few seconds, so a version replaced within
+``REVISION_COALESCE_WINDOW`` of the newest revision being recorded is not
+kept: the newest revision's delta is rebased onto the new content instead.
+That keeps at most one revision per window while the user types, and the
+last version before each pause.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from notes.models import Note, NoteRevision
+from notes.patches import apply_edits, diff_edits
+
+REVISION_SNAPSHOT_INTERVAL = 20
+REVISION_COALESCE_WINDOW = timedelta(minutes=5)
+
+
+def _pack(edits: list[dict[str, Any]]) -> list[list[Any]]:
+    return [[edit["start"], edit["end"], edit["text"]] for edit in edits]
+
+
+def _unpack(delta: list[list[Any]]) -> list[dict[str, Any]]:
+    return [{"start": start, "end": end, "text": text} for start, end, text in delta]
+
+
+def record_revisions(changes: Iterable[tuple[Note, str, str, datetime]]) -> None:
+    """Keep the versions replaced by just-saved notes as revisions.
+
+    ``changes`` holds ``(note, previous_title, previous_content,
+    previous_updated_at)`` for each saved note, with ``note`` already holding
+    the new values. Runs in a constant number of queries; call it in the
+    transaction that saved the notes.
+    """
+    changes = [
+        change
+        for change in changes
+        if change[0].title != change[1] or change[0].content != change[2]
+    ]
+    if not changes:
+        return
+    newest = {
+        revision.note_id: revision
+        for revision in NoteRevision.objects.filter(
+            note_id__in=[note.pk for note, *_ in changes],
+            number=Subquery(
+                NoteRevision.objects.filter(note_id=OuterRef("note_id"))
+                .order_by("-number")
+                .values("number")[:1]
+            ),
+        )
+    }
+
+    now = timezone.now()
+    created = []
+    rebased = []
+    for note, title, content, saved_at in changes:
+        latest = newest.get(note.pk)
+        if latest is not None and now - latest.created_at < REVISION_COALESCE_WINDOW:
+            # Drop the replaced version; the newest revision now leads
+            # straight to the new content.
+            if latest.delta is not None:
+                previous = apply_edits(content, _unpack(latest.delta))
+                latest.delta = _pack(diff_edits(note.content, previous))
+                rebased.append(latest)
+            continue
+        number = 1 if latest is None else latest.number + 1
+        snapshot = number % REVISION_SNAPSHOT_INTERVAL == 0
+        created.append(
+            NoteRevision(
+                note_id=note.pk,
+                number=number,
+                title=title,
+                saved_at=saved_at,
+                content_length=len(content),
+                snapshot=content if snapshot else None,
+                delta=None if snapshot else _pack(diff_edits(note.content, content)),
+            )
+        )
+    NoteRevision.objects.bulk_create(created)
+    if rebased:
+        NoteRevision.objects.bulk_update(rebased, ["delta"])
+
+
+def revision_content(note: Note, number: int) -> str | None:
+    """Rebuild the content of revision ``number`` of ``note``, or ``None``.
+
+    Reads at most ``REVISION_SNAPSHOT_INTERVAL`` rows in one query.
+    """
+    next_snapshot = -(-number // REVISION_SNAPSHOT_INTERVAL) * REVISION_SNAPSHOT_INTERVAL
+    chain = list(
+        NoteRevision.objects.filter(
+            note_id=note.pk, number__gte=number, number__lte=next_snapshot
+        )
+        .order_by("number")
+        .values_list("number", "snapshot", "delta")
+    )
+    if not chain or chain[0][0] != number:
+        return None
+    if chain[-1][1] is not None:
+        content = chain[-1][1]
+        chain.pop()
+    else:
+        # No snapshot yet above this revision: the live note is the base.
+        content = note.content
+    for _, _, delta in reversed(chain):
+        content = apply_edits(content, _unpack(delta))
+    return content
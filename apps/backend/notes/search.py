@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import secrets
+from typing import Any
+
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import F, FloatField, QuerySet, Value
+from django.db.models.functions import Substr
+from django.utils.html import escape
+
+from notes.models import Note
+
+SEARCH_CONFIG = "english"
+SEARCH_RESULT_LIMIT = 50
+# The database delimits matched terms with markers no note can contain, so
+# the excerpt is escaped before they're turned into <mark> tags.
+_HIGHLIGHT_MARKER = secrets.token_hex(8)
+HIGHLIGHT_START = f"{_HIGHLIGHT_MARKER}start"
+HIGHLIGHT_STOP = f"{_HIGHLIGHT_MARKER}stop"
+SNIPPET_WORDS = 16
+
+SQLITE_FTS_TABLE = "notes_note_fts"
+SQLITE_FTS_TRIGGERS = {
+    f"{SQLITE_FTS_TABLE}_ai": f"""
+        CREATE TRIGGER {SQLITE_FTS_TABLE}_ai AFTER INSERT ON notes_note BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, content)
+            VALUES (new.id, new.title, new.content);
+        END
+    """,
+    f"{SQLITE_FTS_TABLE}_ad": f"""
+        CREATE TRIGGER {SQLITE_FTS_TABLE}_ad AFTER DELETE ON notes_note BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+        END
+    """,
+    f"{SQLITE_FTS_TABLE}_au": f"""
+        CREATE TRIGGER {SQLITE_FTS_TABLE}_au AFTER UPDATE OF title, content
+        ON notes_note BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, content)
+            VALUES (new.id, new.title, new.content);
+        END
+    """,
+}
+
+
+def note_search_vector() -> SearchVector:
+    """The PostgreSQL document for a note; the GIN index is built on this exact expression."""
+    return SearchVector("title", weight="A", config=SEARCH_CONFIG) + SearchVector(
+        "content", weight="B", config=SEARCH_CONFIG
+    )
+
+
+def ensure_sqlite_search_index(connection: BaseDatabaseWrapper) -> None:
+    """Create the FTS5 index and its sync triggers if any of them are missing.
+
+    SQLite drops triggers whenever Django rebuilds ``notes_note`` during a
+    migration, so this runs after every ``migrate`` and rebuilds the index
+    from the table when it had to recreate anything.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') "
+            "AND name LIKE %s",
+            [f"{SQLITE_FTS_TABLE}%"],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if "notes_note" not in connection.introspection.table_names(cursor):
+            return
+        if existing >= {SQLITE_FTS_TABLE, *SQLITE_FTS_TRIGGERS}:
+            return
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+            "title, content, content='notes_note', content_rowid='id', "
+            "tokenize='porter unicode61')"
+        )
+        for name, sql in SQLITE_FTS_TRIGGERS.items():
+            if name not in existing:
+                cursor.execute(sql)
+        cursor.execute(
+            f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def _sqlite_match_expression(query: str) -> str:
+    # Quote every term so user input can never be parsed as FTS5 syntax.
+    terms = ['"{}"'.format(term.replace('"', '""')) for term in query.split()]
+    return " ".join(terms)
+
+
+def search_notes(queryset: QuerySet[Note], query: str) -> QuerySet[Note]:
+    """Filter ``queryset`` to notes matching ``query``, best matches first.
+
+    Matching notes are annotated with ``search_rank`` (higher is better) and
+    ``search_snippet``, an excerpt of the content with matched terms wrapped
+    in ``HIGHLIGHT_START``/``HIGHLIGHT_STOP``; ``highlight_snippet`` turns it
+    into HTML.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        return _search_postgresql(queryset, query)
+    if vendor == "sqlite":
+        return _search_sqlite(queryset, query)
+    return queryset.filter(title__icontains=query).annotate(
+        search_rank=Value(0.0, output_field=FloatField()),
+        search_snippet=Substr("content", 1, SNIPPET_WORDS * 8),
+    )
+
+
+def highlight_snippet(snippet: str) -> str:
+    """Escape ``snippet`` as HTML and wrap its matched terms in ``<mark>``."""
+    return (
+        escape(snippet)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
+    )
+
+
+def _search_postgresql(queryset: QuerySet[Note], query: str) -> QuerySet[Note]:
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+    return (
+        queryset.annotate(search_vector=note_search_vector())
+        .filter(search_vector=search_query)
+        .annotate(
+            search_rank=SearchRank(F("search_vector"), search_query),
+            search_snippet=SearchHeadline(
+                "content",
+                search_query,
+                config=SEARCH_CONFIG,
+                start_sel=HIGHLIGHT_START,
+                stop_sel=HIGHLIGHT_STOP,
+                max_words=SNIPPET_WORDS,
+                min_words=SNIPPET_WORDS // 2,
+            ),
+        )
+        .order_by("-search_rank", "-updated_at", "-id")
+    )
+
+
+def _search_sqlite(queryset: QuerySet[Note], query: str) -> QuerySet[Note]:
+    match = _sqlite_match_expression(query)
+    if not match:
+        return queryset.none()
+    select: dict[str, Any] = {
+        # bm25() is lower-is-better; negate it so rank ordering matches Postgres.
+        "search_rank": f"-bm25({SQLITE_FTS_TABLE}, 10.0, 1.0)",
+        "search_snippet": (
+            f"snippet({SQLITE_FTS_TABLE}, 1, %s, %s, '…', {SNIPPET_WORDS})"
+        ),
+    }
+    return queryset.extra(
+        select=select,
+        select_params=(HIGHLIGHT_START, HIGHLIGHT_STOP),
+        tables=[SQLITE_FTS_TABLE],
+        where=[
+            f"{SQLITE_FTS_TABLE}.rowid = notes_note.id",
+            f"{SQLITE_FTS_TABLE} MATCH %s",
+        ],
+        params=[match],
+    ).order_by("-search_rank", "-updated_at", "-id")
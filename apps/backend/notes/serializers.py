@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Iterable
 
+from django.conf import settings
+from django.db.models import QuerySet
 from rest_framework import serializers
 
-from notes.models import Category, Note
+from notes.models import Category, ChangeEvent, Note, NoteRevision, NoteTombstone
+from notes.patches import content_hash
+from notes.search import highlight_snippet
+
+NOTE_PREVIEW_LENGTH = 200
 
 
 class CategoryMinimalSerializer(serializers.ModelSerializer[Category]):
@@ -21,6 +27,73 @@ class CategorySerializer(serializers.ModelSerializer[Category]):
         fields = ("id", "name", "color", "note_count")
 
 
+NOTE_VALUES_FIELDS = (
+    "id",
+    "title",
+    "content",
+    "category_id",
+    "category__name",
+    "category__color",
+    "created_at",
+    "updated_at",
+)
+
+
+def note_rows(queryset: QuerySet[Note]) -> list[dict[str, Any]]:
+    """Build ``NoteSerializer`` output straight from ``.values()`` rows.
+
+    Skips model instantiation and per-field ``to_representation`` calls; the
+    result is identical to ``NoteSerializer(queryset, many=True).data``.
+    """
+    return serialize_note_rows(queryset.values(*NOTE_VALUES_FIELDS))
+
+
+def serialize_note_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    format_datetime = serializers.DateTimeField().to_representation
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "content": row["content"],
+            "category": (
+                None
+                if row["category_id"] is None
+                else {
+                    "id": row["category_id"],
+                    "name": row["category__name"],
+                    "color": row["category__color"],
+                }
+            ),
+            "created_at": format_datetime(row["created_at"]),
+            "updated_at": format_datetime(row["updated_at"]),
+        }
+        for row in rows
+    ]
+
+
+class NoteListSerializer(serializers.ListSerializer[Note]):
+    """Supports ``many=True`` updates when ``instance`` is a ``{pk: Note}`` map.
+
+    With ``FAST_JSON`` enabled, plain ``NoteSerializer`` querysets are read
+    through ``note_rows`` instead of instantiating every note.
+    """
+
+    def to_representation(self, data: Any) -> list[Any]:
+        if (
+            settings.FAST_JSON
+            and isinstance(data, QuerySet)
+            and type(self.child) is NoteSerializer
+        ):
+            return note_rows(data)
+        return super().to_representation(data)
+
+    def run_child_validation(self, data: Any) -> Any:
+        if isinstance(self.instance, dict):
+            self.child.instance = self.instance.get(data.get("id"))
+            self.child.initial_data = data
+        return super().run_child_validation(data)
+
+
 class NoteSerializer(serializers.ModelSerializer[Note]):
     category = CategoryMinimalSerializer(read_only=True, allow_null=True)
     category_id = serializers.PrimaryKeyRelatedField(
@@ -43,6 +116,7 @@ class NoteSerializer(serializers.ModelSerializer[Note]):
             "updated_at",
         )
         read_only_fields = ("id", "created_at", "updated_at")
+        list_serializer_class = NoteListSerializer
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
@@ -50,4 +124,246 @@ class NoteSerializer(serializers.ModelSerializer[Note]):
         if request and request.user.is_authenticated:
             category_id_field = self.fields["category_id"]
             cast_field: Any = category_id_field
-            cast_field.queryset = Category.objects.filter(user=request.user)
+            cast_field.queryset = Category.objects.filter(user_id=request.user.pk)
+
+    def update(self, instance: Note, validated_data: dict[str, Any]) -> Note:
+        # Write only the submitted columns, so a title or category edit
+        # doesn't rewrite a large content value.
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=[*validated_data, "updated_at"])
+        return instance
+
+
+NOTE_CONTENT_MAX_EDITS = 1000
+
+
+class NoteContentEditSerializer(serializers.Serializer[Any]):
+    start = serializers.IntegerField(min_value=0)
+    end = serializers.IntegerField(min_value=0)
+    text = serializers.CharField(allow_blank=True, trim_whitespace=False, default="")
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        if attrs["end"] < attrs["start"]:
+            raise serializers.ValidationError({"end": ["Must not be before start."]})
+        return attrs
+
+
+class NoteContentPatchSerializer(serializers.Serializer[Any]):
+    base_hash = serializers.RegexField(
+        r"^[0-9a-f]{64}$",
+        help_text="SHA-256 (hex) of the UTF-8 content the edits were made against.",
+    )
+    edits = NoteContentEditSerializer(
+        many=True,
+        max_length=NOTE_CONTENT_MAX_EDITS,
+        help_text=(
+            "Non-overlapping replacements of content[start:end], in Unicode "
+            "code point offsets into the base content."
+        ),
+    )
+
+
+class NoteContentStateSerializer(serializers.ModelSerializer[Note]):
+    content_hash = serializers.SerializerMethodField()
+    content_length = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Note
+        fields = ("id", "content_hash", "content_length", "updated_at")
+        read_only_fields = fields
+
+    def get_content_hash(self, note: Note) -> str:
+        return content_hash(note.content)
+
+    def get_content_length(self, note: Note) -> int:
+        return len(note.content)
+
+
+class NoteSummarySerializer(serializers.ModelSerializer[Note]):
+    category = CategoryMinimalSerializer(read_only=True, allow_null=True)
+    preview = serializers.CharField(
+        read_only=True,
+        help_text=f"First {NOTE_PREVIEW_LENGTH} characters of the note content.",
+    )
+
+    class Meta:
+        model = Note
+        fields = (
+            "id",
+            "title",
+            "preview",
+            "category",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = fields
+
+
+class HighlightedSnippetField(serializers.CharField):
+    def to_representation(self, value: Any) -> str:
+        return highlight_snippet(super().to_representation(value))
+
+
+class NoteSearchResultSerializer(NoteSummarySerializer):
+    rank = serializers.FloatField(source="search_rank", read_only=True)
+    snippet = HighlightedSnippetField(
+        source="search_snippet",
+        read_only=True,
+        help_text=(
+            "HTML-escaped content excerpt with matched terms wrapped in <mark> tags."
+        ),
+    )
+
+    class Meta(NoteSummarySerializer.Meta):
+        fields = NoteSummarySerializer.Meta.fields + ("rank", "snippet")
+        read_only_fields = fields
+
+
+class NoteRevisionSerializer(serializers.ModelSerializer[NoteRevision]):
+    class Meta:
+        model = NoteRevision
+        fields = ("number", "title", "saved_at", "content_length")
+        read_only_fields = fields
+
+
+class NoteRevisionDetailSerializer(NoteRevisionSerializer):
+    content = serializers.CharField(read_only=True)
+
+    class Meta(NoteRevisionSerializer.Meta):
+        fields = NoteRevisionSerializer.Meta.fields + ("content",)
+        read_only_fields = fields
+
+
+class NoteTombstoneSerializer(serializers.ModelSerializer[NoteTombstone]):
+    id = serializers.IntegerField(source="note_id", read_only=True)
+
+    class Meta:
+        model = NoteTombstone
+        fields = ("id", "deleted_at")
+        read_only_fields = fields
+
+
+class NoteSyncSerializer(serializers.Serializer[Any]):
+    notes = NoteSerializer(many=True, read_only=True)
+    deleted = NoteTombstoneSerializer(many=True, read_only=True)
+    full_sync = serializers.BooleanField(
+        read_only=True,
+        help_text="When true, notes is the complete set and replaces local state.",
+    )
+    watermark = serializers.CharField(
+        read_only=True, help_text="Opaque token to pass as since on the next sync."
+    )
+
+
+NOTE_BATCH_MAX_OPERATIONS = 500
+
+
+class NoteBatchOperationSerializer(serializers.Serializer[Any]):
+    op = serializers.ChoiceField(choices=("create", "update", "delete"))
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(
+        required=False,
+        default=dict,
+        help_text="Note fields for create and update, as accepted by the notes API.",
+    )
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        if attrs["op"] == "create" and "id" in attrs:
+            raise serializers.ValidationError({"id": ["Not allowed for create."]})
+        if attrs["op"] != "create" and "id" not in attrs:
+            raise serializers.ValidationError({"id": ["This field is required."]})
+        return attrs
+
+
+class NoteBatchSerializer(serializers.Serializer[Any]):
+    operations = NoteBatchOperationSerializer(
+        many=True, allow_empty=False, max_length=NOTE_BATCH_MAX_OPERATIONS
+    )
+
+    def validate_operations(self, operations: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        request = self.context["request"]
+        errors: list[dict[str, Any]] = [{} for _ in operations]
+
+        targets = [op["id"] for op in operations if op["op"] != "create"]
+        instances = (
+            Note.objects.filter(user_id=request.user.pk, pk__in=targets)
+            .select_related("category")
+            .in_bulk()
+        )
+        seen: set[int] = set()
+        for index, op in enumerate(operations):
+            if op["op"] == "create":
+                continue
+            if op["id"] in seen:
+                errors[index]["id"] = ["Duplicate note id in batch."]
+            elif op["id"] not in instances:
+                errors[index]["id"] = ["Not found."]
+            seen.add(op["id"])
+            op["instance"] = instances.get(op["id"])
+
+        creates = [i for i, op in enumerate(operations) if op["op"] == "create"]
+        updates = [
+            i
+            for i, op in enumerate(operations)
+            if op["op"] == "update" and op["instance"] is not None
+        ]
+        create_serializer = NoteSerializer(
+            data=[operations[i]["data"] for i in creates],
+            many=True,
+            context=self.context,
+        )
+        update_serializer = NoteSerializer(
+            instance={operations[i]["id"]: operations[i]["instance"] for i in updates},
+            data=[{**operations[i]["data"], "id": operations[i]["id"]} for i in updates],
+            many=True,
+            partial=True,
+            context=self.context,
+        )
+        for indexes, serializer in ((creates, create_serializer), (updates, update_serializer)):
+            if not indexes:
+                continue
+            if serializer.is_valid():
+                for i, validated in zip(indexes, serializer.validated_data):
+                    operations[i]["data"] = validated
+            else:
+                for i, item_errors in zip(indexes, serializer.errors):
+                    if item_errors:
+                        errors[i]["data"] = item_errors
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return operations
+
+
+class NoteBatchResultSerializer(serializers.Serializer[Any]):
+    op = serializers.ChoiceField(choices=("create", "update", "delete"), read_only=True)
+    id = serializers.IntegerField(read_only=True)
+    note = NoteSerializer(read_only=True, allow_null=True)
+
+
+class NoteBatchResponseSerializer(serializers.Serializer[Any]):
+    results = NoteBatchResultSerializer(many=True, read_only=True)
+
+
+class ChangeEventSerializer(serializers.ModelSerializer[ChangeEvent]):
+    object_type = serializers.ChoiceField(choices=("note", "category"), read_only=True)
+    action = serializers.ChoiceField(
+        choices=("created", "updated", "deleted"), read_only=True
+    )
+
+    class Meta:
+        model = ChangeEvent
+        fields = ("id", "object_type", "action", "object_id")
+        read_only_fields = fields
+
+
+class ChangeFeedSerializer(serializers.Serializer[Any]):
+    events = ChangeEventSerializer(many=True, read_only=True)
+    reset = serializers.BooleanField(
+        read_only=True,
+        help_text="When true, events were missed: do a full sync before applying more.",
+    )
+    cursor = serializers.IntegerField(
+        read_only=True, help_text="Event id to pass as after on the next request."
+    )
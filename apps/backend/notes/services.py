@@ -1,8 +1,32 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from collections import Counter
+from itertools import islice
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Collection, Iterable
 
-from notes.models import Category
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from config.sharding import DIRECTORY, database_for_user, use_database, user_databases
+from notes.cache import (
+    DEFAULT_CATEGORY_CACHE_TIMEOUT,
+    default_category_cache_key,
+    invalidate_category_list,
+    invalidate_default_category,
+)
+from notes.changes import record_changes
+from notes.models import Category, Note, NoteTombstone, adjust_category_note_counts
+from notes.patches import apply_edits, content_hash
+from notes.revisions import record_revisions
 
 if TYPE_CHECKING:
     from django.contrib.auth.models import AbstractBaseUser
@@ -12,9 +36,401 @@ DEFAULT_CATEGORIES = [
     {'name': 'School', 'color': '#FCDC94'},
     {'name': 'Personal', 'color': '#78ABA8'},
 ]
+# Notes created without a category are filed here.
+DEFAULT_NOTE_CATEGORY = 'Random Thoughts'
+
+SYNC_TOKEN_SALT = 'notes.sync'
+# Rows are stamped before their transaction commits, so a write can become
+# visible slightly after a sync that already moved past its timestamp.
+# Re-sending this window on every sync catches those late commits.
+SYNC_OVERLAP = timedelta(seconds=5)
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+class ContentConflict(ValueError):
+    """The note's content no longer matches the patch's base version."""
+
+    def __init__(self, note: Note) -> None:
+        super().__init__(note.pk)
+        self.note = note
 
 
-def create_default_categories(user: AbstractBaseUser) -> None:
+def create_default_categories(user_id: int) -> None:
+    """Materialize a user's default categories.
+
+    Users start with none stored; the defaults are virtual until first
+    needed (see ``ensure_default_categories``). Concurrent calls are safe:
+    rows that already exist are skipped by the ``(user, name)`` constraint.
+    """
     Category.objects.bulk_create(
-        [Category(user=user, **cat) for cat in DEFAULT_CATEGORIES]  # type: ignore[misc]
+        [
+            Category(
+                user_id=user_id,
+                is_default=cat['name'] == DEFAULT_NOTE_CATEGORY,
+                **cat,
+            )
+            for cat in DEFAULT_CATEGORIES
+        ],
+        ignore_conflicts=True,
+    )
+    invalidate_category_list(user_id)
+    invalidate_default_category(user_id)
+
+
+def ensure_default_categories(user_id: int) -> bool:
+    """Create the default categories if the user has no categories yet.
+
+    Returns whether anything was created.
+    """
+    if Category.objects.filter(user_id=user_id).exists():
+        return False
+    create_default_categories(user_id)
+    return True
+
+
+def get_default_category(user_id: int) -> Category | None:
+    """The category for notes created without one, provisioned on first use.
+
+    Served from the cache, so resolving it usually costs no query and a
+    note create is a single INSERT.
+    """
+    key = default_category_cache_key(user_id)
+    fields = cache.get(key)
+    if fields is None:
+        default = _load_default_category(user_id)
+        if default is None and ensure_default_categories(user_id):
+            default = _load_default_category(user_id)
+        fields = {} if default is None else default
+        cache.set(key, fields, DEFAULT_CATEGORY_CACHE_TIMEOUT)
+    if not fields:
+        return None
+    category = Category(user_id=user_id, is_default=True, **fields)
+    category._state.adding = False
+    return category
+
+
+def _load_default_category(user_id: int) -> dict[str, Any] | None:
+    return (
+        Category.objects.filter(user_id=user_id, is_default=True)
+        .values('id', 'name', 'color')
+        .first()
+    )
+
+
+def lock_note_versions(
+    notes: Iterable[tuple[Note, Collection[str]]],
+) -> dict[int, tuple[str, str, datetime]]:
+    """Lock the notes' rows; returns ``{id: (title, content, updated_at)}``.
+
+    Call it in the transaction that saves the notes and record revisions of
+    the versions it returns: the copies the request loaded may be older, if
+    another save landed before the lock. Each note's title, content and
+    category not among its submitted fields are refreshed, so the save
+    keeps them, and ``loaded_category_id`` becomes the locked category.
+    Notes missing from the result were deleted in the meantime.
+    """
+    notes = list(notes)
+    rows = (
+        Note.objects.select_for_update()
+        .filter(pk__in=[note.pk for note, _ in notes])
+        .order_by('pk')
+        .values_list('pk', 'title', 'content', 'category_id', 'updated_at')
+    )
+    current: dict[int, tuple[str, str, datetime]] = {}
+    categories: dict[int, int | None] = {}
+    for pk, title, content, category_id, updated_at in rows:
+        current[pk] = (title, content, updated_at)
+        categories[pk] = category_id
+    for note, submitted in notes:
+        if note.pk in current:
+            title, content, _ = current[note.pk]
+            if 'title' not in submitted:
+                note.title = title
+            if 'content' not in submitted:
+                note.content = content
+            if 'category' not in submitted:
+                note.category_id = categories[note.pk]
+            note._loaded_category_id = categories[note.pk]
+    return current
+
+
+def delete_note(note: Note) -> None:
+    with transaction.atomic(using=note._state.db):
+        NoteTombstone.objects.create(note_id=note.pk, user_id=note.user_id)
+        record_changes(
+            note.user_id,
+            [
+                ('note', 'deleted', note.pk),
+                ('category', 'updated', note.loaded_category_id),
+            ],
+        )
+        note.delete()
+
+
+def patch_note_content(
+    notes: QuerySet[Note], note_id: int, base_hash: str, edits: list[dict[str, Any]]
+) -> Note:
+    """Apply ``edits`` to the content of ``notes.get(pk=note_id)``.
+
+    The row is locked while the patch is checked against ``base_hash`` and
+    applied, and only ``content`` and ``updated_at`` are written. Raises
+    ``ContentConflict`` if the content changed since the client's base and
+    ``InvalidPatch`` if an edit doesn't fit it.
+    """
+    with transaction.atomic(using=notes.db):
+        note = (
+            notes.select_for_update()
+            .only('id', 'user_id', 'title', 'content', 'updated_at')
+            .get(pk=note_id)
+        )
+        if content_hash(note.content) != base_hash:
+            raise ContentConflict(note)
+        previous = (note.title, note.content, note.updated_at)
+        note.content = apply_edits(note.content, edits)
+        note.save(update_fields=['content', 'updated_at'])
+        record_revisions([(note, *previous)])
+        record_changes(note.user_id, [('note', 'updated', note.pk)])
+    return note
+
+
+def apply_note_batch(
+    user: AbstractBaseUser, operations: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Apply validated batch operations in one transaction.
+
+    Creates and updates are written with one ``bulk_create`` and one
+    ``bulk_update``; deletes record their tombstones in bulk. Returns one
+    result per operation, in request order.
+    """
+    now = timezone.now()
+    created: list[Note] = []
+    updated: list[Note] = []
+    submitted: list[tuple[Note, Collection[str]]] = []
+    update_fields: set[str] = {'updated_at'}
+    deleted: list[Note] = []
+    results: list[dict[str, Any]] = []
+    count_deltas: Counter[int | None] = Counter()
+    default_category: Category | None = None
+    default_resolved = False
+
+    for op in operations:
+        if op['op'] == 'create':
+            note = Note(user_id=user.pk, **op['data'])
+            if note.category_id is None:
+                if not default_resolved:
+                    default_category = get_default_category(user.pk)
+                    default_resolved = True
+                note.category = default_category
+            count_deltas[note.category_id] += 1
+            created.append(note)
+        elif op['op'] == 'update':
+            note = op['instance']
+            submitted.append((note, op['data'].keys()))
+            for field, value in op['data'].items():
+                setattr(note, field, value)
+            note.updated_at = now
+            update_fields.update(op['data'])
+            updated.append(note)
+        else:
+            note = op['instance']
+            submitted.append((note, ()))
+            deleted.append(note)
+        results.append({'op': op['op'], 'note': note})
+
+    with transaction.atomic(using=database_for_user(user.pk)):
+        Note.objects.bulk_create(created)
+        # Counts move from the categories the notes have under the lock, which
+        # a concurrent save may have changed since they were loaded.
+        current = lock_note_versions(submitted) if submitted else {}
+        for note in updated:
+            if note.pk in current:
+                count_deltas[note.loaded_category_id] -= 1
+                count_deltas[note.category_id] += 1
+        for note in deleted:
+            if note.pk in current:
+                count_deltas[note.loaded_category_id] -= 1
+        if updated:
+            Note.objects.bulk_update(updated, sorted(update_fields))
+            record_revisions(
+                (note, *current[note.pk]) for note in updated if note.pk in current
+            )
+        if deleted:
+            NoteTombstone.objects.bulk_create(
+                [NoteTombstone(note_id=note.pk, user_id=user.pk) for note in deleted]
+            )
+            Note.objects.filter(pk__in=[note.pk for note in deleted]).delete()
+        adjust_category_note_counts(user.pk, count_deltas)
+        record_changes(
+            user.pk,
+            [
+                *(('note', 'created', note.pk) for note in created),
+                *(('note', 'updated', note.pk) for note in updated),
+                *(('note', 'deleted', note.pk) for note in deleted),
+                *(
+                    ('category', 'updated', category_id)
+                    for category_id, delta in count_deltas.items()
+                    if delta
+                ),
+            ],
+        )
+
+    for result in results:
+        result['id'] = result['note'].pk
+        if result['op'] == 'delete':
+            result['note'] = None
+    return results
+
+
+def encode_sync_token(watermark: datetime) -> str:
+    return signing.dumps(watermark.isoformat(), salt=SYNC_TOKEN_SALT, compress=True)
+
+
+def decode_sync_token(token: str) -> datetime:
+    try:
+        value = signing.loads(token, salt=SYNC_TOKEN_SALT)
+    except signing.BadSignature as exc:
+        raise InvalidSyncToken(token) from exc
+    watermark = parse_datetime(value) if isinstance(value, str) else None
+    if watermark is None:
+        raise InvalidSyncToken(token)
+    return watermark
+
+
+def sync_notes(
+    user: AbstractBaseUser, notes: QuerySet[Note], since: str | None
+) -> dict[str, Any]:
+    """Return the notes changed and deleted since ``since`` plus a new token.
+
+    Without a token, or with one older than the tombstone retention window,
+    every note is returned and ``full_sync`` tells the client to replace its
+    local copy instead of merging.
+    """
+    now = timezone.now()
+    watermark = decode_sync_token(since) if since else None
+    full_sync = watermark is None or watermark < now - TOMBSTONE_RETENTION
+
+    deleted: QuerySet[NoteTombstone] = NoteTombstone.objects.none()
+    if not full_sync:
+        assert watermark is not None
+        lower_bound = watermark - SYNC_OVERLAP
+        notes = notes.filter(updated_at__gt=lower_bound)
+        deleted = NoteTombstone.objects.filter(
+            user_id=user.pk, deleted_at__gt=lower_bound
+        )
+
+    return {
+        'notes': notes,
+        'deleted': deleted,
+        'full_sync': full_sync,
+        'watermark': encode_sync_token(now),
+    }
+
+
+def prune_note_tombstones(older_than: timedelta = TOMBSTONE_RETENTION) -> int:
+    total = 0
+    for alias in user_databases():
+        with use_database(alias):
+            deleted, _ = NoteTombstone.objects.filter(
+                deleted_at__lt=timezone.now() - older_than
+            ).delete()
+        total += deleted
+    return total
+
+
+def reconcile_category_note_counts() -> int:
+    """Recompute every ``Category.note_count`` from the notes table.
+
+    Returns the number of categories that had drifted.
+    """
+    fixed = 0
+    for alias in user_databases():
+        with use_database(alias):
+            fixed += _reconcile_category_note_counts()
+    return fixed
+
+
+def _reconcile_category_note_counts() -> int:
+    actual = Coalesce(
+        Subquery(
+            Note.objects.filter(category=OuterRef('pk'))
+            .order_by()
+            .values('category')
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        0,
+    )
+    drifted = Category.objects.annotate(actual=actual).exclude(note_count=F('actual'))
+    user_ids = set(drifted.values_list('user_id', flat=True))
+    fixed = Category.objects.filter(pk__in=drifted.values('pk')).update(
+        note_count=actual
+    )
+    for user_id in user_ids:
+        invalidate_category_list(user_id)
+    return fixed
+
+
+def prune_default_categories(dormant_for: timedelta) -> int:
+    """Delete the stored default categories of users who never used them.
+
+    Only users who joined and last logged in before ``dormant_for`` ago,
+    have no notes, deleted none since then, and whose categories are
+    exactly untouched defaults are affected. They go back to virtual
+    defaults, which are recreated identically on their next visit. Returns
+    the number of categories deleted.
+
+    Logins are only recorded with ``TRACK_LOGINS``, so this refuses to run
+    without it; users with no recorded login are left alone.
+    """
+    if not settings.TRACK_LOGINS:
+        raise ImproperlyConfigured(
+            "Pruning default categories needs TRACK_LOGINS=True to tell "
+            "dormant users apart."
+        )
+    cutoff = timezone.now() - dormant_for
+    untouched_default = Q(note_count=0) & Q(
+        *(Q(**category) for category in DEFAULT_CATEGORIES), _connector=Q.OR
+    )
+    dormant_users = (
+        get_user_model()
+        .objects.filter(date_joined__lt=cutoff, last_login__lt=cutoff)
     )
+    total = 0
+    for alias in user_databases():
+        batches: Iterable[Any] = [dormant_users.values('pk')]
+        if alias != DIRECTORY:
+            # Shards only hold stand-ins, whose logins aren't kept up to
+            # date, and a subquery can't span databases: pass ids instead.
+            ids = (
+                dormant_users.filter(shard=alias)
+                .values_list('pk', flat=True)
+                .iterator()
+            )
+            batches = iter(lambda: list(islice(ids, 1000)), [])
+        for users in batches:
+            with use_database(alias):
+                deleted, _ = (
+                    Category.objects.filter(user_id__in=users)
+                    .exclude(Exists(Note.objects.filter(user_id=OuterRef('user_id'))))
+                    .exclude(
+                        Exists(
+                            NoteTombstone.objects.filter(
+                                user_id=OuterRef('user_id'), deleted_at__gte=cutoff
+                            )
+                        )
+                    )
+                    .exclude(
+                        Exists(
+                            Category.objects.filter(user_id=OuterRef('user_id')).exclude(
+                                untouched_default
+                            )
+                        )
+                    )
+                    .delete()
+                )
+            total += deleted
+    return total
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.db import connections
+
+from notes.cache import invalidate_category_list, invalidate_default_category
+from notes.models import Category
+from notes.search import ensure_sqlite_search_index
+
+
+def ensure_search_index(using: str = "default", **kwargs: Any) -> None:
+    ensure_sqlite_search_index(connections[using])
+
+
+def invalidate_category_cache(instance: Category, **kwargs: Any) -> None:
+    invalidate_category_list(instance.user_id)
+    invalidate_default_category(instance.user_id)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import HttpResponseBase, StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.request import Request
+
+STREAM_CHUNK_SIZE = 500
+
+
+def render_json_array(
+    chunks: Iterable[list[Any]],
+    renderer: BaseRenderer,
+    renderer_context: dict[str, Any],
+) -> Iterator[bytes]:
+    """Yield one JSON array, rendering ``chunks`` of items as they come.
+
+    Each chunk is rendered on its own and spliced in without its brackets, so
+    the output matches rendering the concatenated list in one go.
+    """
+    yield b"["
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        body = renderer.render(chunk, renderer.media_type, renderer_context)
+        yield (b"" if first else b",") + body.strip()[1:-1]
+        first = False
+    yield b"]"
+
+
+class StreamingListMixin:
+    """Streams unpaginated JSON lists when ``STREAM_LISTS`` is on.
+
+    Rows are read through a server-side cursor ``stream_chunk_size`` at a
+    time and each chunk is serialized and rendered before the next is
+    fetched, so memory per request stays flat however many notes a user
+    has. Paginated requests and non-JSON renderers keep the regular path.
+    Compression, when negotiated, is applied to the stream incrementally by
+    ``config.compression.CompressionMiddleware``.
+    """
+
+    stream_chunk_size = STREAM_CHUNK_SIZE
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        if not self.should_stream(request):
+            return super().list(request, *args, **kwargs)  # type: ignore[misc]
+        queryset = self.filter_queryset(self.get_queryset())  # type: ignore[attr-defined]
+        # The rows are read after the view returns, when the routers no
+        # longer see the request (``config.routing``); pick the database now.
+        queryset = queryset.using(queryset.db)
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f"{content_type}; charset={renderer.charset}"
+        return StreamingHttpResponse(
+            render_json_array(
+                self.stream_chunks(queryset),
+                renderer,
+                self.get_renderer_context(),  # type: ignore[attr-defined]
+            ),
+            content_type=content_type,
+        )
+
+    def should_stream(self, request: Request) -> bool:
+        paginator = self.paginator  # type: ignore[attr-defined]
+        return (
+            settings.STREAM_LISTS
+            and isinstance(getattr(request, "accepted_renderer", None), JSONRenderer)
+            and (paginator is None or not paginator.is_requested(request))
+        )
+
+    def stream_chunks(self, queryset: QuerySet[Any]) -> Iterator[list[Any]]:
+        instances = queryset.iterator(chunk_size=self.stream_chunk_size)
+        while chunk := list(islice(instances, self.stream_chunk_size)):
+            yield self.get_serializer(chunk, many=True).data  # type: ignore[attr-defined]
@@ -1,9 +1,13 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from notes.views import CategoryViewSet, NoteViewSet
+from notes.views import CategoryViewSet, ChangeFeedView, NoteViewSet
 
 router = DefaultRouter()
 router.register('categories', CategoryViewSet, basename='category')
 router.register('notes', NoteViewSet, basename='note')
 
-urlpatterns = router.urls
+urlpatterns = [
+    *router.urls,
+    path('changes/', ChangeFeedView.as_view(), name='change-feed'),
+]
@@ -1,43 +1,154 @@
 from __future__ import annotations
 
-from typing import Any
+from itertools import islice
+from typing import Any, Iterator
 
-from django.db.models import Count, QuerySet
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, QuerySet
+from django.db.models.functions import Substr
+from django.http import HttpResponseBase
 from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
-from rest_framework import mixins, viewsets
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from notes.models import Category, Note
-from notes.serializers import CategorySerializer, NoteSerializer
+from config.sharding import database_for_user
+from notes.cache import (
+    CATEGORY_LIST_CACHE_TIMEOUT,
+    category_list_cache_key,
+    category_list_entry,
+)
+from notes.changes import changes_after, record_changes
+from notes.conditional import ConditionalViewSetMixin, make_etag, note_list_etag
+from notes.models import Category, Note, NoteRevision
+from notes.patches import InvalidPatch
+from notes.pagination import CategoryKeysetPagination, NoteKeysetPagination
+from notes.revisions import record_revisions, revision_content
+from notes.search import SEARCH_RESULT_LIMIT, search_notes
+from notes.streaming import StreamingListMixin
+from notes.services import (
+    ContentConflict,
+    InvalidSyncToken,
+    apply_note_batch,
+    create_default_categories,
+    delete_note,
+    ensure_default_categories,
+    get_default_category,
+    lock_note_versions,
+    patch_note_content,
+    sync_notes,
+)
+from notes.serializers import (
+    NOTE_PREVIEW_LENGTH,
+    NOTE_VALUES_FIELDS,
+    NoteBatchResponseSerializer,
+    NoteBatchSerializer,
+    CategorySerializer,
+    ChangeFeedSerializer,
+    NoteContentPatchSerializer,
+    NoteContentStateSerializer,
+    NoteRevisionDetailSerializer,
+    NoteRevisionSerializer,
+    NoteSearchResultSerializer,
+    NoteSerializer,
+    NoteSummarySerializer,
+    NoteSyncSerializer,
+    serialize_note_rows,
+)
+
+CATEGORY_FILTER_PARAMETER = OpenApiParameter(
+    name='category',
+    type=int,
+    location=OpenApiParameter.QUERY,
+    description='Filter notes by category ID',
+    required=False,
+)
+SEARCH_QUERY_PARAMETER = OpenApiParameter(
+    name='q',
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description='Full-text search terms matched against note title and content',
+    required=True,
+)
+CHANGE_FEED_AFTER_PARAMETER = OpenApiParameter(
+    name='after',
+    type=int,
+    location=OpenApiParameter.QUERY,
+    description='Id of the last event seen; omit to get only the current cursor',
+    required=False,
+)
+SYNC_SINCE_PARAMETER = OpenApiParameter(
+    name='since',
+    type=str,
+    location=OpenApiParameter.QUERY,
+    description='Watermark returned by the previous sync; omit for a full sync',
+    required=False,
+)
+
+
+ETAG_CATEGORY_FIELDS = ("id", "name", "color", "note_count")
 
 
 class CategoryViewSet(
+    ConditionalViewSetMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet[Category],
 ):
     serializer_class = CategorySerializer
+    pagination_class = CategoryKeysetPagination
+    # The conditional mixin defines update/destroy; categories are read-only.
+    http_method_names = ["get", "head", "options"]
 
     def get_queryset(self) -> QuerySet[Category]:
         assert self.request.user.is_authenticated
-        return Category.objects.filter(user=self.request.user).annotate(
-            note_count=Count("notes")
-        )
+        return Category.objects.filter(user_id=self.request.user.pk)
 
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        # Only the plain, unpaginated list is cached; it's what clients poll.
+        if request.query_params:
+            ensure_default_categories(request.user.pk)
+            return super().list(request, *args, **kwargs)
+        key = category_list_cache_key(request.user.pk)
+        cached = cache.get(key)
+        if cached is None:
+            data = list(self.get_serializer(self.get_queryset(), many=True).data)
+            if not data:
+                create_default_categories(request.user.pk)
+                data = list(self.get_serializer(self.get_queryset(), many=True).data)
+            cached = category_list_entry(request.user.pk, data)
+            cache.set(key, cached, CATEGORY_LIST_CACHE_TIMEOUT)
 
-@extend_schema_view(
-    list=extend_schema(
-        parameters=[
-            OpenApiParameter(
-                name='category',
-                type=int,
-                location=OpenApiParameter.QUERY,
-                description='Filter notes by category ID',
-                required=False,
-            )
-        ]
-    )
-)
+        def cached_response(request: Request) -> Response:
+            return Response(cached["data"])
+
+        response = self._conditional(request, cached["etag"], cached_response)
+        if response.status_code == 200:
+            response["ETag"] = cached["etag"]
+        return response
+
+    def get_list_etag(self) -> str | None:
+        rows = self.get_queryset().order_by("id").values_list(*ETAG_CATEGORY_FIELDS)
+        return make_etag(self.request.user.pk, self.request.get_full_path(), *rows)
+
+    def get_object_etag(self, lock: bool = False) -> str | None:
+        try:
+            categories = self.get_queryset().filter(pk=self.kwargs["pk"])
+        except (TypeError, ValueError):
+            return None
+        row = categories.values_list(*ETAG_CATEGORY_FIELDS).first()
+        return None if row is None else make_etag(*row)
+
+
+@extend_schema_view(list=extend_schema(parameters=[CATEGORY_FILTER_PARAMETER]))
 class NoteViewSet(
+    ConditionalViewSetMixin,
+    StreamingListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -46,22 +157,248 @@ class NoteViewSet(
     viewsets.GenericViewSet[Note],
 ):
     serializer_class = NoteSerializer
+    pagination_class = NoteKeysetPagination
     http_method_names = ["get", "post", "patch", "delete", "head", "options"]
 
-    def get_queryset(self) -> QuerySet[Note]:
+    def get_owned_notes(self) -> QuerySet[Note]:
         assert self.request.user.is_authenticated
-        qs = Note.objects.filter(user=self.request.user).select_related("category")
+        qs = Note.objects.filter(user_id=self.request.user.pk)
         category_id = self.request.query_params.get("category")
         if category_id is not None:
             qs = qs.filter(category_id=category_id)
         return qs
 
+    def get_queryset(self) -> QuerySet[Note]:
+        qs = self.get_owned_notes().select_related("category")
+        if self.action in ("summary", "search"):
+            qs = qs.defer("content").annotate(
+                preview=Substr("content", 1, NOTE_PREVIEW_LENGTH)
+            )
+        return qs
+
+    def get_list_etag(self) -> str | None:
+        stats = self.get_owned_notes().aggregate(
+            latest=Max("updated_at"), count=Count("id")
+        )
+        return note_list_etag(
+            self.request.user.pk,
+            self.action,
+            self.request.get_full_path(),
+            stats["latest"],
+            stats["count"],
+        )
+
+    def get_object_etag(self, lock: bool = False) -> str | None:
+        notes = self.get_owned_notes()
+        if lock:
+            notes = notes.select_for_update()
+        try:
+            notes = notes.filter(pk=self.kwargs["pk"])
+        except (TypeError, ValueError):
+            return None
+        row = notes.values_list("id", "updated_at").first()
+        return None if row is None else make_etag(*row)
+
+    def stream_chunks(self, queryset: QuerySet[Note]) -> Iterator[list[Any]]:
+        if self.action != "list":
+            yield from super().stream_chunks(queryset)
+            return
+        # Same output as NoteSerializer, without building model instances.
+        rows = queryset.values(*NOTE_VALUES_FIELDS).iterator(
+            chunk_size=self.stream_chunk_size
+        )
+        while chunk := list(islice(rows, self.stream_chunk_size)):
+            yield serialize_note_rows(chunk)
+
+    @extend_schema(
+        parameters=[CATEGORY_FILTER_PARAMETER],
+        responses=NoteSummarySerializer(many=True),
+    )
+    @action(detail=False, methods=["get"], serializer_class=NoteSummarySerializer)
+    def summary(self, request: Request) -> Response:
+        """Lists notes with a short content preview instead of the full body."""
+        return self.list(request)
+
+    @extend_schema(
+        parameters=[SEARCH_QUERY_PARAMETER, CATEGORY_FILTER_PARAMETER],
+        responses=NoteSearchResultSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        serializer_class=NoteSearchResultSerializer,
+        pagination_class=None,
+    )
+    def search(self, request: Request) -> Response:
+        """Returns the best-matching notes with a highlighted content snippet."""
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": ["This query parameter is required."]})
+        notes = search_notes(self.get_queryset(), query)[:SEARCH_RESULT_LIMIT]
+        serializer = self.get_serializer(notes, many=True)
+        return Response(serializer.data)
+
+    @extend_schema(parameters=[SYNC_SINCE_PARAMETER], responses=NoteSyncSerializer)
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def sync(self, request: Request) -> Response:
+        """Returns notes changed and deleted since the given watermark."""
+        try:
+            changes = sync_notes(
+                request.user, self.get_queryset(), request.query_params.get("since")
+            )
+        except InvalidSyncToken:
+            raise ValidationError({"since": ["Invalid sync watermark."]})
+        serializer = NoteSyncSerializer(changes, context=self.get_serializer_context())
+        return Response(serializer.data)
+
+    @extend_schema(request=NoteBatchSerializer, responses=NoteBatchResponseSerializer)
+    @action(
+        detail=False,
+        methods=["post"],
+        serializer_class=NoteBatchSerializer,
+        pagination_class=None,
+    )
+    def batch(self, request: Request) -> Response:
+        """Applies a list of create, update and delete operations atomically."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = apply_note_batch(
+            request.user, serializer.validated_data["operations"]
+        )
+        response = NoteBatchResponseSerializer(
+            {"results": results}, context=self.get_serializer_context()
+        )
+        return Response(response.data)
+
+    @extend_schema(
+        request=NoteContentPatchSerializer,
+        responses={200: NoteContentStateSerializer, 409: NoteContentStateSerializer},
+    )
+    @action(
+        detail=True,
+        methods=["patch"],
+        url_path="content",
+        serializer_class=NoteContentPatchSerializer,
+    )
+    def content(self, request: Request, pk: str | None = None) -> Response:
+        """Applies text edits to the note content instead of replacing it.
+
+        Returns 409 with the current content hash when the content changed
+        since ``base_hash``; the client should refetch and retry.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            note_id = int(pk or "")
+        except ValueError:
+            raise NotFound()
+        try:
+            note = patch_note_content(
+                self.get_owned_notes(),
+                note_id,
+                serializer.validated_data["base_hash"],
+                serializer.validated_data["edits"],
+            )
+        except Note.DoesNotExist:
+            raise NotFound()
+        except InvalidPatch as exc:
+            raise ValidationError({"edits": [str(exc)]})
+        except ContentConflict as exc:
+            return Response(
+                NoteContentStateSerializer(exc.note).data,
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(NoteContentStateSerializer(note).data)
+
+    @extend_schema(responses=NoteRevisionSerializer(many=True))
+    @action(
+        detail=True,
+        methods=["get"],
+        serializer_class=NoteRevisionSerializer,
+        pagination_class=None,
+    )
+    def revisions(self, request: Request, pk: str | None = None) -> Response:
+        """Lists the note's past versions, newest first."""
+        note = self.get_object()
+        serializer = self.get_serializer(note.revisions.all(), many=True)
+        return Response(serializer.data)
+
+    @extend_schema(responses=NoteRevisionDetailSerializer)
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path=r"revisions/(?P<number>[0-9]+)",
+        url_name="revision",
+        serializer_class=NoteRevisionDetailSerializer,
+        pagination_class=None,
+    )
+    def revision(
+        self, request: Request, pk: str | None = None, number: str = ""
+    ) -> Response:
+        """Returns one past version of the note, including its content."""
+        note = self.get_object()
+        try:
+            revision = note.revisions.get(number=number)
+        except NoteRevision.DoesNotExist:
+            raise NotFound()
+        revision.content = revision_content(note, revision.number)  # type: ignore[attr-defined]
+        return Response(self.get_serializer(revision).data)
+
+    def perform_update(self, serializer: Any) -> None:
+        note = serializer.instance
+        with transaction.atomic(using=note._state.db):
+            current = lock_note_versions([(note, serializer.validated_data)])
+            previous_category_id = note.loaded_category_id
+            serializer.save()
+            if note.pk in current:
+                record_revisions([(note, *current[note.pk])])
+            changes = [("note", "updated", note.pk)]
+            if note.category_id != previous_category_id:
+                changes += [
+                    ("category", "updated", previous_category_id),
+                    ("category", "updated", note.category_id),
+                ]
+            record_changes(note.user_id, changes)
+
     def perform_create(self, serializer: Any) -> None:
-        instance = serializer.save(user=self.request.user)
-        if instance.category_id is None:
-            default = Category.objects.filter(
-                user=self.request.user, name='Random Thoughts'
-            ).first()
-            if default:
-                instance.category = default
-                instance.save(update_fields=['category'])
+        category = serializer.validated_data.get("category")
+        if category is None:
+            category = get_default_category(self.request.user.pk)
+        with transaction.atomic(using=database_for_user(self.request.user.pk)):
+            note = serializer.save(user_id=self.request.user.pk, category=category)
+            record_changes(
+                note.user_id,
+                [
+                    ("note", "created", note.pk),
+                    ("category", "updated", note.category_id),
+                ],
+            )
+
+    def perform_destroy(self, instance: Note) -> None:
+        delete_note(instance)
+
+
+class ChangeFeedView(APIView):
+    def perform_content_negotiation(
+        self, request: Request, force: bool = False
+    ) -> tuple[Any, str]:
+        # EventSource only accepts text/event-stream. Whatever the stream
+        # view turns down (auth errors, WSGI) is answered in JSON instead.
+        return super().perform_content_negotiation(request, force=True)
+
+    @extend_schema(
+        parameters=[CHANGE_FEED_AFTER_PARAMETER], responses=ChangeFeedSerializer
+    )
+    def get(self, request: Request) -> Response:
+        """Returns the note and category changes made after event ``after``.
+
+        Under ASGI, requests that accept ``text/event-stream`` get the same
+        events pushed as server-sent events instead (``notes.async_views``).
+        """
+        if not settings.CHANGE_FEED:
+            raise NotFound()
+        after = request.query_params.get("after")
+        if after is not None and not after.isdigit():
+            raise ValidationError({"after": ["Must be an event id."]})
+        feed = changes_after(request.user.pk, None if after is None else int(after))
+        return Response(ChangeFeedSerializer(feed).data)
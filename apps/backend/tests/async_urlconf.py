@@ -0,0 +1,5 @@
+from django.urls import include, path
+
+from config.urls import urlpatterns as base_urlpatterns
+
+urlpatterns = [path("api/", include("notes.async_urls")), *base_urlpatterns]
@@ -29,3 +29,26 @@ def test_admin_can_list_categories(admin_client):
 def test_admin_can_list_notes(admin_client):
     response = admin_client.get('/admin/notes/note/')
     assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_admin_bulk_delete_keeps_note_counts(admin_client):
+    from notes.factories import CategoryFactory, NoteFactory
+    from notes.models import Note
+
+    category = CategoryFactory()
+    notes = NoteFactory.create_batch(3, user=category.user, category=category)
+
+    response = admin_client.post(
+        '/admin/notes/note/',
+        {
+            'action': 'delete_selected',
+            '_selected_action': [note.pk for note in notes[:2]],
+            'post': 'yes',
+        },
+    )
+
+    assert response.status_code == 302
+    assert Note.objects.count() == 1
+    category.refresh_from_db()
+    assert category.note_count == 1
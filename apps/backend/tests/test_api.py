@@ -55,6 +55,174 @@ def test_category_note_count_excludes_other_users_notes(authenticated_client, us
     assert data["note_count"] == 2
 
 
+# ── Default categories ────────────────────────────────────────────────────────
+
+
+@pytest.mark.django_db
+def test_create_note_without_category_provisions_defaults(authenticated_client, user):
+    from notes.services import DEFAULT_CATEGORIES
+
+    response = authenticated_client.post(NOTES_URL, {})
+
+    assert response.status_code == 201
+    assert response.data["category"]["name"] == "Random Thoughts"
+    assert user.categories.count() == len(DEFAULT_CATEGORIES)
+
+
+@pytest.mark.django_db
+def test_paginated_category_list_provisions_defaults(authenticated_client, user):
+    response = authenticated_client.get(CATEGORIES_URL, {"page_size": 2})
+
+    assert [c["name"] for c in response.data] == ["Personal", "Random Thoughts"]
+
+
+@pytest.fixture
+def track_logins(settings, monkeypatch):
+    from rest_framework_simplejwt import serializers
+
+    settings.TRACK_LOGINS = True
+    # simplejwt's serializers keep the api_settings they were imported with.
+    monkeypatch.setattr(serializers.api_settings, "UPDATE_LAST_LOGIN", True)
+
+
+@pytest.mark.django_db
+def test_prune_default_categories_only_touches_dormant_users(user, track_logins):
+    from datetime import timedelta
+
+    from django.core.management import call_command
+    from django.utils import timezone
+
+    from accounts.factories import UserFactory
+    from notes.factories import NoteFactory
+    from notes.services import create_default_categories
+
+    long_ago = timezone.now() - timedelta(days=365)
+    dormant, with_note, renamed = UserFactory.create_batch(
+        3, date_joined=long_ago, last_login=long_ago
+    )
+    for account in (dormant, with_note, renamed, user):
+        create_default_categories(account.pk)
+    NoteFactory(user=with_note, category=None)
+    renamed.categories.filter(name="School").update(name="Work")
+
+    call_command("prune_default_categories", "--days", "30")
+
+    assert not dormant.categories.exists()
+    assert with_note.categories.count() == 3
+    assert renamed.categories.count() == 3
+    assert user.categories.count() == 3
+
+
+@pytest.mark.django_db
+def test_prune_default_categories_keeps_active_users(api_client, track_logins):
+    from datetime import timedelta
+
+    from django.core.management import call_command
+    from django.utils import timezone
+
+    from accounts.factories import UserFactory
+    from notes.factories import NoteFactory
+    from notes.services import create_default_categories
+
+    long_ago = timezone.now() - timedelta(days=365)
+    logged_in, deleted_a_note, never_recorded = UserFactory.create_batch(
+        3, date_joined=long_ago, last_login=long_ago
+    )
+    never_recorded.last_login = None
+    never_recorded.save()
+    for account in (logged_in, deleted_a_note, never_recorded):
+        create_default_categories(account.pk)
+    response = api_client.post(
+        "/api/auth/token/", {"email": logged_in.email, "password": "testpass123"}
+    )
+    assert response.status_code == 200
+    note = NoteFactory(user=deleted_a_note, category=None)
+    api_client.force_authenticate(deleted_a_note)
+    assert api_client.delete(f"/api/notes/{note.pk}/").status_code == 204
+
+    call_command("prune_default_categories", "--days", "30")
+
+    for account in (logged_in, deleted_a_note, never_recorded):
+        assert account.categories.count() == 3
+
+
+@pytest.mark.django_db
+def test_prune_default_categories_needs_login_tracking(api_client, user):
+    from django.core.management import CommandError, call_command
+
+    api_client.post("/api/auth/token/", {"email": user.email, "password": "testpass123"})
+
+    user.refresh_from_db()
+    assert user.last_login is None
+    with pytest.raises(CommandError, match="TRACK_LOGINS"):
+        call_command("prune_default_categories")
+
+
+@pytest.mark.django_db
+def test_create_note_without_category_is_single_insert(authenticated_client, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from notes.services import create_default_categories
+
+    create_default_categories(user.pk)
+    authenticated_client.post(NOTES_URL, {})  # warms the default-category cache
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = authenticated_client.post(NOTES_URL, {"title": "Second"})
+
+    assert response.status_code == 201
+    assert response.data["category"]["name"] == "Random Thoughts"
+    note_writes = [q["sql"] for q in ctx.captured_queries if "notes_note" in q["sql"]]
+    assert len(note_writes) == 1
+    assert note_writes[0].startswith('INSERT INTO "notes_note"')
+    assert not any(
+        q["sql"].startswith("SELECT") and "notes_category" in q["sql"]
+        for q in ctx.captured_queries
+    )
+
+
+@pytest.mark.django_db
+def test_default_category_follows_is_default_flag(authenticated_client, user):
+    from notes.factories import CategoryFactory
+
+    CategoryFactory(user=user, name="Random Thoughts")
+    inbox = CategoryFactory(user=user, name="Inbox", is_default=True)
+
+    response = authenticated_client.post(NOTES_URL, {})
+
+    assert response.data["category"]["id"] == inbox.id
+
+
+@pytest.mark.django_db
+def test_deleted_default_category_is_not_reused(authenticated_client, user):
+    from django.core.cache import cache
+
+    from notes.cache import default_category_cache_key
+
+    authenticated_client.post(NOTES_URL, {})
+    assert cache.get(default_category_cache_key(user.pk))
+
+    # As the admin or the prune command would, from any process.
+    user.categories.filter(is_default=True).delete()
+    response = authenticated_client.post(NOTES_URL, {})
+
+    assert cache.get(default_category_cache_key(user.pk)) == {}
+    assert response.status_code == 201
+    assert response.data["category"] is None
+
+
+@pytest.mark.django_db
+def test_only_one_default_category_per_user(user):
+    from django.db import IntegrityError
+
+    from notes.factories import CategoryFactory
+
+    CategoryFactory(user=user, is_default=True)
+    with pytest.raises(IntegrityError):
+        CategoryFactory(user=user, is_default=True)
+
+
 # ── Notes ─────────────────────────────────────────────────────────────────────
 
 
@@ -206,3 +374,269 @@ def test_retrieve_note_with_null_category(authenticated_client, user):
 
     assert response.status_code == 200
     assert response.data["category"] is None
+
+
+# ── Note summaries ────────────────────────────────────────────────────────────
+
+NOTE_SUMMARY_URL = f"{NOTES_URL}summary/"
+
+
+@pytest.mark.django_db
+def test_note_summary_returns_preview_without_content(authenticated_client, user):
+    from notes.factories import CategoryFactory, NoteFactory
+    from notes.serializers import NOTE_PREVIEW_LENGTH
+
+    category = CategoryFactory(user=user)
+    note = NoteFactory(user=user, category=category, content="x" * 5000)
+
+    response = authenticated_client.get(NOTE_SUMMARY_URL)
+
+    assert response.status_code == 200
+    assert len(response.data) == 1
+    data = response.data[0]
+    assert set(data) == {"id", "title", "preview", "category", "created_at", "updated_at"}
+    assert data["id"] == note.id
+    assert data["preview"] == "x" * NOTE_PREVIEW_LENGTH
+    assert data["category"]["id"] == category.id
+
+
+@pytest.mark.django_db
+def test_note_summary_does_not_load_content_column(authenticated_client, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from notes.factories import NoteFactory
+
+    NoteFactory.create_batch(2, user=user)
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = authenticated_client.get(NOTE_SUMMARY_URL)
+
+    assert response.status_code == 200
+    sql = next(q["sql"] for q in ctx.captured_queries if "notes_note" in q["sql"])
+    assert sql.count('"notes_note"."content"') == sql.count('SUBSTR("notes_note"."content"')
+
+
+@pytest.mark.django_db
+def test_note_summary_filters_by_category(authenticated_client, user):
+    from notes.factories import CategoryFactory, NoteFactory
+
+    category = CategoryFactory(user=user)
+    NoteFactory.create_batch(2, user=user, category=category)
+    NoteFactory.create_batch(3, user=user)
+
+    response = authenticated_client.get(NOTE_SUMMARY_URL, {"category": category.id})
+
+    assert response.status_code == 200
+    assert len(response.data) == 2
+
+
+@pytest.mark.django_db
+def test_retrieve_note_still_returns_full_content(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user, content="y" * 5000)
+
+    response = authenticated_client.get(f"{NOTES_URL}{note.id}/")
+
+    assert response.status_code == 200
+    assert response.data["content"] == "y" * 5000
+
+
+# ── Note search ───────────────────────────────────────────────────────────────
+
+NOTE_SEARCH_URL = f"{NOTES_URL}search/"
+
+
+@pytest.mark.django_db
+def test_search_notes_matches_title_and_content(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    by_title = NoteFactory(user=user, title="Grocery list", content="milk")
+    by_content = NoteFactory(user=user, title="Errands", content="buy grocery bags")
+    NoteFactory(user=user, title="Unrelated", content="nothing here")
+
+    response = authenticated_client.get(NOTE_SEARCH_URL, {"q": "grocery"})
+
+    assert response.status_code == 200
+    assert {n["id"] for n in response.data} == {by_title.id, by_content.id}
+    # Title matches are weighted above content matches.
+    assert response.data[0]["id"] == by_title.id
+
+
+@pytest.mark.django_db
+def test_search_notes_highlights_snippet(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    NoteFactory(user=user, content="remember to water the plants tomorrow")
+
+    response = authenticated_client.get(NOTE_SEARCH_URL, {"q": "plants"})
+
+    assert response.status_code == 200
+    assert "<mark>plants</mark>" in response.data[0]["snippet"]
+    assert "content" not in response.data[0]
+
+
+@pytest.mark.django_db
+def test_search_snippet_escapes_note_markup(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    NoteFactory(user=user, content="water the plants <script>alert(1)</script>")
+
+    response = authenticated_client.get(NOTE_SEARCH_URL, {"q": "plants"})
+
+    snippet = response.data[0]["snippet"]
+    assert "<mark>plants</mark>" in snippet
+    # PostgreSQL drops the tags itself; SQLite keeps them, escaped.
+    assert "<" not in snippet.replace("<mark>", "").replace("</mark>", "")
+
+
+@pytest.mark.django_db
+def test_search_notes_reflects_updates_and_deletes(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user, title="Draft", content="alpha")
+    authenticated_client.patch(f"{NOTES_URL}{note.id}/", {"content": "omega"})
+
+    assert authenticated_client.get(NOTE_SEARCH_URL, {"q": "alpha"}).data == []
+    assert len(authenticated_client.get(NOTE_SEARCH_URL, {"q": "omega"}).data) == 1
+
+    authenticated_client.delete(f"{NOTES_URL}{note.id}/")
+    assert authenticated_client.get(NOTE_SEARCH_URL, {"q": "omega"}).data == []
+
+
+@pytest.mark.django_db
+def test_search_notes_only_own(authenticated_client, user):
+    from notes.factories import NoteFactory
+    from accounts.factories import UserFactory
+
+    NoteFactory(user=UserFactory(), title="secret plans")
+
+    response = authenticated_client.get(NOTE_SEARCH_URL, {"q": "secret"})
+
+    assert response.status_code == 200
+    assert response.data == []
+
+
+@pytest.mark.django_db
+def test_search_notes_treats_syntax_as_plain_text(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    NoteFactory(user=user, title="quote test")
+
+    response = authenticated_client.get(NOTE_SEARCH_URL, {"q": 'quote" OR *'})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_search_notes_requires_query(authenticated_client, user):
+    response = authenticated_client.get(NOTE_SEARCH_URL, {"q": "  "})
+
+    assert response.status_code == 400
+
+
+# ── Category note counts ──────────────────────────────────────────────────────
+
+
+def _note_count(client, category_id):
+    response = client.get(CATEGORIES_URL)
+    return next(c["note_count"] for c in response.data if c["id"] == category_id)
+
+
+@pytest.mark.django_db
+def test_category_note_count_follows_note_mutations(authenticated_client, user):
+    from notes.factories import CategoryFactory
+
+    cat_a = CategoryFactory(user=user)
+    cat_b = CategoryFactory(user=user)
+
+    note = authenticated_client.post(NOTES_URL, {"category_id": cat_a.id}).data
+    assert _note_count(authenticated_client, cat_a.id) == 1
+
+    authenticated_client.patch(f"{NOTES_URL}{note['id']}/", {"category_id": cat_b.id})
+    assert _note_count(authenticated_client, cat_a.id) == 0
+    assert _note_count(authenticated_client, cat_b.id) == 1
+
+    authenticated_client.delete(f"{NOTES_URL}{note['id']}/")
+    assert _note_count(authenticated_client, cat_b.id) == 0
+
+
+@pytest.mark.django_db
+def test_category_note_count_follows_batch(authenticated_client, user):
+    from notes.factories import CategoryFactory, NoteFactory
+
+    cat_a = CategoryFactory(user=user)
+    cat_b = CategoryFactory(user=user)
+    moved, removed = NoteFactory.create_batch(2, user=user, category=cat_a)
+
+    authenticated_client.post(
+        f"{NOTES_URL}batch/",
+        {
+            "operations": [
+                {"op": "create", "data": {"category_id": cat_b.id}},
+                {"op": "update", "id": moved.id, "data": {"category_id": cat_b.id}},
+                {"op": "delete", "id": removed.id},
+            ]
+        },
+        format="json",
+    )
+
+    assert _note_count(authenticated_client, cat_a.id) == 0
+    assert _note_count(authenticated_client, cat_b.id) == 2
+
+
+@pytest.mark.django_db
+def test_category_list_is_cached_per_user(authenticated_client, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from notes.factories import CategoryFactory
+
+    CategoryFactory(user=user)
+    authenticated_client.get(CATEGORIES_URL)
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = authenticated_client.get(CATEGORIES_URL)
+
+    assert response.status_code == 200
+    assert len(response.data) == 1
+    assert not any("notes_category" in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_reconcile_category_counts_command(user):
+    from django.core.management import call_command
+    from notes.factories import CategoryFactory, NoteFactory
+    from notes.models import Category
+
+    category = CategoryFactory(user=user)
+    NoteFactory.create_batch(3, user=user, category=category)
+    Category.objects.filter(pk=category.pk).update(note_count=42)
+
+    call_command("reconcile_category_counts")
+
+    category.refresh_from_db()
+    assert category.note_count == 3
+
+
+@pytest.mark.django_db
+def test_seed_benchmark_data_command_is_reproducible():
+    from django.contrib.auth import authenticate
+    from django.core.management import call_command
+    from notes.models import Category, Note
+
+    def seeded():
+        return list(
+            Note.objects.filter(user__email__endswith="@bench.example.com")
+            .order_by("id")
+            .values_list("user__email", "title", "content")
+        )
+
+    call_command("seed_benchmark_data", "--users", "5", "--notes", "40", "--seed", "7")
+    first = seeded()
+    call_command("seed_benchmark_data", "--users", "5", "--notes", "40", "--seed", "7")
+
+    assert len(first) == 40
+    assert seeded() == first
+    assert authenticate(email="user0@bench.example.com", password="benchmark-password")
+    for category in Category.objects.filter(user__email__endswith="@bench.example.com"):
+        assert category.note_count == category.notes.count()
@@ -0,0 +1,112 @@
+import pytest
+from django.test import override_settings
+
+CATEGORIES_URL = "/api/categories/"
+NOTES_URL = "/api/notes/"
+ASYNC_URLCONF = "tests.async_urlconf"
+
+
+def _no_fallback(request, *args, **kwargs):
+    raise AssertionError("expected the async path to serve this request")
+
+
+@pytest.fixture
+def async_only(monkeypatch):
+    from notes import async_views
+
+    for view in (
+        async_views.NoteListAsyncView,
+        async_views.NoteDetailAsyncView,
+        async_views.CategoryListAsyncView,
+        async_views.CategoryDetailAsyncView,
+    ):
+        monkeypatch.setattr(view, "fallback", staticmethod(_no_fallback))
+
+
+@pytest.fixture
+def notes(user):
+    from notes.factories import CategoryFactory, NoteFactory
+
+    category = CategoryFactory(user=user)
+    return [
+        NoteFactory(user=user, category=category),
+        NoteFactory(user=user, category=None),
+        NoteFactory(user=user),
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "path",
+    [
+        "notes/",
+        "notes/{note}/",
+        "notes/?category={category}",
+        "categories/",
+        "categories/{category}/",
+    ],
+)
+def test_async_reads_match_sync_responses(authenticated_client, notes, path):
+    url = "/api/" + path.format(note=notes[0].id, category=notes[0].category_id)
+    sync_response = authenticated_client.get(url)
+    with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+        async_response = authenticated_client.get(url)
+
+    assert async_response.status_code == sync_response.status_code == 200
+    assert async_response.content == sync_response.content
+    assert async_response["Content-Type"] == sync_response["Content-Type"]
+    assert async_response["ETag"] == sync_response["ETag"]
+
+
+@pytest.mark.django_db
+@override_settings(ROOT_URLCONF=ASYNC_URLCONF)
+def test_async_reads_do_not_fall_back(authenticated_client, notes, async_only):
+    assert authenticated_client.get(NOTES_URL).status_code == 200
+    assert authenticated_client.get(f"{NOTES_URL}{notes[0].id}/").status_code == 200
+    assert authenticated_client.get(CATEGORIES_URL).status_code == 200
+
+
+@pytest.mark.django_db
+@override_settings(ROOT_URLCONF=ASYNC_URLCONF)
+def test_async_reads_return_304_when_unchanged(authenticated_client, notes):
+    for url in (NOTES_URL, f"{NOTES_URL}{notes[0].id}/", CATEGORIES_URL):
+        etag = authenticated_client.get(url)["ETag"]
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert "Authorization" in response["Vary"]
+
+
+@pytest.mark.django_db
+@override_settings(ROOT_URLCONF=ASYNC_URLCONF)
+def test_async_urls_fall_back_for_writes_and_pagination(authenticated_client, notes):
+    created = authenticated_client.post(NOTES_URL, {"title": "New"}, format="json")
+    assert created.status_code == 201
+
+    patched = authenticated_client.patch(
+        f"{NOTES_URL}{notes[0].id}/", {"title": "Edited"}, format="json"
+    )
+    assert patched.status_code == 200
+    assert patched.data["title"] == "Edited"
+
+    page = authenticated_client.get(NOTES_URL, {"page_size": 2})
+    assert len(page.data) == 2
+    assert "Link" in page
+
+    # Extra actions are not shadowed by the detail route.
+    assert authenticated_client.get(f"{NOTES_URL}summary/").status_code == 200
+
+
+@pytest.mark.django_db
+@override_settings(ROOT_URLCONF=ASYNC_URLCONF)
+def test_async_urls_keep_drf_errors(authenticated_client, notes):
+    from rest_framework.test import APIClient
+
+    from notes.factories import NoteFactory
+
+    unauthenticated = APIClient().get(NOTES_URL)
+    assert unauthenticated.status_code == 401
+    assert unauthenticated.data["detail"]
+
+    other = NoteFactory()
+    assert authenticated_client.get(f"{NOTES_URL}{other.id}/").status_code == 404
@@ -67,3 +67,104 @@ def test_token_refresh_success(api_client, user):
 def test_token_refresh_invalid(api_client):
     response = api_client.post(REFRESH_URL, {"refresh": "not-a-valid-token"})
     assert response.status_code == 401
+
+
+# ── Password hashing ─────────────────────────────────────────────────────────
+
+
+@pytest.mark.django_db
+def test_new_passwords_use_tuned_argon2(user):
+    assert user.password.startswith("argon2$argon2id$v=19$m=19456,t=2,p=1$")
+
+
+@pytest.mark.django_db
+def test_login_upgrades_legacy_pbkdf2_hash(api_client, user):
+    from django.contrib.auth.hashers import make_password
+
+    user.password = make_password("testpass123", hasher="pbkdf2_sha256")
+    user.save(update_fields=["password"])
+
+    response = api_client.post(
+        LOGIN_URL, {"email": user.email, "password": "testpass123"}
+    )
+
+    assert response.status_code == 200
+    user.refresh_from_db()
+    assert user.password.startswith("argon2$")
+    assert user.check_password("testpass123")
+
+
+@pytest.mark.django_db
+def test_hashing_runs_on_bounded_pool(api_client, user, settings):
+    import threading
+
+    from accounts.hashers import run_in_hashing_pool
+
+    settings.PASSWORD_HASHING_THREADS = 2
+
+    thread = run_in_hashing_pool(threading.current_thread)
+    response = api_client.post(
+        LOGIN_URL, {"email": user.email, "password": "testpass123"}
+    )
+
+    assert thread.name.startswith("password-hashing")
+    assert response.status_code == 200
+
+
+# ── Registration ─────────────────────────────────────────────────────────────
+
+
+def _data_queries(captured):
+    # Savepoints come from the test's own transaction, not from the view.
+    return [
+        q["sql"]
+        for q in captured
+        if not q["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+    ]
+
+
+@pytest.mark.django_db
+def test_register_is_one_insert(api_client):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    payload = {"email": "fast@example.com", "password": "securepassword123"}
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.post(REGISTER_URL, payload)
+
+    assert response.status_code == 201
+    queries = _data_queries(ctx.captured_queries)
+    assert len(queries) == 1
+    assert queries[0].startswith('INSERT INTO "accounts_user"')
+
+
+@pytest.mark.django_db
+def test_register_provisions_default_categories_on_first_list(api_client):
+    from accounts.models import User
+    from notes.services import DEFAULT_CATEGORIES
+
+    payload = {"email": "cats@example.com", "password": "securepassword123"}
+    tokens = api_client.post(REGISTER_URL, payload).data
+    user = User.objects.get(email="cats@example.com")
+    assert not user.categories.exists()
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    response = api_client.get("/api/categories/")
+
+    assert [(c["name"], c["color"]) for c in response.data] == sorted(
+        (c["name"], c["color"]) for c in DEFAULT_CATEGORIES
+    )
+    assert user.categories.count() == len(DEFAULT_CATEGORIES)
+
+
+@pytest.mark.django_db
+def test_register_duplicate_email_rolls_back(api_client, user):
+    from notes.models import Category
+
+    categories_before = Category.objects.count()
+    payload = {"email": user.email, "password": "securepassword123"}
+    response = api_client.post(REGISTER_URL, payload)
+
+    assert response.status_code == 400
+    assert response.data["email"] == ["A user with this email already exists."]
+    assert Category.objects.count() == categories_before
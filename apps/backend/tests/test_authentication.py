@@ -0,0 +1,111 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+ME_URL = "/api/auth/me/"
+NOTES_URL = "/api/notes/"
+CATEGORIES_URL = "/api/categories/"
+
+
+@pytest.fixture
+def stateless_auth(monkeypatch):
+    from rest_framework.views import APIView
+
+    from accounts.authentication import StatelessJWTAuthentication
+
+    monkeypatch.setattr(
+        APIView, "authentication_classes", [StatelessJWTAuthentication]
+    )
+
+
+def _user_queries(queries):
+    return [q["sql"] for q in queries if "accounts_user" in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_lazy_user_answers_id_without_loading(user):
+    from accounts.authentication import LazyUser
+
+    lazy = LazyUser(user.pk)
+    with CaptureQueriesContext(connection) as ctx:
+        assert lazy.pk == lazy.id == user.pk
+        assert lazy.is_authenticated and not lazy.is_anonymous
+        assert bool(lazy)
+    assert len(ctx.captured_queries) == 0
+
+    assert lazy.email == user.email
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", [NOTES_URL, CATEGORIES_URL, f"{NOTES_URL}summary/"])
+def test_stateless_reads_skip_user_lookup(stateless_auth, authenticated_client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = authenticated_client.get(url)
+
+    assert response.status_code == 200
+    assert _user_queries(ctx.captured_queries) == []
+
+
+@pytest.mark.django_db
+def test_stateless_create_skips_user_lookup(stateless_auth, authenticated_client, user):
+    with CaptureQueriesContext(connection) as ctx:
+        response = authenticated_client.post(NOTES_URL, {"title": "Hi"}, format="json")
+
+    assert response.status_code == 201
+    assert _user_queries(ctx.captured_queries) == []
+    assert user.notes.count() == 1
+
+
+@pytest.mark.django_db
+def test_stateless_loads_user_once_then_serves_from_lru(
+    stateless_auth, authenticated_client, user
+):
+    first = authenticated_client.get(ME_URL)
+    with CaptureQueriesContext(connection) as ctx:
+        second = authenticated_client.get(ME_URL)
+
+    assert first.data == second.data == {"email": user.email}
+    assert _user_queries(ctx.captured_queries) == []
+
+
+@pytest.mark.django_db
+def test_stateless_rejects_deactivated_user(stateless_auth, authenticated_client, user):
+    assert authenticated_client.get(ME_URL).status_code == 200
+
+    user.is_active = False
+    user.save()
+
+    assert authenticated_client.get(NOTES_URL).status_code == 401
+
+
+@pytest.mark.django_db
+def test_stateless_rejects_deleted_user(stateless_auth, authenticated_client, user):
+    user.delete()
+
+    assert authenticated_client.get(NOTES_URL).status_code == 401
+
+
+@pytest.mark.django_db
+def test_stateless_accepts_tokens_issued_after_revocation(
+    stateless_auth, api_client, user, monkeypatch
+):
+    import time
+    from datetime import timedelta
+
+    from django.utils import timezone
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from accounts.authentication import revoke_user_tokens
+
+    now = time.time()
+    old_token = AccessToken.for_user(user)
+    old_token.set_iat(at_time=timezone.now() - timedelta(minutes=1))
+    with monkeypatch.context() as m:
+        m.setattr(time, "time", lambda: now - 30)
+        revoke_user_tokens(user.pk)
+    new_token = AccessToken.for_user(user)
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {old_token}")
+    assert api_client.get(NOTES_URL).status_code == 401
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {new_token}")
+    assert api_client.get(NOTES_URL).status_code == 200
@@ -0,0 +1,205 @@
+import pytest
+
+BATCH_URL = "/api/notes/batch/"
+
+
+@pytest.mark.django_db
+def test_batch_applies_mixed_operations(authenticated_client, user):
+    from notes.factories import CategoryFactory, NoteFactory
+    from notes.models import Note, NoteTombstone
+
+    category = CategoryFactory(user=user)
+    to_update = NoteFactory(user=user, title="Before")
+    to_delete = NoteFactory(user=user)
+
+    response = authenticated_client.post(
+        BATCH_URL,
+        {
+            "operations": [
+                {"op": "create", "data": {"title": "New", "category_id": category.id}},
+                {"op": "update", "id": to_update.id, "data": {"title": "After"}},
+                {"op": "delete", "id": to_delete.id},
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200
+    created, updated, deleted = response.data["results"]
+    assert created["op"] == "create"
+    assert created["note"]["title"] == "New"
+    assert created["note"]["category"]["id"] == category.id
+    assert Note.objects.get(pk=created["id"]).user == user
+    assert updated["note"]["title"] == "After"
+    to_update.refresh_from_db()
+    assert to_update.title == "After"
+    assert deleted == {"op": "delete", "id": to_delete.id, "note": None}
+    assert not Note.objects.filter(pk=to_delete.id).exists()
+    assert NoteTombstone.objects.filter(note_id=to_delete.id).exists()
+
+
+@pytest.mark.django_db
+def test_batch_create_assigns_default_category(authenticated_client, user):
+    from notes.factories import CategoryFactory
+
+    default = CategoryFactory(user=user, name="Random Thoughts", is_default=True)
+
+    response = authenticated_client.post(
+        BATCH_URL,
+        {"operations": [{"op": "create"}, {"op": "create", "data": {"title": "B"}}]},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert all(r["note"]["category"]["id"] == default.id for r in response.data["results"])
+
+
+@pytest.mark.django_db
+def test_batch_is_all_or_nothing(authenticated_client, user):
+    from notes.factories import NoteFactory
+    from notes.models import Note
+
+    note = NoteFactory(user=user, title="Unchanged")
+
+    response = authenticated_client.post(
+        BATCH_URL,
+        {
+            "operations": [
+                {"op": "update", "id": note.id, "data": {"title": "Changed"}},
+                {"op": "create", "data": {"title": "x" * 300}},
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == 400
+    errors = response.data["operations"]
+    assert errors[0] == {}
+    assert "title" in errors[1]["data"]
+    note.refresh_from_db()
+    assert note.title == "Unchanged"
+    assert Note.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_batch_rejects_other_users_notes(authenticated_client, user):
+    from notes.factories import NoteFactory
+    from accounts.factories import UserFactory
+
+    other = NoteFactory(user=UserFactory())
+
+    response = authenticated_client.post(
+        BATCH_URL,
+        {"operations": [{"op": "delete", "id": other.id}]},
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert response.data["operations"][0]["id"] == ["Not found."]
+
+
+@pytest.mark.django_db
+def test_batch_rejects_other_users_category(authenticated_client, user):
+    from notes.factories import CategoryFactory
+    from accounts.factories import UserFactory
+
+    other_category = CategoryFactory(user=UserFactory())
+
+    response = authenticated_client.post(
+        BATCH_URL,
+        {"operations": [{"op": "create", "data": {"category_id": other_category.id}}]},
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert "category_id" in response.data["operations"][0]["data"]
+
+
+@pytest.mark.django_db
+def test_batch_validates_operation_shape(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user)
+
+    response = authenticated_client.post(
+        BATCH_URL,
+        {
+            "operations": [
+                {"op": "update"},
+                {"op": "create", "id": 1},
+                {"op": "delete", "id": note.id},
+                {"op": "delete", "id": note.id},
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == 400
+    errors = response.data["operations"]
+    assert "id" in errors[0]
+    assert "id" in errors[1]
+
+
+@pytest.mark.django_db
+def test_batch_writes_in_constant_queries(authenticated_client, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from notes.factories import NoteFactory
+
+    def run(size):
+        notes = NoteFactory.create_batch(size * 2, user=user)
+        operations = [{"op": "create", "data": {"title": "n"}} for _ in range(size)]
+        operations += [
+            {"op": "update", "id": n.id, "data": {"title": "u"}} for n in notes[:size]
+        ]
+        operations += [{"op": "delete", "id": n.id} for n in notes[size:]]
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.post(
+                BATCH_URL, {"operations": operations}, format="json"
+            )
+        assert response.status_code == 200
+        return len(ctx.captured_queries)
+
+    assert run(2) == run(20)
+
+
+@pytest.mark.django_db
+def test_batch_keeps_concurrent_category_moves(authenticated_client, user, monkeypatch):
+    from notes import views
+    from notes.factories import CategoryFactory, NoteFactory
+    from notes.models import Category, Note
+
+    first, second, third = CategoryFactory.create_batch(3, user=user)
+    moved, renamed, dropped = NoteFactory.create_batch(3, user=user, category=first)
+    apply_batch = views.apply_note_batch
+
+    def apply_note_batch(*args):
+        # Another request moves two of the notes after this one loaded them.
+        for note in Note.objects.filter(pk__in=[renamed.pk, dropped.pk]):
+            note.category = third
+            note.save()
+        return apply_batch(*args)
+
+    monkeypatch.setattr(views, "apply_note_batch", apply_note_batch)
+    response = authenticated_client.post(
+        BATCH_URL,
+        {
+            "operations": [
+                {"op": "update", "id": moved.id, "data": {"category_id": second.id}},
+                {"op": "update", "id": renamed.id, "data": {"title": "Renamed"}},
+                {"op": "delete", "id": dropped.id},
+            ]
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert Note.objects.get(pk=renamed.pk).category_id == third.id
+    counts = dict(Category.objects.values_list("pk", "note_count"))
+    assert counts == {first.id: 0, second.id: 1, third.id: 1}
+
+
+@pytest.mark.django_db
+def test_batch_requires_authentication(api_client):
+    response = api_client.post(BATCH_URL, {"operations": []}, format="json")
+    assert response.status_code == 401
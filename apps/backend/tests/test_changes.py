@@ -0,0 +1,470 @@
+import asyncio
+import threading
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+
+CHANGES_URL = "/api/changes/"
+NOTES_URL = "/api/notes/"
+
+
+@pytest.fixture
+def change_feed(settings):
+    settings.CHANGE_FEED = True
+    settings.CHANGE_FEED_BROKER = "notes.feed.LocalBroker"
+
+
+def _events(user):
+    from notes.models import ChangeEvent
+
+    return list(
+        ChangeEvent.objects.filter(user=user).values_list(
+            "object_type", "action", "object_id"
+        )
+    )
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+
+
+@pytest.mark.django_db
+def test_note_writes_record_changes(authenticated_client, user, change_feed):
+    from notes.factories import CategoryFactory
+
+    first, second = CategoryFactory(user=user), CategoryFactory(user=user)
+    note_id = authenticated_client.post(
+        NOTES_URL, {"title": "New", "category_id": first.id}, format="json"
+    ).data["id"]
+    authenticated_client.patch(
+        f"{NOTES_URL}{note_id}/", {"category_id": second.id}, format="json"
+    )
+    authenticated_client.patch(
+        f"{NOTES_URL}{note_id}/", {"title": "Renamed"}, format="json"
+    )
+    authenticated_client.delete(f"{NOTES_URL}{note_id}/")
+
+    assert _events(user) == [
+        ("note", "created", note_id),
+        ("category", "updated", first.id),
+        ("note", "updated", note_id),
+        ("category", "updated", first.id),
+        ("category", "updated", second.id),
+        ("note", "updated", note_id),
+        ("note", "deleted", note_id),
+        ("category", "updated", second.id),
+    ]
+
+
+@pytest.mark.django_db
+def test_batch_and_content_patch_record_changes(
+    authenticated_client, user, change_feed
+):
+    from notes.factories import NoteFactory
+    from notes.patches import content_hash
+
+    kept, dropped = NoteFactory(user=user), NoteFactory(user=user)
+    response = authenticated_client.post(
+        f"{NOTES_URL}batch/",
+        {
+            "operations": [
+                {"op": "create", "data": {"title": "Batch"}},
+                {"op": "update", "id": kept.id, "data": {"title": "Edited"}},
+                {"op": "delete", "id": dropped.id},
+            ]
+        },
+        format="json",
+    )
+    created_id = response.data["results"][0]["id"]
+    authenticated_client.patch(
+        f"{NOTES_URL}{kept.id}/content/",
+        {
+            "base_hash": content_hash(kept.content),
+            "edits": [{"start": 0, "end": 0, "text": "!"}],
+        },
+        format="json",
+    )
+
+    notes = [event for event in _events(user) if event[0] == "note"]
+    assert notes == [
+        ("note", "created", created_id),
+        ("note", "updated", kept.id),
+        ("note", "deleted", dropped.id),
+        ("note", "updated", kept.id),
+    ]
+
+
+@pytest.mark.django_db
+def test_nothing_is_recorded_when_disabled(authenticated_client, user):
+    authenticated_client.post(NOTES_URL, {"title": "New"}, format="json")
+
+    assert _events(user) == []
+
+
+# ── JSON catch-up ─────────────────────────────────────────────────────────────
+
+
+@pytest.mark.django_db
+def test_catch_up_returns_events_after_cursor(authenticated_client, user, change_feed):
+    from notes.factories import NoteFactory
+    from notes.services import delete_note
+
+    # Another user's changes are never visible. This one also gives the
+    # cursor a real event: ids aren't reset between tests on PostgreSQL.
+    delete_note(NoteFactory())
+    start = authenticated_client.get(CHANGES_URL).data
+    assert start["events"] == []
+    note = NoteFactory(user=user)
+    note_id, category_id = note.id, note.category_id
+    delete_note(note)
+
+    response = authenticated_client.get(CHANGES_URL, {"after": start["cursor"]})
+
+    assert response.status_code == 200
+    assert not response.data["reset"]
+    assert [
+        (e["object_type"], e["action"], e["object_id"]) for e in response.data["events"]
+    ] == [("note", "deleted", note_id), ("category", "updated", category_id)]
+    assert response.data["cursor"] == response.data["events"][-1]["id"]
+    again = authenticated_client.get(CHANGES_URL, {"after": response.data["cursor"]})
+    # Only what's just before the cursor, in case it committed late.
+    assert again.data["events"] == response.data["events"][:1]
+
+
+@pytest.mark.django_db
+def test_catch_up_rereads_events_that_committed_late(
+    authenticated_client, user, change_feed
+):
+    from django.db.models import F
+    from notes.factories import NoteFactory
+    from notes.models import ChangeEvent
+    from notes.services import delete_note
+
+    for _ in range(3):
+        delete_note(NoteFactory(user=user))
+    early, late, *_, cursor = ChangeEvent.objects.order_by("id")
+    ChangeEvent.objects.filter(pk=early.pk).update(
+        created_at=F("created_at") - timedelta(minutes=1)
+    )
+    # Pretend ``late`` wasn't visible yet when the client was handed ``cursor``.
+
+    response = authenticated_client.get(CHANGES_URL, {"after": cursor.id})
+
+    ids = [event["id"] for event in response.data["events"]]
+    assert late.id in ids
+    assert early.id not in ids
+    assert cursor.id not in ids
+    assert response.data["cursor"] == cursor.id
+
+
+@pytest.mark.django_db
+def test_catch_up_resets_when_events_were_pruned(
+    authenticated_client, user, change_feed
+):
+    from django.utils import timezone
+    from notes.changes import prune_change_events
+    from notes.factories import NoteFactory
+    from notes.models import ChangeEvent
+    from notes.services import delete_note
+
+    for _ in range(3):
+        delete_note(NoteFactory(user=user))
+    first = ChangeEvent.objects.order_by("id").first().id
+    ChangeEvent.objects.update(created_at=timezone.now() - timedelta(days=2))
+    total = ChangeEvent.objects.count()
+    assert prune_change_events() == total - 1
+    latest = ChangeEvent.objects.get()
+
+    response = authenticated_client.get(CHANGES_URL, {"after": first})
+
+    assert response.data == {"events": [], "reset": True, "cursor": latest.id}
+    current = authenticated_client.get(CHANGES_URL, {"after": latest.id})
+    assert current.data["reset"] is False
+
+
+@pytest.mark.django_db
+def test_catch_up_resets_past_the_backlog_limit(
+    authenticated_client, user, change_feed, monkeypatch
+):
+    from notes import changes
+    from notes.factories import NoteFactory
+    from notes.services import delete_note
+
+    monkeypatch.setattr(changes, "CHANGE_BACKLOG_LIMIT", 3)
+    for _ in range(2):
+        delete_note(NoteFactory(user=user))
+
+    response = authenticated_client.get(CHANGES_URL, {"after": 0})
+
+    assert response.data["reset"] is True
+    assert response.data["events"] == []
+
+
+@pytest.mark.django_db
+def test_catch_up_validates_cursor(authenticated_client, change_feed):
+    response = authenticated_client.get(CHANGES_URL, {"after": "soon"})
+
+    assert response.status_code == 400
+    assert "after" in response.data
+
+
+@pytest.mark.django_db
+def test_change_feed_is_not_found_when_disabled(authenticated_client):
+    assert authenticated_client.get(CHANGES_URL).status_code == 404
+
+
+# ── Fan-out ───────────────────────────────────────────────────────────────────
+
+
+def test_hub_routes_events_to_their_user_only():
+    from notes.feed import ChangeHub, LocalBroker
+
+    async def scenario():
+        hub = ChangeHub(LocalBroker())
+        mine, theirs = hub.subscribe(1), hub.subscribe(2)
+        hub.dispatch([{"id": 7, "user_id": 1}])
+        assert mine.queue.get_nowait()["id"] == 7
+        assert theirs.queue.empty()
+        hub.unsubscribe(mine)
+        hub.unsubscribe(theirs)
+        assert not hub.subscriptions
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscription_overflows_instead_of_growing(monkeypatch):
+    from notes import feed
+
+    monkeypatch.setattr(feed, "SUBSCRIPTION_QUEUE_SIZE", 2)
+
+    async def scenario():
+        hub = feed.ChangeHub(feed.LocalBroker())
+        subscription = hub.subscribe(1)
+        hub.dispatch([{"id": n, "user_id": 1} for n in range(5)])
+        assert subscription.overflowed
+        assert subscription.queue.qsize() == 2
+
+    asyncio.run(scenario())
+
+
+def test_local_broker_delivers_from_writer_threads(settings):
+    from notes.feed import LocalBroker, get_hub
+
+    settings.CHANGE_FEED_BROKER = "notes.feed.LocalBroker"
+
+    async def scenario():
+        subscription = get_hub().subscribe(1)
+        writer = threading.Thread(
+            target=LocalBroker().publish, args=([{"id": 3, "user_id": 1}],)
+        )
+        writer.start()
+        event = await asyncio.wait_for(subscription.queue.get(), 1)
+        writer.join()
+        return event
+
+    assert asyncio.run(scenario())["id"] == 3
+
+
+@pytest.mark.django_db
+def test_database_broker_catches_late_commits_once(user):
+    from accounts.factories import UserFactory
+    from django.utils import timezone
+    from notes.feed import DatabaseBroker
+    from notes.models import ChangeEvent
+
+    broker = DatabaseBroker()
+    seen = {}
+    since = timezone.now()
+    ChangeEvent.objects.create(
+        user=user, object_type="note", action="created", object_id=1
+    )
+    # Nobody here is subscribed to this one.
+    ChangeEvent.objects.create(
+        user=UserFactory(), object_type="note", action="created", object_id=9
+    )
+    since, events = broker.poll(since, seen, {user.id})
+    assert [e["object_id"] for e in events] == [1]
+
+    # Stamped before the last poll but committed after it.
+    late = ChangeEvent.objects.create(
+        user=user, object_type="note", action="created", object_id=2
+    )
+    ChangeEvent.objects.filter(pk=late.pk).update(
+        created_at=since - timedelta(seconds=1)
+    )
+    since, events = broker.poll(since, seen, {user.id})
+    assert [(e["object_id"], e["user_id"]) for e in events] == [(2, user.id)]
+
+    since, events = broker.poll(since, seen, {user.id})
+    assert events == []
+
+
+# ── Server-sent events ────────────────────────────────────────────────────────
+
+
+def _scope(user=None, query="", **headers):
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    headers = {"Accept": "text/event-stream", **headers}
+    if user is not None:
+        headers["Authorization"] = f"Bearer {RefreshToken.for_user(user).access_token}"
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": CHANGES_URL,
+        "query_string": query.encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+
+
+class _Stream:
+    """Drives ``ChangeStreamApp`` over a hand-made ASGI connection."""
+
+    def __init__(self, scope):
+        from notes.async_views import ChangeStreamApp
+
+        self.passed_on = []
+        self.received = asyncio.Queue()
+        self.sent = asyncio.Queue()
+        self.buffer = b""
+
+        async def app(scope, receive, send):
+            self.passed_on.append(scope)
+
+        self.task = asyncio.create_task(
+            ChangeStreamApp(app)(scope, self.received.get, self.sent.put)
+        )
+
+    async def start(self):
+        message = await asyncio.wait_for(self.sent.get(), 2)
+        assert message["type"] == "http.response.start"
+        return dict(message["headers"])
+
+    async def events(self, count):
+        while self.buffer.count(b"\n\n") < count:
+            message = await asyncio.wait_for(self.sent.get(), 2)
+            self.buffer += message["body"]
+        *events, self.buffer = self.buffer.split(b"\n\n", count)
+        return [event.replace(b" ", b"") for event in events]
+
+    async def disconnect(self):
+        await self.received.put({"type": "http.disconnect"})
+        await asyncio.wait_for(self.task, 2)
+
+
+@pytest.mark.django_db
+def test_stream_sends_backlog_then_live_changes(
+    user, change_feed, django_capture_on_commit_callbacks
+):
+    from notes.factories import NoteFactory
+    from notes.models import ChangeEvent
+    from notes.services import delete_note
+
+    delete_note(NoteFactory())
+    after = ChangeEvent.objects.latest("id").id
+    missed, live = NoteFactory(user=user), NoteFactory(user=user)
+    missed_id, live_id = missed.id, live.id
+    delete_note(missed)
+
+    def write():
+        with django_capture_on_commit_callbacks(execute=True):
+            delete_note(live)
+
+    async def scenario():
+        stream = _Stream(
+            _scope(user, f"after={after}", Origin="http://localhost:3000")
+        )
+        headers = await stream.start()
+        received = await stream.events(4)
+        await sync_to_async(write)()
+        received += await stream.events(2)
+        await stream.disconnect()
+        return headers, received
+
+    headers, (retry, *events, ready, live_note, live_category) = async_to_sync(
+        scenario
+    )()
+
+    assert headers[b"content-type"] == b"text/event-stream"
+    assert headers[b"access-control-allow-origin"] == b"http://localhost:3000"
+    assert retry.startswith(b"retry:")
+    assert [e.split(b"\n")[1] for e in events] == [b"event:change"] * 2
+    assert b'"object_id":%d' % missed_id in events[0]
+    assert ready.split(b"\n")[1] == b"event:ready"
+    assert b'"reset":false' in ready
+    assert b'"action":"deleted"' in live_note
+    assert b'"object_id":%d' % live_id in live_note
+    assert b'"object_type":"category"' in live_category
+
+
+@pytest.mark.django_db
+def test_stream_resumes_from_last_event_id(user, change_feed):
+    from django.utils import timezone
+    from notes.factories import NoteFactory
+    from notes.models import ChangeEvent
+    from notes.services import delete_note
+
+    for _ in range(2):
+        delete_note(NoteFactory(user=user))
+    ids = list(ChangeEvent.objects.order_by("id").values_list("id", flat=True))
+    # Too long before the cursor to be read again.
+    ChangeEvent.objects.filter(pk=ids[0]).update(
+        created_at=timezone.now() - timedelta(minutes=1)
+    )
+
+    async def scenario():
+        stream = _Stream(_scope(user, **{"Last-Event-ID": str(ids[1])}))
+        await stream.start()
+        received = await stream.events(4)
+        await stream.disconnect()
+        return received
+
+    _, *events, ready = async_to_sync(scenario)()
+
+    assert [int(e.split(b"\n")[0][3:]) for e in events] == ids[2:]
+    assert ready.startswith(b"id:%d\n" % ids[-1])
+
+
+@pytest.mark.django_db
+def test_stream_sends_heartbeats_until_disconnect(user, change_feed, monkeypatch):
+    from notes import async_views
+    from notes.feed import get_hub
+
+    monkeypatch.setattr(async_views, "CHANGE_STREAM_HEARTBEAT", 0.01)
+
+    async def scenario():
+        stream = _Stream(_scope(user))
+        await stream.start()
+        received = await stream.events(3)
+        assert get_hub().subscriptions
+        await stream.disconnect()
+        assert not get_hub().subscriptions
+        return received
+
+    _, ready, heartbeat = async_to_sync(scenario)()
+
+    assert ready.split(b"\n")[1] == b"event:ready"
+    assert heartbeat == b":keep-alive"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "authenticated, query, accept",
+    [
+        (False, "", "text/event-stream"),
+        (True, "after=x", "text/event-stream"),
+        (True, "page=2", "text/event-stream"),
+        (True, "", "application/json"),
+    ],
+)
+def test_stream_passes_other_requests_on(
+    user, change_feed, authenticated, query, accept
+):
+    async def scenario():
+        stream = _Stream(_scope(user if authenticated else None, query, Accept=accept))
+        await asyncio.wait_for(stream.task, 2)
+        return stream.passed_on
+
+    assert len(async_to_sync(scenario)()) == 1
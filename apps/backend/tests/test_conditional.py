@@ -0,0 +1,197 @@
+import pytest
+
+CATEGORIES_URL = "/api/categories/"
+NOTES_URL = "/api/notes/"
+
+
+@pytest.mark.django_db
+def test_note_list_returns_304_when_unchanged(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    NoteFactory.create_batch(2, user=user)
+    first = authenticated_client.get(NOTES_URL)
+    etag = first["ETag"]
+
+    second = authenticated_client.get(NOTES_URL, HTTP_IF_NONE_MATCH=etag)
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert "Authorization" in second["Vary"]
+
+
+@pytest.mark.django_db
+def test_note_list_etag_changes_after_edit_and_delete(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    notes = NoteFactory.create_batch(2, user=user)
+    etag = authenticated_client.get(NOTES_URL)["ETag"]
+
+    authenticated_client.patch(f"{NOTES_URL}{notes[0].id}/", {"title": "Changed"})
+    after_edit = authenticated_client.get(NOTES_URL, HTTP_IF_NONE_MATCH=etag)
+    assert after_edit.status_code == 200
+
+    authenticated_client.delete(f"{NOTES_URL}{notes[1].id}/")
+    after_delete = authenticated_client.get(
+        NOTES_URL, HTTP_IF_NONE_MATCH=after_edit["ETag"]
+    )
+    assert after_delete.status_code == 200
+    assert len(after_delete.data) == 1
+
+
+@pytest.mark.django_db
+def test_note_list_etag_depends_on_query(authenticated_client, user):
+    from notes.factories import CategoryFactory, NoteFactory
+
+    category = CategoryFactory(user=user)
+    NoteFactory(user=user, category=category)
+    etag = authenticated_client.get(NOTES_URL)["ETag"]
+
+    response = authenticated_client.get(
+        NOTES_URL, {"category": category.id}, HTTP_IF_NONE_MATCH=etag
+    )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_note_list_etag_is_per_user(api_client, authenticated_client, user):
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from accounts.factories import UserFactory
+
+    etag = authenticated_client.get(NOTES_URL)["ETag"]
+    other = UserFactory()
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(other).access_token}"
+    )
+
+    response = api_client.get(NOTES_URL, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_note_detail_returns_304_when_unchanged(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user)
+    etag = authenticated_client.get(f"{NOTES_URL}{note.id}/")["ETag"]
+
+    response = authenticated_client.get(
+        f"{NOTES_URL}{note.id}/", HTTP_IF_NONE_MATCH=etag
+    )
+
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_note_detail_of_other_user_is_404_not_304(authenticated_client, user):
+    from notes.factories import NoteFactory
+    from accounts.factories import UserFactory
+
+    note = NoteFactory(user=UserFactory())
+
+    response = authenticated_client.get(f"{NOTES_URL}{note.id}/", HTTP_IF_NONE_MATCH="*")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_patch_with_matching_if_match_succeeds(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user)
+    etag = authenticated_client.get(f"{NOTES_URL}{note.id}/")["ETag"]
+
+    response = authenticated_client.patch(
+        f"{NOTES_URL}{note.id}/", {"title": "Mine"}, HTTP_IF_MATCH=etag
+    )
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_patch_with_stale_if_match_is_rejected(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user, title="Original")
+    stale = authenticated_client.get(f"{NOTES_URL}{note.id}/")["ETag"]
+    authenticated_client.patch(f"{NOTES_URL}{note.id}/", {"title": "Other tab"})
+
+    response = authenticated_client.patch(
+        f"{NOTES_URL}{note.id}/", {"title": "Mine"}, HTTP_IF_MATCH=stale
+    )
+
+    assert response.status_code == 412
+    note.refresh_from_db()
+    assert note.title == "Other tab"
+
+
+@pytest.mark.django_db
+def test_weak_if_match_is_compared_without_editing_the_header(
+    authenticated_client, user
+):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user)
+    etag = authenticated_client.get(f"{NOTES_URL}{note.id}/")["ETag"]
+    weak = f'"stale", W/{etag}'
+
+    response = authenticated_client.patch(
+        f"{NOTES_URL}{note.id}/", {"title": "Mine"}, HTTP_IF_MATCH=weak
+    )
+
+    assert response.status_code == 200
+    assert response.wsgi_request.META["HTTP_IF_MATCH"] == weak
+
+
+@pytest.mark.django_db
+def test_delete_with_stale_if_match_is_rejected(authenticated_client, user):
+    from notes.factories import NoteFactory
+    from notes.models import Note
+
+    note = NoteFactory(user=user)
+
+    response = authenticated_client.delete(
+        f"{NOTES_URL}{note.id}/", HTTP_IF_MATCH='"stale"'
+    )
+
+    assert response.status_code == 412
+    assert Note.objects.filter(pk=note.pk).exists()
+
+
+@pytest.mark.django_db
+def test_category_list_returns_304_when_unchanged(authenticated_client, user):
+    from notes.factories import CategoryFactory
+
+    CategoryFactory(user=user)
+    etag = authenticated_client.get(CATEGORIES_URL)["ETag"]
+
+    response = authenticated_client.get(CATEGORIES_URL, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_category_list_etag_changes_with_note_count(authenticated_client, user):
+    from notes.factories import CategoryFactory
+
+    category = CategoryFactory(user=user)
+    etag = authenticated_client.get(CATEGORIES_URL)["ETag"]
+    authenticated_client.post(NOTES_URL, {"category_id": category.id})
+
+    response = authenticated_client.get(CATEGORIES_URL, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response.data[0]["note_count"] == 1
+
+
+@pytest.mark.django_db
+def test_category_detail_returns_304_when_unchanged(authenticated_client, user):
+    from notes.factories import CategoryFactory
+
+    category = CategoryFactory(user=user)
+    url = f"{CATEGORIES_URL}{category.id}/"
+    etag = authenticated_client.get(url)["ETag"]
+
+    assert authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
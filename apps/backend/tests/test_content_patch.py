@@ -0,0 +1,187 @@
+import pytest
+
+NOTES_URL = "/api/notes/"
+
+
+def _content_url(note):
+    return f"{NOTES_URL}{note.id}/content/"
+
+
+def _hash(text):
+    from notes.patches import content_hash
+
+    return content_hash(text)
+
+
+# ── Patch application ─────────────────────────────────────────────────────────
+
+
+def test_apply_edits_in_any_order():
+    from notes.patches import apply_edits
+
+    edits = [
+        {"start": 6, "end": 11, "text": "there"},
+        {"start": 0, "end": 0, "text": ">> "},
+        {"start": 5, "end": 5, "text": ","},
+    ]
+
+    assert apply_edits("Hello world", edits) == ">> Hello, there"
+
+
+@pytest.mark.parametrize(
+    "edits",
+    [
+        [{"start": 0, "end": 5, "text": ""}, {"start": 3, "end": 4, "text": ""}],
+        [{"start": 2, "end": 99, "text": ""}],
+    ],
+)
+def test_apply_edits_rejects_overlaps_and_out_of_range(edits):
+    from notes.patches import InvalidPatch, apply_edits
+
+    with pytest.raises(InvalidPatch):
+        apply_edits("Hello", edits)
+
+
+def test_apply_edits_counts_code_points():
+    from notes.patches import apply_edits
+
+    assert apply_edits("a😀b", [{"start": 2, "end": 3, "text": "c"}]) == "a😀c"
+
+
+# ── Content patch endpoint ────────────────────────────────────────────────────
+
+
+@pytest.mark.django_db
+def test_patch_content_applies_edits(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    body = "line\n" * 40_000
+    note = NoteFactory(user=user, content=body)
+
+    response = authenticated_client.patch(
+        _content_url(note),
+        {
+            "base_hash": _hash(body),
+            "edits": [{"start": 0, "end": 4, "text": "LINE"}],
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200
+    note.refresh_from_db()
+    assert note.content == "LINE" + body[4:]
+    assert response.data["id"] == note.id
+    assert response.data["content_hash"] == _hash(note.content)
+    assert response.data["content_length"] == len(note.content)
+    assert "content" not in response.data
+
+
+@pytest.mark.django_db
+def test_patch_content_writes_only_content(authenticated_client, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user, content="abc")
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = authenticated_client.patch(
+            _content_url(note),
+            {"base_hash": _hash("abc"), "edits": [{"start": 3, "end": 3, "text": "d"}]},
+            format="json",
+        )
+
+    assert response.status_code == 200
+    (update,) = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+    assert '"title"' not in update
+    assert '"category_id"' not in update
+
+
+@pytest.mark.django_db
+def test_patch_content_conflicts_on_stale_base(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user, content="current")
+
+    response = authenticated_client.patch(
+        _content_url(note),
+        {"base_hash": _hash("stale"), "edits": [{"start": 0, "end": 0, "text": "x"}]},
+        format="json",
+    )
+
+    assert response.status_code == 409
+    assert response.data["content_hash"] == _hash("current")
+    note.refresh_from_db()
+    assert note.content == "current"
+
+
+@pytest.mark.django_db
+def test_patch_content_rejects_invalid_edits(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user, content="short")
+
+    response = authenticated_client.patch(
+        _content_url(note),
+        {"base_hash": _hash("short"), "edits": [{"start": 2, "end": 50, "text": ""}]},
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert "edits" in response.data
+
+
+@pytest.mark.django_db
+def test_patch_content_validates_payload(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user)
+
+    response = authenticated_client.patch(
+        _content_url(note),
+        {"base_hash": "nope", "edits": [{"start": 3, "end": 1}]},
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert "base_hash" in response.data
+    assert "end" in response.data["edits"][0]
+
+
+@pytest.mark.django_db
+def test_patch_content_of_other_users_note_is_not_found(authenticated_client):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(content="theirs")
+
+    response = authenticated_client.patch(
+        _content_url(note),
+        {"base_hash": _hash("theirs"), "edits": []},
+        format="json",
+    )
+
+    assert response.status_code == 404
+
+
+# ── Partial updates ───────────────────────────────────────────────────────────
+
+
+@pytest.mark.django_db
+def test_title_update_does_not_rewrite_content(authenticated_client, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user, content="x" * 10_000)
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = authenticated_client.patch(
+            f"{NOTES_URL}{note.id}/", {"title": "Renamed"}, format="json"
+        )
+
+    assert response.status_code == 200
+    (update,) = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+    assert '"content"' not in update
+    note.refresh_from_db()
+    assert note.title == "Renamed"
+    assert note.content == "x" * 10_000
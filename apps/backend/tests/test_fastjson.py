@@ -0,0 +1,98 @@
+import io
+
+import pytest
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from config.fastjson import FastJSONParser, FastJSONRenderer
+
+NOTES_URL = "/api/notes/"
+TRICKY_CONTENT = 'quotes " \\ tabs\t\nnewline \x01 control \u2028\u2029 emoji 🎉 accents é'
+
+
+@pytest.fixture
+def tricky_notes(user):
+    from notes.factories import CategoryFactory, NoteFactory
+
+    category = CategoryFactory(user=user, name="Ünïcode ✓")
+    return [
+        NoteFactory(user=user, category=category, content=TRICKY_CONTENT),
+        NoteFactory(user=user, category=None, title="", content=""),
+        NoteFactory(user=user, title="x" * 255, content="long " * 2000),
+    ]
+
+
+@pytest.mark.django_db
+def test_fast_pipeline_output_is_byte_identical(tricky_notes, user):
+    from notes.models import Note
+    from notes.serializers import NoteSerializer, note_rows
+
+    queryset = Note.objects.filter(user=user).select_related("category")
+
+    expected = JSONRenderer().render(NoteSerializer(queryset, many=True).data)
+    actual = FastJSONRenderer().render(note_rows(queryset))
+
+    assert actual == expected
+
+
+@pytest.mark.django_db
+def test_fast_read_path_used_for_note_list(authenticated_client, tricky_notes):
+    slow = authenticated_client.get(NOTES_URL)
+    with override_settings(FAST_JSON=True):
+        fast = authenticated_client.get(NOTES_URL)
+
+    assert fast.status_code == 200
+    assert fast.content == slow.content
+
+
+def test_fast_renderer_matches_for_mixed_values():
+    import datetime
+    import decimal
+    import uuid
+
+    data = {
+        "int": 1,
+        "float": 0.1,
+        "bool": True,
+        "none": None,
+        "decimal": decimal.Decimal("1.50"),
+        "uuid": uuid.UUID(int=1),
+        "datetime": datetime.datetime(2024, 1, 2, 3, 4, 5, 6, tzinfo=datetime.timezone.utc),
+        "date": datetime.date(2024, 1, 2),
+        "nested": [{"text": TRICKY_CONTENT}],
+    }
+
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_fast_renderer_float_differences():
+    import json
+
+    data = {"big": 1e16, "small": 1e-6}
+
+    fast = FastJSONRenderer().render(data)
+
+    assert fast == b'{"big":1e16,"small":1e-6}'
+    assert json.loads(fast) == json.loads(JSONRenderer().render(data))
+    for value in (float("nan"), float("inf")):
+        with pytest.raises(ValueError):
+            FastJSONRenderer().render({"rank": [value]})
+
+
+def test_fast_renderer_honours_indent():
+    data = {"a": [1, 2]}
+    media_type = "application/json; indent=2"
+
+    assert FastJSONRenderer().render(data, media_type) == JSONRenderer().render(
+        data, media_type
+    )
+
+
+def test_fast_parser_round_trips_and_rejects_invalid():
+    from rest_framework.exceptions import ParseError
+
+    payload = FastJSONRenderer().render({"content": TRICKY_CONTENT})
+    assert FastJSONParser().parse(io.BytesIO(payload)) == {"content": TRICKY_CONTENT}
+
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(b'{"a": NaN}'))
@@ -0,0 +1,93 @@
+import json
+import logging
+
+import pytest
+
+NOTES_URL = "/api/notes/"
+METRICS_URL = "/api/metrics/routes/"
+
+
+@pytest.fixture
+def request_metrics(settings):
+    from config.instrumentation import route_histograms
+
+    settings.MIDDLEWARE = [
+        "config.instrumentation.RequestMetricsMiddleware",
+        *settings.MIDDLEWARE,
+    ]
+    route_histograms.clear()
+    yield
+    route_histograms.clear()
+
+
+def _timings(response):
+    return {
+        part.split(";")[0].strip(): part
+        for part in response["Server-Timing"].split(",")
+    }
+
+
+@pytest.mark.django_db
+def test_metrics_disabled_by_default(authenticated_client):
+    response = authenticated_client.get(NOTES_URL)
+
+    assert "Server-Timing" not in response
+
+
+@pytest.mark.django_db
+def test_server_timing_reports_queries_and_phases(
+    request_metrics, authenticated_client, user, caplog
+):
+    from notes.factories import NoteFactory
+
+    NoteFactory.create_batch(3, user=user)
+    with caplog.at_level(logging.INFO, logger="config.instrumentation"):
+        response = authenticated_client.get(NOTES_URL)
+
+    timings = _timings(response)
+    assert set(timings) == {"db", "serialize", "render", "total"}
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["route"] == "note-list"
+    assert record["status"] == 200
+    assert record["queries"] >= 1
+    assert f'desc="{record["queries"]} queries"' in timings["db"]
+    assert record["bytes"] == len(response.content)
+    assert "n_plus_one" not in record
+
+
+def test_repeated_sql_shapes_are_flagged():
+    from config.instrumentation import N_PLUS_ONE_THRESHOLD, RequestMetrics
+
+    metrics = RequestMetrics()
+
+    def execute(sql, params, many, context):
+        return None
+
+    for pk in range(N_PLUS_ONE_THRESHOLD):
+        metrics.record_query(execute, "SELECT * FROM t WHERE id = %s", [pk], False, {})
+    metrics.record_query(execute, "SELECT * FROM u WHERE id IN (%s, %s)", [1, 2], False, {})
+    metrics.record_query(execute, "SELECT * FROM u WHERE id IN (%s)", [1], False, {})
+
+    assert metrics.repeated_shapes() == [
+        ("SELECT * FROM t WHERE id = %s", N_PLUS_ONE_THRESHOLD)
+    ]
+    assert metrics.queries == N_PLUS_ONE_THRESHOLD + 2
+
+
+@pytest.mark.django_db
+def test_route_histograms_are_staff_only(request_metrics, authenticated_client, user):
+    authenticated_client.get(NOTES_URL)
+    authenticated_client.get(NOTES_URL)
+
+    assert authenticated_client.get(METRICS_URL).status_code == 403
+
+    user.is_staff = True
+    user.save()
+    response = authenticated_client.get(METRICS_URL)
+
+    assert response.status_code == 200
+    notes = next(r for r in response.data if r["route"] == "note-list")
+    assert notes["method"] == "GET"
+    assert notes["requests"] == 2
+    assert sum(b["count"] for b in notes["duration_ms_buckets"]) == 2
+    assert notes["duration_ms_buckets"][-1]["le"] is None
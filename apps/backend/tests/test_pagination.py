@@ -0,0 +1,114 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+CATEGORIES_URL = "/api/categories/"
+NOTES_URL = "/api/notes/"
+
+
+def _next_url(response):
+    link = response.get("Link")
+    if link is None:
+        return None
+    return re.match(r"<([^>]+)>", link).group(1)
+
+
+@pytest.mark.django_db
+def test_list_notes_unpaginated_without_params(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    NoteFactory.create_batch(3, user=user)
+    response = authenticated_client.get(NOTES_URL)
+
+    assert response.status_code == 200
+    assert len(response.data) == 3
+    assert "Link" not in response
+
+
+@pytest.mark.django_db
+def test_list_notes_walks_all_pages_in_order(authenticated_client, user):
+    from notes.factories import NoteFactory
+    from notes.models import Note
+
+    notes = NoteFactory.create_batch(7, user=user)
+    # Two notes share the same updated_at so the id tiebreaker is exercised.
+    same = timezone.now() - timedelta(days=1)
+    Note.objects.filter(pk__in=[notes[2].pk, notes[3].pk]).update(updated_at=same)
+    expected = list(
+        Note.objects.filter(user=user)
+        .order_by("-updated_at", "-id")
+        .values_list("id", flat=True)
+    )
+
+    seen = []
+    response = authenticated_client.get(NOTES_URL, {"page_size": 3})
+    while True:
+        assert response.status_code == 200
+        assert len(response.data) <= 3
+        seen.extend(n["id"] for n in response.data)
+        url = _next_url(response)
+        if url is None:
+            break
+        response = authenticated_client.get(url)
+
+    assert seen == expected
+
+
+@pytest.mark.django_db
+def test_note_cursor_is_stable_under_concurrent_edit(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    NoteFactory.create_batch(4, user=user)
+    first = authenticated_client.get(NOTES_URL, {"page_size": 2})
+    first_ids = [n["id"] for n in first.data]
+
+    # Touching a note from the first page moves it to the top of the ordering;
+    # the second page must neither repeat it nor skip anything.
+    authenticated_client.patch(f"{NOTES_URL}{first_ids[1]}/", {"title": "Edited"})
+    second = authenticated_client.get(_next_url(first))
+
+    second_ids = [n["id"] for n in second.data]
+    assert len(second_ids) == 2
+    assert not set(first_ids) & set(second_ids)
+
+
+@pytest.mark.django_db
+def test_note_pagination_respects_category_filter(authenticated_client, user):
+    from notes.factories import CategoryFactory, NoteFactory
+
+    category = CategoryFactory(user=user)
+    NoteFactory.create_batch(3, user=user, category=category)
+    NoteFactory.create_batch(3, user=user)
+
+    response = authenticated_client.get(
+        NOTES_URL, {"category": category.id, "page_size": 2}
+    )
+    follow = authenticated_client.get(_next_url(response))
+
+    assert len(response.data) == 2
+    assert len(follow.data) == 1
+    assert _next_url(follow) is None
+
+
+@pytest.mark.django_db
+def test_note_invalid_cursor_returns_404(authenticated_client, user):
+    response = authenticated_client.get(NOTES_URL, {"cursor": "not-a-cursor"})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_list_categories_paginated_by_name(authenticated_client, user):
+    from notes.factories import CategoryFactory
+
+    for name in ("Delta", "Alpha", "Charlie", "Bravo"):
+        CategoryFactory(user=user, name=name)
+
+    first = authenticated_client.get(CATEGORIES_URL, {"page_size": 3})
+    second = authenticated_client.get(_next_url(first))
+
+    assert [c["name"] for c in first.data] == ["Alpha", "Bravo", "Charlie"]
+    assert [c["name"] for c in second.data] == ["Delta"]
+    assert _next_url(second) is None
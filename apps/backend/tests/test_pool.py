@@ -0,0 +1,132 @@
+import threading
+
+import pytest
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.dead = False
+
+    def close(self):
+        self.closed = True
+
+
+def _pool(**options):
+    from config.pgpool.pool import ConnectionPool
+
+    class FakePool(ConnectionPool):
+        def check(self, connection):
+            if connection.dead:
+                raise OSError("server closed the connection")
+
+        def reset(self, connection):
+            if connection.dead:
+                raise OSError("server closed the connection")
+
+    options = {"min_size": 0, "max_size": 2, "timeout": 0.05, **options}
+    return FakePool("test", FakeConnection, **options)
+
+
+def test_connections_are_reused_up_to_max_size():
+    pool = _pool()
+
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    second = pool.acquire()
+
+    assert second is not first
+    assert pool.stats() | {"wait_ms_avg": 0, "wait_ms_max": 0} == {
+        "name": "test",
+        "min_size": 0,
+        "max_size": 2,
+        "size": 2,
+        "idle": 0,
+        "in_use": 2,
+        "waiting": 0,
+        "checkouts": 3,
+        "opened": 2,
+        "closed": 0,
+        "timeouts": 0,
+        "failed_checks": 0,
+        "wait_ms_avg": 0,
+        "wait_ms_max": 0,
+    }
+
+
+def test_checkout_waits_for_a_release_then_times_out():
+    from config.pgpool.pool import PoolTimeout
+
+    pool = _pool(max_size=1, timeout=2)
+    held = pool.acquire()
+    threading.Timer(0.05, pool.release, [held]).start()
+
+    assert pool.acquire() is held
+    pool.timeout = 0.01
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_idle_connections_are_checked_before_reuse():
+    pool = _pool(check_after=0)
+    connection = pool.acquire()
+    pool.release(connection)
+    connection.dead = True
+
+    replacement = pool.acquire()
+
+    assert replacement is not connection and connection.closed
+    assert pool.stats()["failed_checks"] == 1
+    assert pool.stats()["size"] == 1
+
+
+def test_broken_and_old_connections_are_closed_on_release():
+    pool = _pool(max_lifetime=0)
+    old = pool.acquire()
+    pool.release(old)
+    assert old.closed
+
+    pool.max_lifetime = 3600
+    broken = pool.acquire()
+    broken.dead = True
+    pool.release(broken)
+
+    assert broken.closed
+    assert pool.stats()["size"] == 0
+
+
+def test_idle_connections_are_trimmed_to_min_size():
+    pool = _pool(min_size=1, max_size=3, max_idle=0)
+    connections = [pool.acquire() for _ in range(3)]
+    for connection in connections:
+        pool.release(connection)
+
+    assert pool.stats()["size"] == 1
+    assert sum(c.closed for c in connections) == 2
+
+
+def test_first_checkout_fills_to_min_size():
+    pool = _pool(min_size=2, max_size=3)
+    pool.acquire()
+
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and thread.daemon:
+            thread.join(1)
+    assert pool.stats()["size"] == 2
+    assert pool.stats()["idle"] == 1
+
+
+def test_pool_stats_endpoint_is_staff_only(authenticated_client, user, monkeypatch):
+    from config.pgpool import pool
+
+    monkeypatch.setattr(pool, "_pools", {"test": _pool()})
+    response = authenticated_client.get("/api/metrics/pools/")
+    assert response.status_code == 403
+
+    user.is_staff = True
+    user.save()
+    response = authenticated_client.get("/api/metrics/pools/")
+    assert response.status_code == 200
+    assert [(p["name"], p["size"]) for p in response.data] == [("test", 0)]
@@ -0,0 +1,223 @@
+"""Query budgets for every route in ``notes.urls`` and ``accounts.urls``.
+
+Each route is requested once with a single note and once with
+``LARGE_DATASET`` notes. Both requests must stay within the route's budget
+and issue the same number of queries, so an N+1 in a serializer fails here
+whatever the size of the fixture data.
+"""
+
+from datetime import timedelta
+from itertools import count
+
+import pytest
+
+SMALL_DATASET = 1
+LARGE_DATASET = 500
+
+_unique = count()
+
+
+# (URL name, method): (budget, expected status, request). Every request
+# carries the user's bearer token, which costs one user lookup.
+ROUTE_BUDGETS = {
+    ("api-root", "GET"): (1, 200, lambda c, u, n: c.get("/api/")),
+    ("category-list", "GET"): (2, 200, lambda c, u, n: c.get("/api/categories/")),
+    ("category-detail", "GET"): (
+        3,
+        200,
+        lambda c, u, n: c.get(f"/api/categories/{n[0].category_id}/"),
+    ),
+    ("note-list", "GET"): (3, 200, lambda c, u, n: c.get("/api/notes/")),
+    ("note-list", "POST"): (
+        4,
+        201,
+        lambda c, u, n: c.post("/api/notes/", {"title": "New"}, format="json"),
+    ),
+    ("note-summary", "GET"): (3, 200, lambda c, u, n: c.get("/api/notes/summary/")),
+    ("note-search", "GET"): (2, 200, lambda c, u, n: c.get("/api/notes/search/?q=note")),
+    ("note-sync", "GET"): (2, 200, lambda c, u, n: c.get("/api/notes/sync/")),
+    ("note-batch", "POST"): (
+        # Includes locking the updated rows before their revisions are recorded.
+        9,
+        200,
+        lambda c, u, n: c.post(
+            "/api/notes/batch/",
+            {
+                "operations": [
+                    {"op": "create", "data": {"title": "Batch"}},
+                    {
+                        "op": "update",
+                        "id": n[0].id,
+                        "data": {"title": f"Edit {next(_unique)}"},
+                    },
+                ]
+            },
+            format="json",
+        ),
+    ),
+    ("note-detail", "GET"): (3, 200, lambda c, u, n: c.get(f"/api/notes/{n[0].id}/")),
+    ("note-detail", "PATCH"): (
+        # Includes locking the row before its revision is recorded.
+        7,
+        200,
+        lambda c, u, n: c.patch(
+            f"/api/notes/{n[0].id}/",
+            {"title": f"Edit {next(_unique)}"},
+            format="json",
+        ),
+    ),
+    ("note-detail", "DELETE"): (
+        6,
+        204,
+        lambda c, u, n: c.delete(f"/api/notes/{n[0].id}/"),
+    ),
+    ("note-content", "PATCH"): (
+        5,
+        200,
+        lambda c, u, n: c.patch(
+            f"/api/notes/{n[0].id}/content/",
+            {
+                "base_hash": _content_hash(n[0].content),
+                "edits": [{"start": 0, "end": 0, "text": "Edited "}],
+            },
+            format="json",
+        ),
+    ),
+    ("note-revisions", "GET"): (
+        3,
+        200,
+        lambda c, u, n: c.get(f"/api/notes/{n[0].id}/revisions/"),
+    ),
+    ("note-revision", "GET"): (
+        4,
+        200,
+        lambda c, u, n: c.get(f"/api/notes/{n[0].id}/revisions/1/"),
+    ),
+    ("change-feed", "GET"): (3, 200, lambda c, u, n: _change_feed(c)),
+    ("register", "POST"): (
+        2,
+        201,
+        lambda c, u, n: c.post(
+            "/api/auth/register/",
+            {"email": f"budget{next(_unique)}@example.com", "password": "securepass123"},
+        ),
+    ),
+    ("token_obtain_pair", "POST"): (
+        1,
+        200,
+        lambda c, u, n: c.post(
+            "/api/auth/token/", {"email": u.email, "password": "testpass123"}
+        ),
+    ),
+    ("token_refresh", "POST"): (
+        1,
+        200,
+        lambda c, u, n: c.post("/api/auth/token/refresh/", {"refresh": _refresh(u)}),
+    ),
+    ("me", "GET"): (1, 200, lambda c, u, n: c.get("/api/auth/me/")),
+}
+
+
+def _content_hash(text):
+    from notes.patches import content_hash
+
+    return content_hash(text)
+
+
+def _change_feed(client):
+    from django.test import override_settings
+
+    with override_settings(CHANGE_FEED=True):
+        return client.get("/api/changes/?after=0")
+
+
+def _refresh(user):
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    return str(RefreshToken.for_user(user))
+
+
+def _registered_routes():
+    from accounts.urls import urlpatterns as account_patterns
+    from notes.urls import urlpatterns as note_patterns
+
+    routes = set()
+    for pattern in [*note_patterns, *account_patterns]:
+        view = pattern.callback
+        actions = getattr(view, "actions", None)
+        if actions is None:
+            actions = {method: method for method in view.cls.http_method_names}
+        for method, handler in actions.items():
+            if (
+                method not in ("head", "options")
+                and method in view.cls.http_method_names
+                and hasattr(view.cls, handler)
+            ):
+                routes.add((pattern.name, method.upper()))
+    return routes
+
+
+def _grow(user, size):
+    """Give ``user`` exactly ``size`` notes spread over their categories.
+
+    The first note also gets a day-old revision.
+    """
+    from django.utils import timezone
+    from notes.factories import NoteFactory
+    from notes.models import Category, Note, NoteRevision
+    from notes.services import create_default_categories, reconcile_category_note_counts
+
+    create_default_categories(user.pk)
+    categories = list(Category.objects.filter(user=user))
+    missing = size - Note.objects.filter(user=user).count()
+    notes = NoteFactory.build_batch(missing, user=user, category=None)
+    for index, note in enumerate(notes):
+        note.category = categories[index % len(categories)]
+    Note.objects.bulk_create(notes)
+    reconcile_category_note_counts()
+    notes = list(Note.objects.filter(user=user).order_by("id"))
+    NoteRevision.objects.get_or_create(
+        note=notes[0],
+        number=1,
+        defaults={
+            "title": "Before",
+            "saved_at": timezone.now() - timedelta(days=1),
+            "content_length": len(notes[0].content),
+            "delta": [],
+        },
+    )
+    return notes
+
+
+def _cold_caches():
+    from django.core.cache import caches
+
+    from accounts.authentication import user_cache
+
+    for alias in caches:
+        caches[alias].clear()
+    user_cache.clear()
+
+
+@pytest.mark.django_db
+def test_every_route_has_a_query_budget():
+    assert _registered_routes() == set(ROUTE_BUDGETS)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("route", sorted(ROUTE_BUDGETS), ids="{0[0]} {0[1]}".format)
+def test_query_count_does_not_grow_with_data(
+    route, authenticated_client, user, assert_max_queries
+):
+    budget, status, send = ROUTE_BUDGETS[route]
+
+    counts = []
+    for size in (SMALL_DATASET, LARGE_DATASET):
+        notes = _grow(user, size)
+        _cold_caches()
+        with assert_max_queries(budget) as queries:
+            response = send(authenticated_client, user, notes)
+        assert response.status_code == status, response.content
+        counts.append(len(queries))
+
+    assert counts[0] == counts[1], f"{counts[0]} queries for 1 note, {counts[1]} for 500"
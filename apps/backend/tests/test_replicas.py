@@ -0,0 +1,164 @@
+import pytest
+
+NOTES_URL = "/api/notes/"
+REPLICAS = ["replica_1", "replica_2"]
+
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    from config import replicas
+
+    settings.DATABASE_REPLICAS = REPLICAS
+    settings.DATABASE_ROUTERS = ["config.replicas.ReplicaRouter"]
+    monkeypatch.setattr(replicas, "_lag_checks", {})
+    monkeypatch.setattr(replicas, "replica_lag", lambda alias: 0.0)
+    return replicas
+
+
+def _serve(method, user=None, view=None):
+    """Runs ``view`` inside the middleware; returns the aliases it read from."""
+    from django.db import router
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from config.replicas import ReplicaRoutingMiddleware
+    from notes.models import Note
+
+    reads = []
+
+    def get_response(request):
+        if user is not None:
+            request.user = user  # as DRF does once it has authenticated
+        if view is not None:
+            view()
+        reads.extend(router.db_for_read(Note) for _ in range(3))
+        return HttpResponse()
+
+    request = getattr(RequestFactory(), method.lower())(NOTES_URL)
+    ReplicaRoutingMiddleware(get_response)(request)
+    return reads
+
+
+def _write():
+    from django.db import router
+
+    from notes.models import Note
+
+    router.db_for_write(Note)
+
+
+@pytest.mark.django_db
+def test_safe_requests_read_from_one_replica(replicas, user):
+    reads = _serve("GET", user)
+
+    assert reads[0] in REPLICAS
+    assert len(set(reads)) == 1
+
+
+@pytest.mark.django_db
+def test_reads_outside_requests_and_in_writes_use_primary(replicas, user):
+    from django.db import router
+
+    from notes.models import Note
+
+    assert router.db_for_read(Note) == "default"
+    assert _serve("POST", user) == ["default"] * 3
+    assert _serve("GET", user, view=_write) == ["default"] * 3
+
+
+@pytest.mark.django_db
+def test_writers_are_pinned_to_primary(replicas, user):
+    from django.core.cache import cache
+
+    from accounts.factories import UserFactory
+
+    _serve("GET", user, view=_write)
+
+    assert _serve("GET", user) == ["default"] * 3
+    assert _serve("GET", UserFactory())[0] in REPLICAS
+    cache.delete(replicas.pin_cache_key(user.pk))
+    assert _serve("GET", user)[0] in REPLICAS
+
+
+@pytest.mark.django_db
+def test_api_writes_pin_the_user(replicas, settings, authenticated_client, user):
+    from django.core.cache import cache
+
+    settings.MIDDLEWARE = [
+        *settings.MIDDLEWARE,
+        "config.replicas.ReplicaRoutingMiddleware",
+    ]
+
+    response = authenticated_client.post(NOTES_URL, {"title": "Fresh"}, format="json")
+
+    assert response.status_code == 201
+    assert cache.get(replicas.pin_cache_key(user.pk)) is True
+
+
+@pytest.mark.django_db
+def test_lagging_replicas_are_skipped(replicas, settings, monkeypatch, user):
+    from django.db import DatabaseError
+
+    lags = {"replica_1": 30.0, "replica_2": 0.5}
+
+    def replica_lag(alias):
+        if lags[alias] is None:
+            raise DatabaseError("replica down")
+        return lags[alias]
+
+    monkeypatch.setattr(replicas, "replica_lag", replica_lag)
+
+    assert {_serve("GET", user)[0] for _ in range(10)} == {"replica_2"}
+
+    lags["replica_2"] = None
+    monkeypatch.setattr(replicas, "_lag_checks", {})
+    assert _serve("GET", user) == ["default"] * 3
+
+
+@pytest.mark.django_db
+def test_lag_is_checked_at_most_once_per_interval(replicas, monkeypatch, user):
+    checks = []
+
+    def replica_lag(alias):
+        checks.append(alias)
+        return 0.0
+
+    monkeypatch.setattr(replicas, "replica_lag", replica_lag)
+    for _ in range(5):
+        _serve("GET", user)
+
+    assert sorted(checks) == REPLICAS
+
+
+def test_replicas_are_never_migrated(replicas):
+    from config.replicas import ReplicaRouter
+
+    assert ReplicaRouter().allow_migrate("replica_1", "notes") is False
+    assert ReplicaRouter().allow_migrate("default", "notes") is None
+
+
+@pytest.mark.django_db
+def test_middleware_stays_async_for_async_views(replicas, user):
+    from asgiref.sync import async_to_sync, iscoroutinefunction
+    from django.core.cache import cache
+    from django.db import router
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from config.replicas import ReplicaRoutingMiddleware, pin_cache_key
+    from notes.models import Note
+
+    reads = []
+
+    async def get_response(request):
+        request.user = user
+        reads.append(router.db_for_read(Note))
+        router.db_for_write(Note)
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+    assert iscoroutinefunction(middleware)
+    async_to_sync(middleware)(RequestFactory().get(NOTES_URL))
+
+    assert reads[0] in REPLICAS
+    assert cache.get(pin_cache_key(user.pk))
@@ -0,0 +1,260 @@
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+
+NOTES_URL = "/api/notes/"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls ``timezone.now``; advance it with ``clock.tick(minutes=...)``."""
+    from django.utils import timezone
+
+    class Clock:
+        now = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+        def tick(self, **kwargs):
+            self.now += timedelta(**kwargs)
+
+    clock = Clock()
+    monkeypatch.setattr(timezone, "now", lambda: clock.now)
+    return clock
+
+
+def _save(note, content=None, title=None):
+    from notes.revisions import record_revisions
+
+    previous = (note.title, note.content, note.updated_at)
+    if content is not None:
+        note.content = content
+    if title is not None:
+        note.title = title
+    note.save(update_fields=["title", "content", "updated_at"])
+    record_revisions([(note, *previous)])
+
+
+def _edit(rng, text):
+    start = rng.randint(0, len(text))
+    end = min(len(text), start + rng.randint(0, 20))
+    insert = "".join(rng.choice("abc \n") for _ in range(rng.randint(0, 30)))
+    return text[:start] + insert + text[end:]
+
+
+# ── Recording and reconstruction ──────────────────────────────────────────────
+
+
+@pytest.mark.django_db
+def test_every_revision_is_rebuilt_exactly(user, clock):
+    from notes.factories import NoteFactory
+    from notes.models import NoteRevision
+    from notes.revisions import REVISION_SNAPSHOT_INTERVAL, revision_content
+
+    rng = random.Random(3)
+    note = NoteFactory(user=user, content="start\n" * 50)
+    history = [note.content]
+    for _ in range(REVISION_SNAPSHOT_INTERVAL * 2 + 5):
+        clock.tick(minutes=10)
+        _save(note, _edit(rng, note.content))
+        history.append(note.content)
+
+    revisions = NoteRevision.objects.filter(note=note).order_by("number")
+    assert [r.number for r in revisions] == list(range(1, len(history)))
+    snapshots = [r.number for r in revisions if r.snapshot is not None]
+    assert snapshots == [REVISION_SNAPSHOT_INTERVAL, REVISION_SNAPSHOT_INTERVAL * 2]
+    for number, expected in enumerate(history[:-1], start=1):
+        assert revision_content(note, number) == expected
+
+
+@pytest.mark.django_db
+def test_rebuilding_reads_one_bounded_chain(user, clock, django_assert_num_queries):
+    from notes.factories import NoteFactory
+    from notes.revisions import revision_content
+
+    note = NoteFactory(user=user, content="v0")
+    for index in range(1, 30):
+        clock.tick(minutes=10)
+        _save(note, f"v{index}")
+
+    with django_assert_num_queries(1):
+        assert revision_content(note, 1) == "v0"
+
+
+@pytest.mark.django_db
+def test_rapid_autosaves_are_coalesced(user, clock):
+    from notes.factories import NoteFactory
+    from notes.models import NoteRevision
+    from notes.revisions import revision_content
+
+    note = NoteFactory(user=user, content="draft")
+    clock.tick(minutes=10)
+    _save(note, "draft 1")
+    for index in range(2, 20):
+        clock.tick(seconds=3)
+        _save(note, f"draft {index}")
+
+    revisions = list(NoteRevision.objects.filter(note=note))
+    assert len(revisions) == 1
+    assert revision_content(note, 1) == "draft"
+
+    clock.tick(minutes=10)
+    _save(note, "final")
+
+    assert NoteRevision.objects.filter(note=note).count() == 2
+    assert revision_content(note, 2) == "draft 19"
+    assert revision_content(note, 1) == "draft"
+
+
+@pytest.mark.django_db
+def test_unchanged_save_records_nothing(user, clock):
+    from notes.factories import NoteFactory
+    from notes.models import NoteRevision
+
+    note = NoteFactory(user=user)
+    clock.tick(minutes=10)
+    _save(note)
+
+    assert not NoteRevision.objects.exists()
+
+
+@pytest.mark.django_db
+def test_deltas_are_much_smaller_than_snapshots(user, clock):
+    from notes.factories import NoteFactory
+    from notes.models import NoteRevision
+
+    note = NoteFactory(user=user, content="word " * 20_000)
+    for index in range(10):
+        clock.tick(minutes=10)
+        _save(note, note.content + f" edit {index}")
+
+    stored = sum(
+        len(str(r.delta)) for r in NoteRevision.objects.filter(note=note)
+    )
+    assert stored < len(note.content) // 100
+
+
+# ── API ───────────────────────────────────────────────────────────────────────
+
+
+@pytest.mark.django_db
+def test_updates_record_revisions(authenticated_client, user, clock):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user, title="One", content="first")
+    clock.tick(minutes=10)
+    authenticated_client.patch(
+        f"{NOTES_URL}{note.id}/", {"title": "Two", "content": "second"}, format="json"
+    )
+    clock.tick(minutes=10)
+    authenticated_client.post(
+        f"{NOTES_URL}batch/",
+        {"operations": [{"op": "update", "id": note.id, "data": {"content": "third"}}]},
+        format="json",
+    )
+
+    response = authenticated_client.get(f"{NOTES_URL}{note.id}/revisions/")
+
+    assert response.status_code == 200
+    assert [(r["number"], r["title"], r["content_length"]) for r in response.data] == [
+        (2, "Two", len("second")),
+        (1, "One", len("first")),
+    ]
+
+    detail = authenticated_client.get(f"{NOTES_URL}{note.id}/revisions/1/")
+    assert detail.status_code == 200
+    assert detail.data["content"] == "first"
+    assert detail.data["title"] == "One"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("batch", [False, True])
+def test_interleaved_saves_keep_the_revision_chain(
+    authenticated_client, user, clock, monkeypatch, batch
+):
+    from notes import views
+    from notes.factories import NoteFactory
+    from notes.models import Note
+
+    note = NoteFactory(user=user, title="Title", content="first")
+    load, apply_batch = views.NoteViewSet.get_object, views.apply_note_batch
+
+    def other_tab_saves():
+        # Lands after this request loaded the note, before it writes.
+        clock.tick(minutes=10)
+        _save(Note.objects.get(pk=note.pk), content="second, from the other tab")
+        clock.tick(minutes=10)
+
+    def get_object(self):
+        instance = load(self)
+        other_tab_saves()
+        return instance
+
+    def apply_note_batch(*args):
+        other_tab_saves()
+        return apply_batch(*args)
+
+    if batch:
+        monkeypatch.setattr(views, "apply_note_batch", apply_note_batch)
+        response = authenticated_client.post(
+            f"{NOTES_URL}batch/",
+            {"operations": [{"op": "update", "id": note.id, "data": {"content": "third"}}]},
+            format="json",
+        )
+    else:
+        monkeypatch.setattr(views.NoteViewSet, "get_object", get_object)
+        response = authenticated_client.patch(
+            f"{NOTES_URL}{note.id}/", {"content": "third"}, format="json"
+        )
+    monkeypatch.undo()
+    assert response.status_code == 200
+
+    note.refresh_from_db()
+    assert note.content == "third"
+    revisions = [
+        authenticated_client.get(f"{NOTES_URL}{note.id}/revisions/{number}/").data
+        for number in (1, 2)
+    ]
+    assert [(r["title"], r["content"]) for r in revisions] == [
+        ("Title", "first"),
+        ("Title", "second, from the other tab"),
+    ]
+
+
+@pytest.mark.django_db
+def test_content_patch_records_revision(authenticated_client, user, clock):
+    from notes.factories import NoteFactory
+    from notes.patches import content_hash
+
+    note = NoteFactory(user=user, content="hello")
+    clock.tick(minutes=10)
+    authenticated_client.patch(
+        f"{NOTES_URL}{note.id}/content/",
+        {"base_hash": content_hash("hello"), "edits": [{"start": 5, "end": 5, "text": "!"}]},
+        format="json",
+    )
+
+    response = authenticated_client.get(f"{NOTES_URL}{note.id}/revisions/1/")
+
+    assert response.data["content"] == "hello"
+
+
+@pytest.mark.django_db
+def test_missing_revision_is_not_found(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user)
+
+    response = authenticated_client.get(f"{NOTES_URL}{note.id}/revisions/1/")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_other_users_revisions_are_not_found(authenticated_client):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory()
+
+    response = authenticated_client.get(f"{NOTES_URL}{note.id}/revisions/")
+
+    assert response.status_code == 404
@@ -0,0 +1,224 @@
+import pytest
+
+NOTES_URL = "/api/notes/"
+REGISTER_URL = "/api/auth/register/"
+SHARDS = ["shard_1", "shard_2"]
+
+
+@pytest.fixture
+def shards(db, settings, tmp_path):
+    """Two migrated SQLite shards next to the test database."""
+    from django.core.management import call_command
+    from django.db import connections
+
+    from config.sharding import reserve_id_range, use_database
+
+    for alias in SHARDS:
+        connections.settings[alias] = {
+            **connections.settings["default"],
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(tmp_path / f"{alias}.sqlite3"),
+            "OPTIONS": {},
+        }
+    settings.DATABASE_SHARDS = SHARDS
+    settings.DATABASE_ROUTERS = ["config.sharding.ShardRouter"]
+    settings.MIDDLEWARE = [*settings.MIDDLEWARE, "config.routing.RequestContextMiddleware"]
+    for alias in SHARDS:
+        with use_database(alias):
+            call_command("migrate", database=alias, verbosity=0)
+        reserve_id_range(alias)
+    yield SHARDS
+    for alias in SHARDS:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    """A cache other processes would see, as moves require."""
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "cache"),
+        }
+    }
+
+
+def _login(client, user):
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    token = RefreshToken.for_user(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def test_hash_ring_moves_few_users_when_a_shard_is_added():
+    from config.sharding import HashRing
+
+    before = HashRing(["shard_1", "shard_2", "shard_3"])
+    after = HashRing(["shard_1", "shard_2", "shard_3", "shard_4"])
+    placed = [before.get(user_id) for user_id in range(10000)]
+    moved = [
+        user_id for user_id in range(10000) if after.get(user_id) != placed[user_id]
+    ]
+
+    assert {placed.count(alias) for alias in set(placed)} <= set(range(2500, 4200))
+    assert 1500 < len(moved) < 3500
+    assert all(after.get(user_id) == "shard_4" for user_id in moved)
+
+
+def test_router_refuses_to_guess_a_users_database(settings):
+    from accounts.models import User
+    from config.sharding import ShardRouter, ShardUnknown, use_database
+    from notes.models import Note
+
+    settings.DATABASE_SHARDS = SHARDS
+    router = ShardRouter()
+
+    assert router.db_for_read(User) is None
+    with pytest.raises(ShardUnknown):
+        router.db_for_write(Note)
+    with use_database("shard_2"):
+        assert router.db_for_read(Note) == "shard_2"
+
+
+def test_new_users_get_notes_on_their_shard(shards, api_client):
+    from accounts.models import User
+    from config.sharding import ID_RANGE, ring
+    from notes.models import Note
+
+    response = api_client.post(
+        REGISTER_URL,
+        {"email": "new@example.com", "password": "a-long-password-1"},
+        format="json",
+    )
+    assert response.status_code == 201
+    user = User.objects.get(email="new@example.com")
+    assert user.shard == ring().get(user.pk)
+    stand_in = User.objects.using(user.shard).get(pk=user.pk)
+    assert not stand_in.has_usable_password()
+
+    client = _login(api_client, user)
+    note_id = client.post(NOTES_URL, {"title": "Sharded"}, format="json").json()["id"]
+
+    assert note_id > ID_RANGE
+    assert Note.objects.using(user.shard).filter(pk=note_id, user=user).exists()
+    assert not Note.objects.using("default").exists()
+    assert [n["id"] for n in client.get(NOTES_URL).json()] == [note_id]
+
+
+def test_moving_a_user_keeps_their_note_ids(
+    user, shards, shared_cache, authenticated_client
+):
+    from config.sharding import database_for_user, move_user
+    from notes.models import Note
+
+    note = authenticated_client.post(
+        NOTES_URL, {"title": "Legacy", "content": "On default"}, format="json"
+    ).json()
+    assert database_for_user(user.pk) == "default"
+
+    copied = move_user(user.pk, "shard_1", grace=0)
+
+    user.refresh_from_db()
+    assert user.shard == "shard_1"
+    assert copied == 4  # the note and the default categories
+    assert not Note.objects.using("default").exists()
+    assert authenticated_client.get(NOTES_URL).json() == [note]
+    response = authenticated_client.patch(
+        f"{NOTES_URL}{note['id']}/", {"content": "Moved"}, format="json"
+    )
+    assert response.status_code == 200
+    assert Note.objects.using("shard_1").get(pk=note["id"]).content == "Moved"
+
+
+def test_moves_need_a_cache_shared_between_processes(user, shards):
+    from django.core.exceptions import ImproperlyConfigured
+    from django.core.management import CommandError, call_command
+
+    from config.sharding import database_for_user, move_user
+
+    with pytest.raises(ImproperlyConfigured, match="REDIS_URL"):
+        move_user(user.pk, "shard_1", grace=0)
+    with pytest.raises(CommandError, match="REDIS_URL"):
+        call_command("move_user_shard", user.email, "shard_1")
+
+    assert database_for_user(user.pk) == "default"
+
+
+def test_writes_are_refused_while_a_user_moves(user, shards, authenticated_client):
+    from django.core.cache import cache
+
+    from config.sharding import moving_cache_key
+
+    cache.set(moving_cache_key(user.pk), True)
+
+    response = authenticated_client.post(NOTES_URL, {"title": "Late"}, format="json")
+
+    assert response.status_code == 503
+    assert authenticated_client.get(NOTES_URL).status_code == 200
+
+
+def test_rebalance_moves_users_to_their_ring_shard(
+    user, shards, shared_cache, authenticated_client
+):
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    from config.sharding import ring
+    from notes.models import Note
+
+    authenticated_client.post(NOTES_URL, {"title": "Legacy"}, format="json")
+    out = StringIO()
+    call_command("rebalance_shards", "--grace=0", stdout=out)
+
+    user.refresh_from_db()
+    assert user.shard == ring().get(user.pk)
+    assert Note.objects.using(user.shard).filter(user=user).count() == 1
+    assert "Moved 1 users." in out.getvalue()
+
+
+def test_deleting_a_user_deletes_their_notes_on_the_shard(shards, api_client):
+    from accounts.factories import UserFactory
+    from accounts.models import User
+    from notes.models import Note
+
+    user = UserFactory()
+    _login(api_client, user).post(NOTES_URL, {"title": "Doomed"}, format="json")
+
+    user.delete()
+
+    assert not User.objects.using(user.shard).exists()
+    assert not Note.objects.using(user.shard).exists()
+
+
+def test_change_cursor_from_an_empty_shard_does_not_reset(shards, api_client, settings):
+    from accounts.factories import UserFactory
+
+    settings.CHANGE_FEED = True
+    client = _login(api_client, UserFactory())
+    cursor = client.get("/api/changes/").json()["cursor"]
+    note_id = client.post(NOTES_URL, {"title": "First"}, format="json").json()["id"]
+
+    feed = client.get("/api/changes/", {"after": cursor}).json()
+
+    assert not feed["reset"]
+    assert [event["object_id"] for event in feed["events"]][:1] == [note_id]
+
+
+def test_streamed_note_list_reads_from_the_users_shard(shards, api_client, settings):
+    import json
+
+    from accounts.factories import UserFactory
+
+    settings.STREAM_LISTS = True
+    client = _login(api_client, UserFactory())
+    note_id = client.post(NOTES_URL, {"title": "Streamed"}, format="json").json()["id"]
+
+    response = client.get(NOTES_URL)
+
+    assert response.streaming
+    body = b"".join(response.streaming_content)
+    assert [note["id"] for note in json.loads(body)] == [note_id]
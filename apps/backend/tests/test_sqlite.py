@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def tuned(db, tmp_path):
+    from django.db import connections
+    from django.db.utils import load_backend
+
+    settings_dict = {
+        **connections["default"].settings_dict,
+        "ENGINE": "config.sqlite",
+        "NAME": str(tmp_path / "tuned.sqlite3"),
+    }
+    wrapper = load_backend("config.sqlite").DatabaseWrapper(settings_dict, "tuned")
+    yield wrapper
+    wrapper.close()
+
+
+def test_new_connections_are_tuned(tuned):
+    from config.sqlite.base import BUSY_TIMEOUT_MS, MMAP_SIZE
+
+    with tuned.cursor() as cursor:
+        values = {}
+        for pragma in ("journal_mode", "synchronous", "busy_timeout", "mmap_size"):
+            cursor.execute(f"PRAGMA {pragma}")
+            values[pragma] = cursor.fetchone()[0]
+
+    assert values == {
+        "journal_mode": "wal",
+        "synchronous": 1,  # NORMAL
+        "busy_timeout": BUSY_TIMEOUT_MS,
+        "mmap_size": MMAP_SIZE,
+    }
+
+
+def test_transactions_take_the_write_lock_up_front(tuned):
+    tuned.ensure_connection()
+    tuned._start_transaction_under_autocommit()
+    other = sqlite3.connect(tuned.settings_dict["NAME"], timeout=0)
+    try:
+        # Readers still get through in WAL mode; other writers wait.
+        other.execute("SELECT 1").fetchone()
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("BEGIN IMMEDIATE")
+        tuned.connection.rollback()
+        other.execute("BEGIN IMMEDIATE")
+        other.rollback()
+    finally:
+        other.close()
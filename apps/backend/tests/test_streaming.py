@@ -0,0 +1,198 @@
+import gzip
+import json
+
+import pytest
+from django.test import override_settings
+
+NOTES_URL = "/api/notes/"
+SUMMARY_URL = "/api/notes/summary/"
+
+
+@pytest.fixture
+def compression(settings):
+    settings.COMPRESS_RESPONSES = True
+    settings.MIDDLEWARE = [
+        "config.compression.CompressionMiddleware",
+        *settings.MIDDLEWARE,
+    ]
+
+
+def _body(response):
+    return b"".join(response.streaming_content)
+
+
+# ── Streaming lists ───────────────────────────────────────────────────────────
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", [NOTES_URL, SUMMARY_URL])
+@pytest.mark.parametrize("fast_json", [False, True])
+def test_streamed_list_matches_buffered_list(
+    authenticated_client, user, monkeypatch, url, fast_json
+):
+    from notes.factories import NoteFactory
+    from notes.views import NoteViewSet
+
+    NoteFactory.create_batch(7, user=user)
+    NoteFactory(user=user, category=None)
+    monkeypatch.setattr(NoteViewSet, "stream_chunk_size", 3)
+
+    with override_settings(FAST_JSON=fast_json):
+        buffered = authenticated_client.get(url)
+        with override_settings(STREAM_LISTS=True):
+            streamed = authenticated_client.get(url)
+
+    assert not buffered.streaming
+    assert streamed.streaming
+    assert streamed["Content-Type"] == "application/json"
+    assert json.loads(_body(streamed)) == json.loads(buffered.content)
+    assert streamed["ETag"] == buffered["ETag"]
+
+
+@pytest.mark.django_db
+@override_settings(STREAM_LISTS=True)
+def test_streamed_list_reads_in_chunks(authenticated_client, user, monkeypatch):
+    from notes.factories import NoteFactory
+    from notes.views import NoteViewSet
+
+    NoteFactory.create_batch(5, user=user)
+    monkeypatch.setattr(NoteViewSet, "stream_chunk_size", 2)
+
+    response = authenticated_client.get(NOTES_URL)
+    chunks = list(response.streaming_content)
+
+    # "[" + three chunks of at most two notes + "]"
+    assert len(chunks) == 5
+    assert len(json.loads(b"".join(chunks))) == 5
+
+
+@pytest.mark.django_db
+@override_settings(STREAM_LISTS=True)
+def test_streamed_empty_list(authenticated_client):
+    response = authenticated_client.get(NOTES_URL)
+
+    assert _body(response) == b"[]"
+
+
+@pytest.mark.django_db
+@override_settings(STREAM_LISTS=True)
+def test_paginated_list_is_not_streamed(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    NoteFactory.create_batch(3, user=user)
+
+    response = authenticated_client.get(f"{NOTES_URL}?page_size=2")
+
+    assert not response.streaming
+    assert len(response.data) == 2
+
+
+@pytest.mark.django_db
+@override_settings(STREAM_LISTS=True)
+def test_streamed_list_still_answers_not_modified(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    NoteFactory(user=user)
+    etag = authenticated_client.get(NOTES_URL)["ETag"]
+
+    response = authenticated_client.get(NOTES_URL, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+
+
+# ── Compression ───────────────────────────────────────────────────────────────
+
+
+@pytest.mark.django_db
+@override_settings(STREAM_LISTS=True)
+def test_streamed_list_is_gzipped_incrementally(authenticated_client, user, compression):
+    from notes.factories import NoteFactory
+
+    NoteFactory.create_batch(5, user=user)
+
+    response = authenticated_client.get(NOTES_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+    assert response.streaming
+    assert response["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response["Vary"]
+    assert len(json.loads(gzip.decompress(_body(response)))) == 5
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("stream", [False, True])
+def test_brotli_is_preferred_when_accepted(authenticated_client, user, compression, stream):
+    brotli = pytest.importorskip("brotli")
+    from notes.factories import NoteFactory
+
+    NoteFactory.create_batch(5, user=user)
+
+    with override_settings(STREAM_LISTS=stream):
+        response = authenticated_client.get(
+            NOTES_URL, HTTP_ACCEPT_ENCODING="gzip, deflate, br"
+        )
+
+    assert response["Content-Encoding"] == "br"
+    assert response["ETag"].startswith('W/"')
+    body = _body(response) if stream else response.content
+    assert len(json.loads(brotli.decompress(body))) == 5
+
+
+@pytest.mark.django_db
+def test_brotli_refused_with_zero_quality_falls_back_to_gzip(authenticated_client, user, compression):
+    from notes.factories import NoteFactory
+
+    NoteFactory.create_batch(5, user=user)
+
+    response = authenticated_client.get(NOTES_URL, HTTP_ACCEPT_ENCODING="br;q=0, gzip")
+
+    assert response["Content-Encoding"] == "gzip"
+
+
+@pytest.mark.django_db
+def test_small_responses_are_not_compressed(authenticated_client, compression):
+    response = authenticated_client.get(NOTES_URL, HTTP_ACCEPT_ENCODING="br, gzip")
+
+    assert not response.has_header("Content-Encoding")
+
+
+@pytest.mark.django_db
+def test_auth_responses_are_not_compressed(api_client, user, compression):
+    response = api_client.post(
+        "/api/auth/token/",
+        {"email": user.email, "password": "testpass123"},
+        format="json",
+        HTTP_ACCEPT_ENCODING="br, gzip",
+    )
+
+    assert response.status_code == 200
+    assert not response.has_header("Content-Encoding")
+
+
+@pytest.mark.django_db
+def test_responses_are_not_compressed_by_default(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    NoteFactory.create_batch(5, user=user)
+
+    response = authenticated_client.get(NOTES_URL, HTTP_ACCEPT_ENCODING="br, gzip")
+
+    assert not response.has_header("Content-Encoding")
+
+
+@pytest.mark.django_db
+def test_weak_etag_from_compressed_response_satisfies_if_match(
+    authenticated_client, user, compression
+):
+    from notes.factories import NoteFactory
+
+    note = NoteFactory(user=user, content="x" * 500)
+    detail = authenticated_client.get(
+        f"{NOTES_URL}{note.id}/", HTTP_ACCEPT_ENCODING="gzip"
+    )
+    assert detail["ETag"].startswith('W/"')
+
+    response = authenticated_client.patch(
+        f"{NOTES_URL}{note.id}/", {"title": "Mine"}, HTTP_IF_MATCH=detail["ETag"]
+    )
+
+    assert response.status_code == 200
@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+NOTES_URL = "/api/notes/"
+SYNC_URL = "/api/notes/sync/"
+
+
+@pytest.mark.django_db
+def test_sync_without_watermark_returns_everything(authenticated_client, user):
+    from notes.factories import NoteFactory
+
+    NoteFactory.create_batch(3, user=user)
+
+    response = authenticated_client.get(SYNC_URL)
+
+    assert response.status_code == 200
+    assert response.data["full_sync"] is True
+    assert len(response.data["notes"]) == 3
+    assert response.data["deleted"] == []
+    assert response.data["watermark"]
+
+
+@pytest.mark.django_db
+def test_sync_returns_only_changes_since_watermark(authenticated_client, user):
+    from notes.factories import NoteFactory
+    from notes.models import Note
+    from notes.services import SYNC_OVERLAP
+
+    old = NoteFactory.create_batch(2, user=user)
+    Note.objects.filter(pk__in=[n.pk for n in old]).update(
+        updated_at=timezone.now() - SYNC_OVERLAP * 2
+    )
+    watermark = authenticated_client.get(SYNC_URL).data["watermark"]
+
+    edited = old[0]
+    authenticated_client.patch(f"{NOTES_URL}{edited.id}/", {"title": "Edited"})
+    created = authenticated_client.post(NOTES_URL, {}).data
+    authenticated_client.delete(f"{NOTES_URL}{old[1].id}/")
+
+    response = authenticated_client.get(SYNC_URL, {"since": watermark})
+
+    assert response.status_code == 200
+    assert response.data["full_sync"] is False
+    assert {n["id"] for n in response.data["notes"]} == {edited.id, created["id"]}
+    assert [t["id"] for t in response.data["deleted"]] == [old[1].id]
+
+
+@pytest.mark.django_db
+def test_sync_excludes_other_users_changes(authenticated_client, user):
+    from notes.factories import NoteFactory
+    from notes.services import delete_note
+    from accounts.factories import UserFactory
+
+    watermark = authenticated_client.get(SYNC_URL).data["watermark"]
+    other_user = UserFactory()
+    delete_note(NoteFactory(user=other_user))
+    NoteFactory(user=other_user)
+
+    response = authenticated_client.get(SYNC_URL, {"since": watermark})
+
+    assert response.data["notes"] == []
+    assert response.data["deleted"] == []
+
+
+@pytest.mark.django_db
+def test_sync_expired_watermark_forces_full_sync(authenticated_client, user):
+    from notes.factories import NoteFactory
+    from notes.services import TOMBSTONE_RETENTION, encode_sync_token
+
+    NoteFactory.create_batch(2, user=user)
+    stale = encode_sync_token(timezone.now() - TOMBSTONE_RETENTION - timedelta(days=1))
+
+    response = authenticated_client.get(SYNC_URL, {"since": stale})
+
+    assert response.data["full_sync"] is True
+    assert len(response.data["notes"]) == 2
+
+
+@pytest.mark.django_db
+def test_sync_rejects_tampered_watermark(authenticated_client, user):
+    response = authenticated_client.get(SYNC_URL, {"since": "forged"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_delete_note_records_tombstone(authenticated_client, user):
+    from notes.factories import NoteFactory
+    from notes.models import Note, NoteTombstone
+
+    note = NoteFactory(user=user)
+
+    authenticated_client.delete(f"{NOTES_URL}{note.id}/")
+
+    assert not Note.objects.filter(pk=note.pk).exists()
+    assert NoteTombstone.objects.filter(user=user, note_id=note.pk).exists()
+
+
+@pytest.mark.django_db
+def test_prune_note_tombstones_command(user):
+    from django.core.management import call_command
+    from notes.models import NoteTombstone
+
+    NoteTombstone.objects.create(user=user, note_id=1)
+    expired = NoteTombstone.objects.create(user=user, note_id=2)
+    NoteTombstone.objects.filter(pk=expired.pk).update(
+        deleted_at=timezone.now() - timedelta(days=31)
+    )
+
+    call_command("prune_note_tombstones")
+
+    assert list(NoteTombstone.objects.values_list("note_id", flat=True)) == [1]